@@ -0,0 +1,70 @@
+import invertedai as iai
+from invertedai.api.drive import serialize_drive_request_parameters, _serialize_drive_request_parameters
+from invertedai.common import AgentState, AgentStateBatch, AgentProperties, Point, RecurrentState, RecurrentStateBatch
+
+import argparse
+import random
+import timeit
+
+
+def get_drive_inputs(num_agents, is_batched):
+    agent_states = [
+        AgentState(center=Point(x=random.uniform(-500,500), y=random.uniform(-500,500)), orientation=random.uniform(-3,3), speed=random.uniform(0,10))
+        for _ in range(num_agents)
+    ]
+    recurrent_states = [RecurrentState(packed=[random.random() for _ in range(len(RecurrentState().packed))]) for _ in range(num_agents)]
+    if is_batched:
+        agent_states = AgentStateBatch.from_agent_states(agent_states)
+        recurrent_states = RecurrentStateBatch.from_recurrent_states(recurrent_states)
+    return dict(
+        location="iai:mock",
+        agent_states=agent_states,
+        agent_properties=[AgentProperties(length=5, width=2, rear_axis_offset=1.4) for _ in range(num_agents)],
+        recurrent_states=recurrent_states,
+        random_seed=1
+    )
+
+
+def time_call(function, inputs, repeats):
+    return min(timeit.repeat(lambda: function(**inputs), number=1, repeat=repeats))
+
+
+def main(args):
+    iai.use_mock_api()
+    benchmarks = [
+        ("serialize request", serialize_drive_request_parameters, _serialize_drive_request_parameters),
+        ("drive (mock)", iai.drive, iai.drive_unchecked),
+        ("large_drive (mock)", iai.large_drive, iai.large_drive_unchecked),
+    ]
+
+    print(f"{'agents':>8} {'inputs':>7} {'function':>20} {'validated (ms)':>15} {'unchecked (ms)':>15} {'saved (us/agent)':>17}")
+    for num_agents in args.num_agents:
+        for is_batched in [False, True]:
+            inputs = get_drive_inputs(num_agents, is_batched)
+            for name, validated_function, unchecked_function in benchmarks:
+                validated = time_call(validated_function, inputs, args.repeats)
+                unchecked = time_call(unchecked_function, inputs, args.repeats)
+                print(
+                    f"{num_agents:>8} {'batch' if is_batched else 'list':>7} {name:>20} "
+                    f"{1e3*validated:>15.2f} {1e3*unchecked:>15.2f} {1e6*(validated-unchecked)/num_agents:>17.2f}"
+                )
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Measure the per-step overhead of argument validation in the drive functions using the mock API.")
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        nargs='+',
+        help=f"Numbers of agents driven in one step.",
+        default=[100, 1000, 10000]
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions per configuration, the fastest one is reported.",
+        default=5
+    )
+    args = argparser.parse_args()
+
+    main(args)
@@ -0,0 +1,111 @@
+from invertedai.common import AgentState, AgentProperties, Point
+from invertedai.large.common import Region, REGION_MAX_SIZE
+from invertedai.large.initialize import AGENT_SCOPE_FOV_BUFFER
+from invertedai.large._agent_grid import RegionAgentGrid
+
+import argparse
+import numpy as np
+import timeit
+from math import sqrt, ceil
+
+
+def inside_fov(center, agent_scope_fov, point):
+    return ((center.x - (agent_scope_fov / 2) < point.x < center.x + (agent_scope_fov / 2)) and
+            (center.y - (agent_scope_fov / 2) < point.y < center.y + (agent_scope_fov / 2)))
+
+
+def scan_regions(regions):
+    # Look up the conditional agents of every region by scanning all other regions
+    all_conditional_agents = []
+    for i, region in enumerate(regions):
+        agent_states, agent_properties = [], []
+        for ind, other_region in enumerate(regions):
+            if ind == i:
+                continue
+            if sqrt((region.center.x-other_region.center.x)**2+(region.center.y-other_region.center.y)**2) > (REGION_MAX_SIZE + AGENT_SCOPE_FOV_BUFFER):
+                continue
+            agent_states = agent_states + other_region.agent_states
+            agent_properties = agent_properties + other_region.agent_properties[:len(other_region.agent_states)]
+        all_conditional_agents.append([
+            state for state, _ in filter(
+                lambda x: inside_fov(center=region.center, agent_scope_fov=region.size+AGENT_SCOPE_FOV_BUFFER, point=x[0].center),
+                zip(agent_states, agent_properties)
+            )
+        ])
+    return all_conditional_agents
+
+
+def query_grid(regions):
+    # Look up the conditional agents of every region in a grid index, updating the index after each region
+    agent_grid = RegionAgentGrid(regions)
+    all_conditional_agents = []
+    for i, region in enumerate(regions):
+        agent_ids = agent_grid.query(
+            center_x=region.center.x,
+            center_y=region.center.y,
+            fov=region.size+AGENT_SCOPE_FOV_BUFFER,
+            exclude_index=i,
+            max_region_distance=REGION_MAX_SIZE + AGENT_SCOPE_FOV_BUFFER
+        )
+        all_conditional_agents.append([regions[j].agent_states[k] for j, k in agent_ids])
+        agent_grid.update_region(i, region.agent_states)
+    return all_conditional_agents
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    grid_size = ceil(sqrt(args.num_regions))
+    regions = []
+    for i in range(args.num_regions):
+        center = Point(x=args.stride*(i % grid_size), y=args.stride*(i // grid_size))
+        x = rng.uniform(center.x - REGION_MAX_SIZE/2, center.x + REGION_MAX_SIZE/2, args.agents_per_region)
+        y = rng.uniform(center.y - REGION_MAX_SIZE/2, center.y + REGION_MAX_SIZE/2, args.agents_per_region)
+        regions.append(Region(
+            center=center,
+            size=REGION_MAX_SIZE,
+            agent_states=[AgentState.fromlist([agent_x, agent_y, 0, 0]) for agent_x, agent_y in zip(x.tolist(), y.tolist())],
+            agent_properties=[AgentProperties(length=5, width=2, rear_axis_offset=1.4) for _ in range(args.agents_per_region)]
+        ))
+
+    assert scan_regions(regions) == query_grid(regions), "Conditional agents differ."
+    scan_time = min(timeit.repeat(lambda: scan_regions(regions), number=1, repeat=args.repeats))
+    grid_time = min(timeit.repeat(lambda: query_grid(regions), number=1, repeat=args.repeats))
+    print(f"{'regions':>8} {'agents':>8} {'scan (ms)':>10} {'grid (ms)':>10}")
+    print(f"{args.num_regions:>8} {args.num_regions*args.agents_per_region:>8} {1e3*scan_time:>10.1f} {1e3*grid_time:>10.1f}")
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Compare the time taken to look up the conditional agents of all large_initialize regions by scanning all regions and by querying a grid index.")
+    argparser.add_argument(
+        '--num-regions',
+        type=int,
+        help=f"Number of regions, placed on a square grid.",
+        default=500
+    )
+    argparser.add_argument(
+        '--agents-per-region',
+        type=int,
+        help=f"Number of agents placed within each region.",
+        default=10
+    )
+    argparser.add_argument(
+        '--stride',
+        type=float,
+        help=f"Distance between the centers of neighbouring regions.",
+        default=50.0
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions, the fastest one is reported.",
+        default=3
+    )
+    argparser.add_argument(
+        '--seed',
+        type=int,
+        help=f"Random seed for the agent positions.",
+        default=0
+    )
+    args = argparser.parse_args()
+
+    main(args)
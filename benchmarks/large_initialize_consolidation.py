@@ -0,0 +1,101 @@
+from invertedai.common import AgentState, AgentProperties, RecurrentState, InfractionIndicators
+from invertedai.api.initialize import InitializeResponse
+from invertedai.large.initialize import _consolidate_all_responses
+
+import argparse
+import numpy as np
+import timeit
+from copy import deepcopy
+
+
+def concatenate_responses(all_responses, region_map, get_infractions):
+    # Consolidate the responses by growing lists response by response with a deep copy of the first response
+    response = deepcopy(all_responses[0])
+    agent_states, agent_properties, recurrent_states, infractions = [], [], [], []
+    region_agent_keep_map = {i: [True]*len(res.agent_properties) for i, res in enumerate(all_responses)}
+    for (region_id, agent_id) in region_map.tolist():
+        agent_states.append(all_responses[region_id].agent_states[agent_id])
+        agent_properties.append(all_responses[region_id].agent_properties[agent_id])
+        recurrent_states.append(all_responses[region_id].recurrent_states[agent_id])
+        if get_infractions:
+            infractions.append(all_responses[region_id].infractions[agent_id])
+        region_agent_keep_map[region_id][agent_id] = False
+    for ind, res in enumerate(all_responses):
+        agent_states = agent_states + [state for i, state in enumerate(res.agent_states) if region_agent_keep_map[ind][i]]
+        agent_properties = agent_properties + [prop for i, prop in enumerate(res.agent_properties[:len(res.agent_states)]) if region_agent_keep_map[ind][i]]
+        recurrent_states = recurrent_states + [recurr for i, recurr in enumerate(res.recurrent_states) if region_agent_keep_map[ind][i]]
+        if get_infractions:
+            infractions = infractions + [infr for i, infr in enumerate(res.infractions) if region_agent_keep_map[ind][i]]
+    response.agent_states, response.agent_properties = agent_states, agent_properties
+    response.recurrent_states, response.infractions = recurrent_states, infractions
+    return response
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    num_region_agents = rng.multinomial(args.num_agents, np.ones(args.num_regions) / args.num_regions)
+    all_responses = []
+    for num_agents in num_region_agents.tolist():
+        all_responses.append(InitializeResponse(
+            agent_states=[AgentState.fromlist(rng.uniform(-50, 50, 4).tolist()) for _ in range(num_agents)],
+            recurrent_states=[RecurrentState() for _ in range(num_agents)],
+            agent_attributes=[],
+            agent_properties=[AgentProperties(length=5, width=2, rear_axis_offset=1.4) for _ in range(num_agents)],
+            birdview=None,
+            infractions=[InfractionIndicators(collisions=False, offroad=False, wrong_way=False) for _ in range(num_agents)],
+            traffic_lights_states=None,
+            light_recurrent_states=None,
+            api_model_version="benchmark"
+        ))
+
+    # Preserve the index of some agents chosen at random across all regions
+    flat_agent_ids = rng.choice(args.num_agents, args.num_predefined_agents, replace=False)
+    region_ids = np.searchsorted(np.cumsum(num_region_agents), flat_agent_ids, side="right")
+    region_map = np.stack([region_ids, flat_agent_ids - np.concatenate([[0], np.cumsum(num_region_agents)])[region_ids]], axis=1)
+
+    expected = concatenate_responses(all_responses, region_map, get_infractions=True)
+    response = _consolidate_all_responses(all_responses, region_map=region_map, get_infractions=True)
+    for field in ["agent_states", "agent_properties", "recurrent_states", "infractions"]:
+        assert getattr(expected, field) == getattr(response, field), f"Consolidated {field} differ."
+
+    concatenate_time = min(timeit.repeat(lambda: concatenate_responses(all_responses, region_map, get_infractions=True), number=1, repeat=args.repeats))
+    consolidate_time = min(timeit.repeat(lambda: _consolidate_all_responses(all_responses, region_map=region_map, get_infractions=True), number=1, repeat=args.repeats))
+    print(f"{'regions':>8} {'agents':>8} {'concatenate (ms)':>17} {'consolidate (ms)':>17}")
+    print(f"{args.num_regions:>8} {args.num_agents:>8} {1e3*concatenate_time:>17.1f} {1e3*consolidate_time:>17.1f}")
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Compare the time taken to consolidate the INITIALIZE responses of all large_initialize regions by concatenating lists and by gathering agents by index.")
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        help=f"Total number of agents across all regions.",
+        default=10000
+    )
+    argparser.add_argument(
+        '--num-regions',
+        type=int,
+        help=f"Number of regions.",
+        default=500
+    )
+    argparser.add_argument(
+        '--num-predefined-agents',
+        type=int,
+        help=f"Number of agents whose index is preserved.",
+        default=1000
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions, the fastest one is reported.",
+        default=3
+    )
+    argparser.add_argument(
+        '--seed',
+        type=int,
+        help=f"Random seed.",
+        default=0
+    )
+    args = argparser.parse_args()
+
+    main(args)
@@ -0,0 +1,230 @@
+from invertedai.common import AgentState, AgentProperties, RecurrentState, Point
+from invertedai.large.common import Region
+from invertedai.large._quadtree import partition_agents, BUFFER_FOV, QUADTREE_SIZE_BUFFER
+
+import argparse
+import numpy as np
+import timeit
+from math import ceil
+from typing import Optional
+from pydantic import BaseModel
+
+
+# The QuadTree large_drive used before partition_agents, kept here as the baseline for the comparison
+class QuadTreeAgentInfo(BaseModel):
+    """
+    All information relevant to a single agent.
+
+    See Also
+    --------
+    AgentState
+    AgentProperties
+    RecurrentState
+    """
+
+    agent_state: AgentState
+    recurrent_state: Optional[RecurrentState] = None
+    agent_properties: AgentProperties
+    agent_id: int
+
+    def tolist(self):
+        return [self.agent_state, self.agent_properties, self.recurrent_state, self.agent_id]
+
+    @classmethod
+    def fromlist(cls, l):
+        agent_state, agent_properties, recurrent_state, agent_id = l
+        return cls(agent_state=agent_state, agent_properties=agent_properties, recurrent_state=recurrent_state, agent_id=agent_id)
+
+
+class QuadTree:
+    def __init__(
+        self, 
+        capacity: int, 
+        region: Region, 
+    ):
+        self.capacity = capacity
+        self.region = region
+        self.leaf = True
+        self.northWest = None
+        self.northEast = None
+        self.southWest = None
+        self.southEast = None
+
+        self.region_buffer = Region.create_square_region(
+            center=self.region.center,
+            size=self.region.size+2*BUFFER_FOV
+        )
+        self.particles = []
+        self.particles_buffer = []
+
+    def subdivide(self):
+        parent = self.region
+        new_size = self.region.size/2
+        new_center_dist = new_size/2
+        parent_x = parent.center.x
+        parent_y = parent.center.y
+
+        region_nw = Region.create_square_region(
+            center=Point.fromlist([parent_x-new_center_dist,parent_y+new_center_dist]),
+            size=new_size
+        )
+        region_ne = Region.create_square_region(
+            center=Point.fromlist([parent_x+new_center_dist,parent_y+new_center_dist]),
+            size=new_size
+        )
+        region_sw = Region.create_square_region(
+            center=Point.fromlist([parent_x-new_center_dist,parent_y-new_center_dist]),
+            size=new_size
+        )
+        region_se = Region.create_square_region(
+            center=Point.fromlist([parent_x+new_center_dist,parent_y-new_center_dist]),
+            size=new_size
+        )
+
+        self.northWest = QuadTree(self.capacity,region_nw)
+        self.northEast = QuadTree(self.capacity,region_ne)
+        self.southWest = QuadTree(self.capacity,region_sw)
+        self.southEast = QuadTree(self.capacity,region_se)
+
+        self.leaf = False
+        self.region.clear_agents()
+        self.region_buffer.clear_agents()
+
+        for particle in self.particles:
+            is_inserted = self.insert_particle_in_leaf_nodes(particle,False)
+        for particle in self.particles_buffer:
+            is_inserted = self.insert_particle_in_leaf_nodes(particle,True)
+        self.particles = []
+        self.particles_buffer = []
+        
+    def insert_particle_in_leaf_nodes(self,particle,is_inserted):
+        is_inserted_in_this_branch = self.northWest.insert(particle,is_inserted)
+        is_inserted_in_this_branch = self.northEast.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
+        is_inserted_in_this_branch = self.southWest.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
+        is_inserted_in_this_branch = self.southEast.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
+
+        return is_inserted_in_this_branch
+
+    def insert(self, particle, is_particle_placed=False):
+        is_in_region = self.region.is_inside(particle.agent_state.center)
+        is_in_buffer = self.region_buffer.is_inside(particle.agent_state.center)
+
+        if (not is_in_region) and (not is_in_buffer):
+            return False
+
+        if (len(self.particles) + len(self.particles_buffer)) < self.capacity and self.leaf:
+            if is_in_region and not is_particle_placed:
+                self.particles.append(particle)
+                self.region.insert_all_agent_details(*particle.tolist()[:-1])
+                return True
+
+            else: # Particle is within the buffer region of this leaf node
+                self.particles_buffer.append(particle)
+                self.region_buffer.insert_all_agent_details(*particle.tolist()[:-1])
+                return False
+
+        else:
+            if self.leaf:
+                self.subdivide()
+
+            is_inserted = self.insert_particle_in_leaf_nodes(particle,is_particle_placed)
+
+            return is_inserted
+
+    def get_regions(self):
+        if self.leaf:
+            return [self.region]
+        else:
+            return self.northWest.get_regions() + self.northEast.get_regions() + \
+                self.southWest.get_regions() + self.southEast.get_regions()
+
+    def get_leaf_nodes(self):
+        if self.leaf:
+            return [self]
+        else:
+            return self.northWest.get_leaf_nodes() + self.northEast.get_leaf_nodes() + \
+                self.southWest.get_leaf_nodes() + self.southEast.get_leaf_nodes()
+
+    def get_number_of_agents_in_node(self):
+        return len(self.particles)
+
+
+def build_quadtree(agent_states, agent_properties, capacity):
+    agent_x = [agent.center.x for agent in agent_states]
+    agent_y = [agent.center.y for agent in agent_states]
+    max_x, min_x, max_y, min_y = max(agent_x), min(agent_x), max(agent_y), min(agent_y)
+    quadtree = QuadTree(
+        capacity=capacity,
+        region=Region.create_square_region(
+            center=Point.fromlist([round((max_x+min_x)/2),round((max_y+min_y)/2)]),
+            size=ceil(max(max_x - min_x, max_y - min_y)) + QUADTREE_SIZE_BUFFER
+        ),
+    )
+    for i, (agent, properties) in enumerate(zip(agent_states,agent_properties)):
+        quadtree.insert(QuadTreeAgentInfo.fromlist([agent, properties, None, i]))
+    return [
+        (sorted(particle.agent_id for particle in leaf_node.particles), sorted(particle.agent_id for particle in leaf_node.particles_buffer))
+        for leaf_node in quadtree.get_leaf_nodes()
+    ]
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    print(f"{'agents':>8} {'regions':>8} {'QuadTree (ms)':>14} {'partition_agents (ms)':>22}")
+    for num_agents in args.num_agents:
+        # Place agents with the density of a dense urban map
+        map_size = 30*np.sqrt(num_agents)
+        x = rng.uniform(-map_size/2, map_size/2, num_agents)
+        y = rng.uniform(-map_size/2, map_size/2, num_agents)
+        agent_states = [AgentState.fromlist([agent_x, agent_y, 0, 0]) for agent_x, agent_y in zip(x.tolist(), y.tolist())]
+        agent_properties = [AgentProperties(length=5, width=2, rear_axis_offset=1.4) for _ in range(num_agents)]
+
+        leaf_agent_ids = partition_agents(x, y, args.capacity)
+        if num_agents <= args.max_quadtree_agents:
+            assert build_quadtree(agent_states, agent_properties, args.capacity) == [
+                (region_ids.tolist(), buffer_ids.tolist()) for region_ids, buffer_ids in leaf_agent_ids
+            ], "Partitions differ."
+            quadtree_time = min(timeit.repeat(lambda: build_quadtree(agent_states, agent_properties, args.capacity), number=1, repeat=args.repeats))
+            quadtree_time = f"{1e3*quadtree_time:>14.1f}"
+        else:
+            quadtree_time = f"{'-':>14}"
+        partition_time = min(timeit.repeat(lambda: partition_agents(x, y, args.capacity), number=1, repeat=args.repeats))
+        print(f"{num_agents:>8} {len(leaf_agent_ids):>8} {quadtree_time} {1e3*partition_time:>22.1f}")
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Compare the time taken to divide agents into large_drive regions by the QuadTree and by partition_agents.")
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        nargs='+',
+        help=f"Numbers of agents to divide into regions.",
+        default=[1000, 10000, 50000]
+    )
+    argparser.add_argument(
+        '--capacity',
+        type=int,
+        help=f"Maximum number of agents within a region and its buffer.",
+        default=100
+    )
+    argparser.add_argument(
+        '--max-quadtree-agents',
+        type=int,
+        help=f"Largest number of agents for which the QuadTree is also timed.",
+        default=10000
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions per configuration, the fastest one is reported.",
+        default=3
+    )
+    argparser.add_argument(
+        '--seed',
+        type=int,
+        help=f"Random seed for the agent positions.",
+        default=0
+    )
+    args = argparser.parse_args()
+
+    main(args)
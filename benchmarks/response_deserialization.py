@@ -0,0 +1,73 @@
+import invertedai as iai
+from invertedai.api.drive import _deserialize_drive_response
+from invertedai.common import AgentState, AgentProperties, Point, RecurrentState
+
+import argparse
+import random
+import timeit
+
+
+def get_mock_drive_payload(num_agents):
+    # Build a drive response with the mock API and convert it back to the format returned by the server
+    iai.use_mock_api()
+    mock_response = iai.drive(
+        location="iai:mock",
+        agent_states=[
+            AgentState(center=Point(x=random.uniform(-100,100), y=random.uniform(-100,100)), orientation=random.uniform(-3,3), speed=random.uniform(0,10))
+            for _ in range(num_agents)
+        ],
+        agent_properties=[AgentProperties(length=5, width=2, rear_axis_offset=1.4) for _ in range(num_agents)],
+        recurrent_states=[RecurrentState(packed=[random.random() for _ in range(len(RecurrentState().packed))])] * num_agents,
+        traffic_lights_states={1000: "green"}
+    )
+    iai.use_mock_api(False)
+
+    payload = mock_response.serialize_drive_response_parameters()
+    payload["infraction_indicators"] = payload.pop("infractions")
+    payload["model_version"] = payload.pop("api_model_version")
+    payload["traffic_lights_states"] = {str(k): v.value for k, v in payload["traffic_lights_states"].items()}
+    return payload
+
+
+def time_deserialization(payload, trusted, is_batched, repeats):
+    iai.use_trusted_responses(trusted)
+    durations = timeit.repeat(
+        lambda: _deserialize_drive_response(response=payload, is_batched=is_batched),
+        number=1,
+        repeat=repeats
+    )
+    iai.use_trusted_responses(False)
+    return min(durations)
+
+
+def main(args):
+    print(f"{'agents':>8} {'mode':>10} {'validated (us/agent)':>22} {'trusted (us/agent)':>20} {'speedup':>8}")
+    for num_agents in args.num_agents:
+        payload = get_mock_drive_payload(num_agents)
+        for is_batched in [False, True]:
+            validated = time_deserialization(payload, trusted=False, is_batched=is_batched, repeats=args.repeats)
+            trusted = time_deserialization(payload, trusted=True, is_batched=is_batched, repeats=args.repeats)
+            print(
+                f"{num_agents:>8} {'batch' if is_batched else 'list':>10} "
+                f"{1e6*validated/num_agents:>22.2f} {1e6*trusted/num_agents:>20.2f} {validated/trusted:>7.1f}x"
+            )
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Measure the per-agent cost of building a DriveResponse with and without validation.")
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        nargs='+',
+        help=f"Numbers of agents in the deserialized response.",
+        default=[100, 1000, 10000]
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions per configuration, the fastest one is reported.",
+        default=5
+    )
+    args = argparser.parse_args()
+
+    main(args)
@@ -0,0 +1,106 @@
+import invertedai as iai
+from invertedai.common import AgentState, AgentProperties
+from invertedai.logs.logger import ScenarioLog, LogWriter, LogReader
+from invertedai.logs.columnar import ColumnarLog, convert_iai_json_to_columnar_log
+
+import argparse
+import os
+import tempfile
+import timeit
+import numpy as np
+
+
+def get_scenario_log(simulation_length, num_agents, seed):
+    # Build a scenario log in which a random subset of the agents is present at each time step
+    rng = np.random.default_rng(seed)
+    agent_properties = [
+        AgentProperties(length=float(rng.uniform(4,5)), width=float(rng.uniform(1.8,2.2)), rear_axis_offset=1.4, agent_type="car")
+        for _ in range(num_agents)
+    ]
+    agent_states, present_indexes = [], []
+    for _ in range(simulation_length):
+        present = np.flatnonzero(rng.random(num_agents) < 0.9).tolist()
+        present_indexes.append(present)
+        agent_states.append([AgentState.fromlist(state) for state in rng.normal(0, 50, (len(present), 4)).tolist()])
+    return ScenarioLog(
+        agent_states=agent_states,
+        agent_properties=agent_properties,
+        location="iai:mock",
+        rendering_center=(0.0, 0.0),
+        rendering_fov=100,
+        present_indexes=present_indexes
+    )
+
+
+def main(args):
+    # LogWriter and LogReader look up the location of the log
+    iai.use_mock_api()
+    scenario_log = get_scenario_log(args.simulation_length, args.num_agents, args.seed)
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        json_path = os.path.join(log_dir, "scenario_log.json")
+        columnar_path = os.path.join(log_dir, "scenario_log.npz")
+
+        write_json = min(timeit.repeat(lambda: LogWriter.export_log_to_file(json_path, scenario_log), number=1, repeat=args.repeats))
+        write_columnar = min(timeit.repeat(lambda: ColumnarLog.from_scenario_log(scenario_log).save(columnar_path), number=1, repeat=args.repeats))
+        assert ColumnarLog.load(columnar_path).to_scenario_log().model_dump() == scenario_log.model_dump(), "Columnar log differs from the scenario log."
+
+        # Converted from the JSON log, so that both files hold what the JSON format can represent
+        convert_iai_json_to_columnar_log(json_path, columnar_path)
+
+        json_log = LogReader(json_path).return_scenario_log()
+        columnar_log = LogReader(columnar_path).return_scenario_log()
+        assert json_log.model_dump() == columnar_log.model_dump(), "Scenario logs read from the two formats differ."
+
+        read_json = min(timeit.repeat(lambda: LogReader(json_path), number=1, repeat=args.repeats))
+        read_columnar = min(timeit.repeat(lambda: LogReader(columnar_path), number=1, repeat=args.repeats))
+        # Opening the log and stepping through every time step as a replay does
+        def step_through(log_path):
+            log_reader = LogReader(log_path)
+            log_reader.initialize()
+            while log_reader.drive():
+                pass
+        step_json = min(timeit.repeat(lambda: step_through(json_path), number=1, repeat=args.repeats))
+        step_columnar = min(timeit.repeat(lambda: step_through(columnar_path), number=1, repeat=args.repeats))
+        # Reading the states of every time step as arrays, without building a scenario log
+        def read_arrays():
+            log = ColumnarLog.load(columnar_path)
+            return [log.get_agent_states(timestep) for timestep in range(log.simulation_length)]
+        read_columnar_arrays = min(timeit.repeat(read_arrays, number=1, repeat=args.repeats))
+
+        json_size, columnar_size = os.path.getsize(json_path), os.path.getsize(columnar_path)
+
+    print(f"{'format':>10} {'size (MB)':>10} {'write (s)':>10} {'read (s)':>9} {'step (s)':>9} {'read arrays (s)':>16}")
+    print(f"{'json':>10} {json_size/1e6:>10.1f} {write_json:>10.2f} {read_json:>9.2f} {step_json:>9.2f} {'-':>16}")
+    print(f"{'columnar':>10} {columnar_size/1e6:>10.1f} {write_columnar:>10.2f} {read_columnar:>9.3f} {step_columnar:>9.2f} {read_columnar_arrays:>16.3f}")
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Compare the time taken to write and read a scenario log in the IAI JSON format and in the columnar format.")
+    argparser.add_argument(
+        '--simulation-length',
+        type=int,
+        help=f"Number of time steps in the scenario log.",
+        default=300
+    )
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        help=f"Number of agents in the scenario log.",
+        default=500
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions, the fastest one is reported.",
+        default=3
+    )
+    argparser.add_argument(
+        '--seed',
+        type=int,
+        help=f"Random seed for the agent states.",
+        default=0
+    )
+    args = argparser.parse_args()
+
+    main(args)
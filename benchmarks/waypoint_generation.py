@@ -0,0 +1,123 @@
+import invertedai as iai
+from invertedai.common import AgentState, Point
+from invertedai.helpers.waypoints import generate_lane_ids_from_lanelet_map, generate_waypoints_from_lane_ids_batch
+
+import argparse
+import random
+import timeit
+import numpy as np
+
+
+def scan_waypoints(start_state, lanelet_map, lane_ids, waypoint_spacing):
+    # Generate the waypoints of one agent by scanning the lanelet layer for every lane id and
+    # recomputing the arc lengths of the whole route
+    def get_lanelet(id):
+        for l in lanelet_map.laneletLayer:
+            if l.id == id:
+                return l
+        return None
+
+    all_centerline_points = []
+    x, y, yaw = start_state.center.x, start_state.center.y, start_state.orientation
+    forward_vec = np.array([np.cos(yaw), np.sin(yaw)])
+    for i, lane_id in enumerate(lane_ids):
+        lane_centerline_points = [point for point in get_lanelet(lane_id).centerline]
+        if i == 0:
+            distances = [(p.x-x)**2 + (p.y-y)**2 for p in lane_centerline_points]
+            idx = distances.index(min(distances))
+            if np.dot(forward_vec, np.array([lane_centerline_points[idx].x - x, lane_centerline_points[idx].y - y])) < 0:
+                idx = idx + 1 if idx < len(lane_centerline_points) - 1 else -1
+            lane_centerline_points = [] if idx == -1 else lane_centerline_points[idx:]
+            if len(lane_centerline_points) > 1:
+                second_point = lane_centerline_points[1]
+                if np.dot(forward_vec, np.array([second_point.x - x, second_point.y - y])) < 0:
+                    return []
+        all_centerline_points.extend(lane_centerline_points)
+    all_centerline_points = np.array([[point.x, point.y] for point in all_centerline_points]).reshape(-1, 2)
+    deltas = np.diff(all_centerline_points, axis=0)
+    seg_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    total_length = np.sum(seg_lengths)
+    cumdist = np.concatenate(([0], np.cumsum(seg_lengths)))
+    num_points = int(np.ceil(total_length / waypoint_spacing)) + 1
+    if num_points < 2:
+        return []
+    new_distances = np.linspace(0, total_length, num_points)
+    new_x = np.interp(new_distances, cumdist, all_centerline_points[:, 0])[1:]
+    new_y = np.interp(new_distances, cumdist, all_centerline_points[:, 1])[1:]
+    return [Point(x=x, y=y) for x, y in zip(new_x, new_y)]
+
+
+def main(args):
+    location_info_response = iai.location_info(location=args.location, include_map_source=True)
+    map_context = location_info_response.get_map_context()
+    lanelets = list(map_context.lanelet_map.laneletLayer)
+
+    # Place the agents on lanelet centerlines, heading along the lanelet
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    start_states, all_lane_ids = [], []
+    while len(start_states) < args.num_agents:
+        centerline = lanelets[int(rng.integers(len(lanelets)))].centerline
+        if len(centerline) < 2:
+            continue
+        i = int(rng.integers(len(centerline) - 1))
+        a, b = centerline[i], centerline[i + 1]
+        start_state = AgentState.fromlist([(a.x + b.x) / 2, (a.y + b.y) / 2, float(np.arctan2(b.y - a.y, b.x - a.x)), 5.0])
+        lane_ids = generate_lane_ids_from_lanelet_map(start_state, map_context, target_distance=args.target_distance)
+        if lane_ids:
+            start_states.append(start_state)
+            all_lane_ids.append(lane_ids)
+
+    scan = lambda: [scan_waypoints(s, map_context.lanelet_map, ids, args.waypoint_spacing) for s, ids in zip(start_states, all_lane_ids)]
+    batch = lambda: generate_waypoints_from_lane_ids_batch(start_states, map_context, all_lane_ids, args.waypoint_spacing)
+    for expected, waypoints in zip(scan(), batch()):
+        assert len(expected) == len(waypoints), "Number of waypoints differs."
+        assert all(abs(p.x - q.x) < 1e-6 and abs(p.y - q.y) < 1e-6 for p, q in zip(expected, waypoints)), "Waypoints differ."
+
+    scan_time = min(timeit.repeat(scan, number=1, repeat=args.repeats))
+    batch_time = min(timeit.repeat(batch, number=1, repeat=args.repeats))
+    print(f"{'agents':>8} {'lanelets':>9} {'scan (ms)':>10} {'batch (ms)':>11}")
+    print(f"{args.num_agents:>8} {len(lanelets):>9} {1e3*scan_time:>10.1f} {1e3*batch_time:>11.1f}")
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description="Compare the time taken to generate waypoints for many agents one at a time by scanning the lanelet map and in a single batch over indexed centerlines.")
+    argparser.add_argument(
+        '--location',
+        type=str,
+        help=f"Location whose map is used to generate the routes.",
+        default="canada:drake_street_and_pacific_blvd"
+    )
+    argparser.add_argument(
+        '--num-agents',
+        type=int,
+        help=f"Number of agents to generate waypoints for.",
+        default=2000
+    )
+    argparser.add_argument(
+        '--target-distance',
+        type=float,
+        help=f"Target length of the route of each agent in meters.",
+        default=600.0
+    )
+    argparser.add_argument(
+        '--waypoint-spacing',
+        type=float,
+        help=f"Spacing between the waypoints in meters.",
+        default=15.0
+    )
+    argparser.add_argument(
+        '--repeats',
+        type=int,
+        help=f"Number of timed repetitions, the fastest one is reported.",
+        default=3
+    )
+    argparser.add_argument(
+        '--seed',
+        type=int,
+        help=f"Random seed for the agent positions and routes.",
+        default=0
+    )
+    args = argparser.parse_args()
+
+    main(args)
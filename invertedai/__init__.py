@@ -6,7 +6,7 @@ __version__ = importlib.metadata.version("invertedai")
 from invertedai.api.light import light
 from invertedai.api.location import location_info
 from invertedai.api.initialize import initialize, async_initialize
-from invertedai.api.drive import drive, async_drive
+from invertedai.api.drive import drive, drive_unchecked, async_drive
 from invertedai.api.blame import blame, async_blame
 from invertedai.cosimulation import BasicCosimulation
 from invertedai.utils import Jupyter_Render, IAILogger, Session
@@ -16,7 +16,7 @@ from invertedai.large.initialize import (
     get_regions_default, 
     large_initialize
 )
-from invertedai.large.drive import large_drive
+from invertedai.large.drive import large_drive, large_drive_unchecked, async_large_drive, stream_large_drive
 from invertedai.logs.logger import LogWriter, LogReader
 from invertedai.logs.diagnostics import DiagnosticTool
 from invertedai.logs.debug_logger import DebugLogger
@@ -51,9 +51,18 @@ if api_key:
     session.add_apikey(api_key)
 add_apikey = session.add_apikey
 use_mock_api = session.use_mock_api
+use_trusted_responses = session.use_trusted_responses
+set_cache_dir = session.set_cache_dir
+use_location_info_cache = session.use_location_info_cache
 
 if strtobool(os.environ.get("IAI_MOCK_API", "false")):
     use_mock_api()
+if strtobool(os.environ.get("IAI_TRUSTED_RESPONSES", "false")):
+    use_trusted_responses()
+if "IAI_CACHE_DIR" in os.environ:
+    set_cache_dir(os.environ["IAI_CACHE_DIR"] or None)
+if strtobool(os.environ.get("IAI_CACHE_LOCATION_INFO", "false")):
+    use_location_info_cache()
 
 model_resources = {
     "initialize": ("post", "/initialize"),
@@ -70,8 +79,12 @@ __all__ = [
     "session",
     "add_apikey",
     "use_mock_api",
+    "use_trusted_responses",
+    "set_cache_dir",
+    "use_location_info_cache",
     "blame",
     "drive",
+    "drive_unchecked",
     "initialize",
     "location_info",
     "light",
@@ -1,5 +1,5 @@
 from invertedai.api.location import LocationResponse, location_info
 from invertedai.api.initialize import InitializeResponse, initialize, async_initialize
-from invertedai.api.drive import DriveResponse, drive, async_drive
+from invertedai.api.drive import DriveResponse, drive, drive_unchecked, async_drive
 # from invertedai.api.light import light, LightResponse
 from invertedai.api.blame import blame, BlameResponse
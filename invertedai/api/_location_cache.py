@@ -0,0 +1,143 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+import invertedai as iai
+from invertedai.api.config import LOCATION_INFO_CACHE_MAX_AGE, get_cache_dir, get_location_info_cache_max_age, should_cache_location_info
+
+LOCATION_INFO_CACHE_SUBDIR = "location_info"
+LOCATION_INFO_CACHE_MAX_BYTES = 2**30
+
+
+def _get_cache_key(base_url: str, params: dict) -> str:
+    return hashlib.sha256(json.dumps([base_url, params], sort_keys=True).encode()).hexdigest()
+
+
+def _write_file(path: str, data: bytes):
+    # Readers never see a partially written file
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+class LocationInfoCache:
+    """
+    A directory of raw :func:`location_info` responses, each stored under the hash of the API base URL and the
+    request parameters. The encoded birdview image and OSM map of a response are kept in a binary file that is
+    read in full on each hit, since both are handed on as bytes and a string, and the remaining fields in a small
+    JSON file whose modification time records the last use of the entry. The least recently used entries are removed
+    once the cache exceeds its maximum size, entries older than the maximum age are fetched again, and fetching
+    a new map version of a location removes all entries of that location from the same base URL with other versions.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = LOCATION_INFO_CACHE_MAX_BYTES,
+        max_age: Optional[float] = LOCATION_INFO_CACHE_MAX_AGE
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _get_paths(self, key: str):
+        path = os.path.join(self.cache_dir, key)
+        return f"{path}.json", f"{path}.bin"
+
+    def get(self, base_url: str, params: dict) -> Optional[dict]:
+        """
+        Return the cached response for the given request parameters, or None if there is no valid entry.
+        """
+
+        metadata_path, data_path = self._get_paths(_get_cache_key(base_url, params))
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            if self.max_age is not None and time.time() - metadata["created"] > self.max_age:
+                return None
+
+            response = metadata["response"]
+            birdview_size, osm_map_size = metadata["birdview_size"], metadata["osm_map_size"]
+            with open(data_path, "rb") as f:
+                data = f.read()
+            if len(data) != birdview_size + osm_map_size:
+                raise ValueError("Cached data does not match its metadata")
+            response["birdview_image"] = data[:birdview_size]
+            if osm_map_size > 0:
+                response["osm_map"] = data[birdview_size:].decode()
+            os.utime(metadata_path)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                iai.logger.debug(iai.logger.logfmt("Unable to read cached location info", path=metadata_path, error=e))
+            return None
+
+        return response
+
+    def put(self, base_url: str, params: dict, response: dict):
+        """
+        Store the raw response to a request with the given parameters, then invalidate other map versions of
+        the location and evict the least recently used entries while the cache is too large.
+        """
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        metadata_path, data_path = self._get_paths(_get_cache_key(base_url, params))
+        birdview = bytes(response["birdview_image"] or [])
+        osm_map = response["osm_map"].encode() if response["osm_map"] is not None else b""
+        metadata = dict(
+            base_url=base_url,
+            location=params["location"],
+            version=response["version"],
+            created=time.time(),
+            birdview_size=len(birdview),
+            osm_map_size=len(osm_map),
+            response={key: value for key, value in response.items() if key not in ("birdview_image", "osm_map")}
+        )
+        metadata["response"]["osm_map"] = None
+
+        # The metadata is written last, so that an entry is only visible once its data is complete
+        _write_file(data_path, birdview + osm_map)
+        _write_file(metadata_path, json.dumps(metadata).encode())
+        self._clean(base_url=base_url, location=params["location"], version=response["version"])
+
+    def _clean(self, base_url: str, location: str, version: str):
+        entries = []
+        for metadata_path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            data_path = f"{metadata_path[:-len('.json')]}.bin"
+            try:
+                with open(metadata_path) as f:
+                    metadata = json.load(f)
+                size = os.path.getsize(metadata_path) + os.path.getsize(data_path)
+                last_used = os.path.getmtime(metadata_path)
+            except (OSError, ValueError) as e:
+                iai.logger.debug(iai.logger.logfmt("Skipping cached location info", path=metadata_path, error=e))
+                continue
+
+            if metadata.get("base_url") == base_url and metadata.get("location") == location and metadata.get("version") != version:
+                self._remove(metadata_path, data_path)
+                continue
+            entries.append((last_used, size, metadata_path, data_path))
+
+        total_size = sum(entry[1] for entry in entries)
+        for _, size, metadata_path, data_path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            self._remove(metadata_path, data_path)
+            total_size -= size
+
+    def _remove(self, metadata_path: str, data_path: str):
+        for path in (metadata_path, data_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def get_location_info_cache() -> Optional[LocationInfoCache]:
+    cache_dir = get_cache_dir()
+    if cache_dir is None or not should_cache_location_info():
+        return None
+    return LocationInfoCache(os.path.join(cache_dir, LOCATION_INFO_CACHE_SUBDIR), max_age=get_location_info_cache_max_age())
@@ -1,5 +1,24 @@
+import os
+
 TIMEOUT = 10
+LOCATION_INFO_CACHE_MAX_AGE = 24*60*60
 mock_api = False
+trusted_responses = False
+location_info_cache = False
+location_info_cache_max_age = LOCATION_INFO_CACHE_MAX_AGE
+cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "invertedai")
 
 def should_use_mock_api():
     return mock_api
+
+def should_trust_responses():
+    return trusted_responses
+
+def should_cache_location_info():
+    return location_info_cache
+
+def get_location_info_cache_max_age():
+    return location_info_cache_max_age
+
+def get_cache_dir():
+    return cache_dir
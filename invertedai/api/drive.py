@@ -1,11 +1,11 @@
 import time
 import asyncio
 import warnings
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 from pydantic import BaseModel, validate_call
 
 import invertedai as iai
-from invertedai.api.config import TIMEOUT, should_use_mock_api
+from invertedai.api.config import TIMEOUT, should_use_mock_api, should_trust_responses
 from invertedai.error import APIConnectionError, InvalidInput
 from invertedai.api.mock import (
     mock_update_agent_state,
@@ -15,7 +15,9 @@ from invertedai.api.mock import (
 )
 from invertedai.common import (
     AgentState,
+    AgentStateBatch,
     RecurrentState,
+    RecurrentStateBatch,
     Image,
     InfractionIndicators,
     AgentAttributes,
@@ -23,6 +25,7 @@ from invertedai.common import (
     TrafficLightStatesDict,
     LightRecurrentStates,
     LightRecurrentState,
+    _deserialize_traffic_lights_states,
 )
 
 
@@ -31,8 +34,8 @@ class DriveResponse(BaseModel):
     Response returned from an API call to :func:`iai.drive`.
     """
 
-    agent_states: List[AgentState] #: Predicted states for all agents at the next time step.
-    recurrent_states: List[RecurrentState] #: To pass to :func:`iai.drive` at the subsequent time step.
+    agent_states: Union[AgentStateBatch, List[AgentState]] #: Predicted states for all agents at the next time step. An :class:`AgentStateBatch` if the states were given to :func:`iai.drive` as one.
+    recurrent_states: Union[RecurrentStateBatch, List[RecurrentState]] #: To pass to :func:`iai.drive` at the subsequent time step. A :class:`RecurrentStateBatch` if the agent or recurrent states were given to :func:`iai.drive` as a batch.
     birdview: Optional[Image] #: If `get_birdview` was set, this contains the resulting image.
     infractions: Optional[List[InfractionIndicators]]  #: If `get_infractions` was set, they are returned here.
     is_inside_supported_area: List[bool] #: For each agent, indicates whether the predicted state is inside supported area.
@@ -42,21 +45,77 @@ class DriveResponse(BaseModel):
 
     def serialize_drive_response_parameters(self):
         output_dict = dict(self)
-        output_dict["agent_states"] = [state.tolist() for state in output_dict["agent_states"]]
-        output_dict["recurrent_states"] = [r.packed for r in output_dict["recurrent_states"]] if output_dict["recurrent_states"] is not None else None
+        output_dict["agent_states"] = output_dict["agent_states"].tolist() if isinstance(output_dict["agent_states"], AgentStateBatch) else [state.tolist() for state in output_dict["agent_states"]]
+        output_dict["recurrent_states"] = _serialize_recurrent_states(output_dict["recurrent_states"])
         output_dict["light_recurrent_states"] = [light_recurrent_state.tolist() for light_recurrent_state in output_dict["light_recurrent_states"]] if output_dict["light_recurrent_states"] is not None else None
         output_dict["infractions"] = [infrac.tolist() for infrac in output_dict["infractions"]] if output_dict["infractions"] is not None else None
         output_dict["birdview"] = None if output_dict["birdview"] is None else output_dict["birdview"].encoded_image
 
         return output_dict
 
-@validate_call
-def serialize_drive_request_parameters(
+
+def _serialize_recurrent_states(
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]]
+):
+    if recurrent_states is None:
+        return None
+    if isinstance(recurrent_states, RecurrentStateBatch):
+        return recurrent_states.tolist()
+    return [r.packed for r in recurrent_states]
+
+
+def _is_batched(
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None
+) -> bool:
+    return isinstance(agent_states, AgentStateBatch) or isinstance(recurrent_states, RecurrentStateBatch)
+
+
+def _deserialize_drive_response(
+    response: dict,
+    is_batched: bool = False
+) -> DriveResponse:
+    trusted = should_trust_responses()
+    return (DriveResponse.model_construct if trusted else DriveResponse)(
+        agent_states=AgentStateBatch.fromlist(response["agent_states"])
+        if is_batched
+        else [
+            AgentState.fromlist(state, trusted=trusted) for state in response["agent_states"]
+        ],
+        recurrent_states=RecurrentStateBatch.fromlist(response["recurrent_states"])
+        if is_batched
+        else [
+            RecurrentState.fromval(r, trusted=trusted) for r in response["recurrent_states"]
+        ],
+        birdview=Image.fromval(response["birdview"], trusted=trusted)
+        if response["birdview"] is not None
+        else None,
+        infractions=[
+            InfractionIndicators.fromlist(infractions, trusted=trusted)
+            for infractions in response["infraction_indicators"]
+        ]
+        if response["infraction_indicators"]
+        else [],
+        is_inside_supported_area=response["is_inside_supported_area"],
+        api_model_version=response["model_version"],
+        traffic_lights_states=_deserialize_traffic_lights_states(response["traffic_lights_states"], trusted=trusted)
+        if response["traffic_lights_states"] is not None 
+        else None,
+        light_recurrent_states=[
+            LightRecurrentState.fromlist(state_arr, trusted=trusted)
+            for state_arr in response["light_recurrent_states"]
+        ] 
+        if response["light_recurrent_states"] is not None 
+        else None
+    )
+
+
+def _serialize_drive_request_parameters(
     location: str,
-    agent_states: List[AgentState],
+    agent_states: Union[AgentStateBatch, List[AgentState]],
     agent_attributes: Optional[List[AgentAttributes]] = None,
     agent_properties: Optional[List[AgentProperties]] = None,
-    recurrent_states: Optional[List[RecurrentState]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
     traffic_lights_states: Optional[TrafficLightStatesDict] = None,
     light_recurrent_states: Optional[LightRecurrentStates] = None,
     get_birdview: bool = False,
@@ -68,10 +127,10 @@ def serialize_drive_request_parameters(
 ):
     return dict(
         location=location,
-        agent_states=[state.tolist() for state in agent_states],
+        agent_states=agent_states.tolist() if isinstance(agent_states, AgentStateBatch) else [state.tolist() for state in agent_states],
         agent_attributes=[attr.tolist() for attr in agent_attributes] if agent_attributes is not None else None,
         agent_properties=[ap.serialize() for ap in agent_properties] if agent_properties is not None else None,
-        recurrent_states=[r.packed for r in recurrent_states] if recurrent_states is not None else None,
+        recurrent_states=_serialize_recurrent_states(recurrent_states),
         traffic_lights_states=traffic_lights_states,
         light_recurrent_states=[light_recurrent_state.tolist() for light_recurrent_state in light_recurrent_states] if light_recurrent_states is not None else None,
         get_birdview=get_birdview,
@@ -83,13 +142,46 @@ def serialize_drive_request_parameters(
     )
 
 
+@validate_call
+def serialize_drive_request_parameters(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_attributes: Optional[List[AgentAttributes]] = None,
+    agent_properties: Optional[List[AgentProperties]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[LightRecurrentStates] = None,
+    get_birdview: bool = False,
+    rendering_center: Optional[Tuple[float, float]] = None,
+    rendering_fov: Optional[float] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None
+):
+    return _serialize_drive_request_parameters(
+        location=location,
+        agent_states=agent_states,
+        agent_attributes=agent_attributes,
+        agent_properties=agent_properties,
+        recurrent_states=recurrent_states,
+        traffic_lights_states=traffic_lights_states,
+        light_recurrent_states=light_recurrent_states,
+        get_birdview=get_birdview,
+        rendering_center=rendering_center,
+        rendering_fov=rendering_fov,
+        get_infractions=get_infractions,
+        random_seed=random_seed,
+        api_model_version=api_model_version
+    )
+
+
 @validate_call
 def drive(
     location: str,
-    agent_states: List[AgentState],
+    agent_states: Union[AgentStateBatch, List[AgentState]],
     agent_attributes: Optional[List[AgentAttributes]] = None,
     agent_properties: Optional[List[AgentProperties]] = None,
-    recurrent_states: Optional[List[RecurrentState]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
     traffic_lights_states: Optional[TrafficLightStatesDict] = None,
     light_recurrent_states: Optional[LightRecurrentStates] = None,
     get_birdview: bool = False,
@@ -112,6 +204,8 @@ def drive(
         The state must include x: [float], y: [float] coordinate in meters
         orientation: [float] in radians with 0 pointing along x and pi/2 pointing along y and
         speed: [float] in m/s.
+        The states can also be given as a single :class:`AgentStateBatch`, in which case
+        the predicted states are returned as an :class:`AgentStateBatch` as well.
 
     agent_attributes:
         Deprecated. Static attributes of all agents.
@@ -131,7 +225,9 @@ def drive(
 
     recurrent_states:
         Recurrent states for all agents, obtained from the previous call to
-        :func:`drive` or :func:`initialize`.
+        :func:`drive` or :func:`initialize`. If either these or the agent states are given
+        as a batch, the predicted agent states and recurrent states are both returned as
+        an :class:`AgentStateBatch` and a :class:`RecurrentStateBatch` respectively.
 
     get_birdview:
         Whether to return an image visualizing the simulation state.
@@ -176,9 +272,58 @@ def drive(
     :func:`blame`
     """
 
+    return drive_unchecked(
+        location=location,
+        agent_states=agent_states,
+        agent_attributes=agent_attributes,
+        agent_properties=agent_properties,
+        recurrent_states=recurrent_states,
+        traffic_lights_states=traffic_lights_states,
+        light_recurrent_states=light_recurrent_states,
+        get_birdview=get_birdview,
+        rendering_center=rendering_center,
+        rendering_fov=rendering_fov,
+        get_infractions=get_infractions,
+        random_seed=random_seed,
+        api_model_version=api_model_version
+    )
+
+
+def drive_unchecked(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_attributes: Optional[List[AgentAttributes]] = None,
+    agent_properties: Optional[List[AgentProperties]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[LightRecurrentStates] = None,
+    get_birdview: bool = False,
+    rendering_center: Optional[Tuple[float, float]] = None,
+    rendering_fov: Optional[float] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None
+) -> DriveResponse:
+    """
+    Same as :func:`drive`, but the arguments are not validated. Use it in place of :func:`drive`
+    to avoid validating the same inputs again on every step of a long simulation,
+    for example after validating them once with :func:`drive` on the first step.
+    All arguments must already be of the types documented in :func:`drive`, lists included,
+    otherwise this function may fail in unexpected ways or send a malformed request.
+
+    See Also
+    --------
+    :func:`drive`
+    """
+
     if should_use_mock_api():
-        agent_states = [mock_update_agent_state(s) for s in agent_states]
-        present_mask = [True for _ in agent_states]
+        if not isinstance(agent_states, AgentStateBatch):
+            agent_states = [mock_update_agent_state(s) for s in agent_states]
+        if _is_batched(agent_states, recurrent_states):
+            agent_states = AgentStateBatch.from_agent_states(agent_states)
+            if recurrent_states is not None:
+                recurrent_states = RecurrentStateBatch.from_recurrent_states(recurrent_states)
+        present_mask = [True] * len(agent_states)
         birdview = get_mock_birdview()
         infractions = get_mock_infractions(len(agent_states))
         response = DriveResponse(
@@ -197,13 +342,13 @@ def drive(
         warnings.warn('agent_attributes is deprecated. Please use agent_properties.',category=DeprecationWarning) 
 
     def _tolist(input_data: List):
-        if not isinstance(input_data, list):
+        if not isinstance(input_data, (list, RecurrentStateBatch)):
             return input_data.tolist()
         else:
             return input_data
 
     recurrent_states = _tolist(recurrent_states) if recurrent_states is not None else None
-    model_inputs = serialize_drive_request_parameters(
+    model_inputs = _serialize_drive_request_parameters(
         location=location,
         agent_states=agent_states,
         agent_attributes=agent_attributes,
@@ -225,33 +370,9 @@ def drive(
         try:
             response = iai.session.request(model="drive", data=model_inputs)
 
-            response = DriveResponse(
-                agent_states=[
-                    AgentState.fromlist(state) for state in response["agent_states"]
-                ],
-                recurrent_states=[
-                    RecurrentState.fromval(r) for r in response["recurrent_states"]
-                ],
-                birdview=Image.fromval(response["birdview"])
-                if response["birdview"] is not None
-                else None,
-                infractions=[
-                    InfractionIndicators.fromlist(infractions)
-                    for infractions in response["infraction_indicators"]
-                ]
-                if response["infraction_indicators"]
-                else [],
-                is_inside_supported_area=response["is_inside_supported_area"],
-                api_model_version=response["model_version"],
-                traffic_lights_states=response["traffic_lights_states"]
-                if response["traffic_lights_states"] is not None 
-                else None,
-                light_recurrent_states=[
-                    LightRecurrentState(state=state_arr[0], time_remaining=state_arr[1]) 
-                    for state_arr in response["light_recurrent_states"]
-                ] 
-                if response["light_recurrent_states"] is not None 
-                else None
+            response = _deserialize_drive_response(
+                response=response,
+                is_batched=_is_batched(agent_states, recurrent_states)
             )
 
             return response
@@ -265,10 +386,10 @@ def drive(
 @validate_call
 async def async_drive(
     location: str,
-    agent_states: List[AgentState],
+    agent_states: Union[AgentStateBatch, List[AgentState]],
     agent_attributes: Optional[List[AgentAttributes]]=None,
     agent_properties: Optional[List[AgentProperties]]=None,
-    recurrent_states: Optional[List[RecurrentState]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
     traffic_lights_states: Optional[TrafficLightStatesDict] = None,
     light_recurrent_states: Optional[LightRecurrentStates] = None,
     get_birdview: bool = False,
@@ -282,14 +403,63 @@ async def async_drive(
     A light async version of :func:`drive`
     """
 
+    return await _async_drive(
+        location=location,
+        agent_states=agent_states,
+        agent_attributes=agent_attributes,
+        agent_properties=agent_properties,
+        recurrent_states=recurrent_states,
+        traffic_lights_states=traffic_lights_states,
+        light_recurrent_states=light_recurrent_states,
+        get_birdview=get_birdview,
+        rendering_center=rendering_center,
+        rendering_fov=rendering_fov,
+        get_infractions=get_infractions,
+        random_seed=random_seed,
+        api_model_version=api_model_version
+    )
+
+
+async def _async_drive(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_attributes: Optional[List[AgentAttributes]]=None,
+    agent_properties: Optional[List[AgentProperties]]=None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[LightRecurrentStates] = None,
+    get_birdview: bool = False,
+    rendering_center: Optional[Tuple[float, float]] = None,
+    rendering_fov: Optional[float] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None
+) -> DriveResponse:
+    if should_use_mock_api():
+        return drive_unchecked(
+            location=location,
+            agent_states=agent_states,
+            agent_attributes=agent_attributes,
+            agent_properties=agent_properties,
+            recurrent_states=recurrent_states,
+            traffic_lights_states=traffic_lights_states,
+            light_recurrent_states=light_recurrent_states,
+            get_birdview=get_birdview,
+            rendering_center=rendering_center,
+            rendering_fov=rendering_fov,
+            get_infractions=get_infractions,
+            random_seed=random_seed,
+            api_model_version=api_model_version
+        )
+
     def _tolist(input_data: List):
-        if not isinstance(input_data, list):
+        if not isinstance(input_data, (list, RecurrentStateBatch)):
             return input_data.tolist()
         else:
             return input_data
 
     recurrent_states = _tolist(recurrent_states) if recurrent_states is not None else None
-    model_inputs = serialize_drive_request_parameters(
+    model_inputs = _serialize_drive_request_parameters(
         location=location,
         agent_states=agent_states,
         agent_attributes=agent_attributes,
@@ -304,35 +474,23 @@ async def async_drive(
         random_seed=random_seed,
         api_model_version=api_model_version
     )
-    response = await iai.session.async_request(model="drive", data=model_inputs)
+    start = time.time()
+    timeout = TIMEOUT
 
-    response = DriveResponse(
-        agent_states=[
-            AgentState.fromlist(state) for state in response["agent_states"]
-        ],
-        recurrent_states=[
-            RecurrentState.fromval(r) for r in response["recurrent_states"]
-        ],
-        birdview=Image.fromval(response["birdview"])
-        if response["birdview"] is not None
-        else None,
-        infractions=[
-            InfractionIndicators.fromlist(infractions)
-            for infractions in response["infraction_indicators"]
-        ]
-        if response["infraction_indicators"]
-        else [],
-        is_inside_supported_area=response["is_inside_supported_area"],
-        api_model_version=response["model_version"],
-        traffic_lights_states=response["traffic_lights_states"] 
-        if response["traffic_lights_states"] is not None 
-        else None,
-        light_recurrent_states=[
-            LightRecurrentState(state=state_arr[0], time_remaining=state_arr[1]) 
-            for state_arr in response["light_recurrent_states"]
-        ] 
-        if response["light_recurrent_states"] is not None 
-        else None
-    )
+    while True:
+        try:
+            response = await iai.session.async_request(model="drive", data=model_inputs)
+
+            response = _deserialize_drive_response(
+                response=response,
+                is_batched=_is_batched(agent_states, recurrent_states)
+            )
+
+            break
+
+        except APIConnectionError as e:
+            iai.logger.warning("Retrying")
+            if (timeout is not None and time.time() > start + timeout) or not e.should_retry:
+                raise e
 
     return response
@@ -2,10 +2,10 @@ import time
 import asyncio
 import warnings
 from pydantic import BaseModel, validate_call
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Union
 
 import invertedai as iai
-from invertedai.api.config import TIMEOUT, should_use_mock_api
+from invertedai.api.config import TIMEOUT, should_use_mock_api, should_trust_responses
 from invertedai.error import TryAgain, InvalidInputType, InvalidInput
 from invertedai.api.mock import (
     get_mock_agent_attributes,
@@ -21,12 +21,15 @@ from invertedai.common import (
     AgentAttributes,
     AgentProperties,
     AgentState,
+    AgentStateBatch,
     Image,
     InfractionIndicators,
     LightRecurrentState,
     LightRecurrentStates,
     RecurrentState,
-    TrafficLightStatesDict
+    RecurrentStateBatch,
+    TrafficLightStatesDict,
+    _deserialize_traffic_lights_states
 )
 
 
@@ -34,8 +37,8 @@ class InitializeResponse(BaseModel):
     """
     Response returned from an API call to :func:`iai.initialize`.
     """
-    agent_states: List[AgentState] #: Initial states of all initialized agents.
-    recurrent_states: List[Optional[RecurrentState]] #: To pass to :func:`iai.drive` at the first time step.
+    agent_states: Union[AgentStateBatch, List[AgentState]] #: Initial states of all initialized agents. An :class:`AgentStateBatch` if the most recent states in `states_history` were given as one.
+    recurrent_states: Union[RecurrentStateBatch, List[Optional[RecurrentState]]] #: To pass to :func:`iai.drive` at the first time step. A :class:`RecurrentStateBatch` if the agent states are returned as an :class:`AgentStateBatch`.
     agent_attributes: List[Optional[AgentAttributes]] #: Static attributes of all initialized agents.
     agent_properties: List[AgentProperties]  #: Static agent properties of all initialized agents.
     birdview: Optional[Image] #: If `get_birdview` was set, this contains the resulting image.
@@ -46,8 +49,8 @@ class InitializeResponse(BaseModel):
 
     def serialize_initialize_response_parameters(self):
         output_dict = dict(self)
-        output_dict["agent_states"] = [state.tolist() for state in output_dict["agent_states"]]
-        output_dict["recurrent_states"] = [r.packed for r in output_dict["recurrent_states"]] if output_dict["recurrent_states"] is not None else None
+        output_dict["agent_states"] = output_dict["agent_states"].tolist() if isinstance(output_dict["agent_states"], AgentStateBatch) else [state.tolist() for state in output_dict["agent_states"]]
+        output_dict["recurrent_states"] = output_dict["recurrent_states"].tolist() if isinstance(output_dict["recurrent_states"], RecurrentStateBatch) else [r.packed for r in output_dict["recurrent_states"]] if output_dict["recurrent_states"] is not None else None
         output_dict["agent_attributes"] = [attr.tolist() for attr in output_dict["agent_attributes"]] if output_dict["agent_attributes"] is not None else None
         output_dict["agent_properties"] = [ap.serialize() for ap in output_dict["agent_properties"]] if output_dict["agent_properties"] is not None else None
         output_dict["birdview"] = None if output_dict["birdview"] is None else output_dict["birdview"].encoded_image
@@ -56,12 +59,62 @@ class InitializeResponse(BaseModel):
 
         return output_dict
 
+def _serialize_agent_states(
+    agent_states: Union[AgentStateBatch, List[AgentState]]
+):
+    if isinstance(agent_states, AgentStateBatch):
+        return agent_states.tolist()
+    return [st.tolist() for st in agent_states]
+
+def _deserialize_initialize_response(
+    response: dict,
+    is_agent_state_batch: bool = False
+) -> InitializeResponse:
+    trusted = should_trust_responses()
+    return (InitializeResponse.model_construct if trusted else InitializeResponse)(
+        agent_states=AgentStateBatch.fromlist(response["agent_states"])
+        if is_agent_state_batch
+        else [
+            AgentState.fromlist(state, trusted=trusted) for state in response["agent_states"]
+        ],
+        agent_attributes=[
+            AgentAttributes.fromlist(attr, trusted=trusted) for attr in response["agent_attributes"]
+        ] if response["agent_attributes"] is not None else [],
+        agent_properties=[
+            AgentProperties.deserialize(ap, trusted=trusted) for ap in response["agent_properties"]
+        ],
+        recurrent_states=RecurrentStateBatch.fromlist(response["recurrent_states"])
+        if is_agent_state_batch and None not in response["recurrent_states"]
+        else [
+            RecurrentState.fromval(r, trusted=trusted) for r in response["recurrent_states"]
+        ],
+        birdview=Image.fromval(response["birdview"], trusted=trusted)
+        if response["birdview"] is not None
+        else None,
+        infractions=[
+            InfractionIndicators.fromlist(infractions, trusted=trusted)
+            for infractions in response["infraction_indicators"]
+        ]
+        if response["infraction_indicators"]
+        else [],
+        api_model_version=response["model_version"],
+        traffic_lights_states=_deserialize_traffic_lights_states(response["traffic_lights_states"], trusted=trusted)
+        if response["traffic_lights_states"] is not None 
+        else None,
+        light_recurrent_states=[
+            LightRecurrentState.fromlist(state_arr, trusted=trusted)
+            for state_arr in response["light_recurrent_states"]
+        ] 
+        if response["light_recurrent_states"] is not None 
+        else None
+    )
+
 @validate_call
 def serialize_initialize_request_parameters(
     location: str,
     agent_attributes: Optional[List[AgentAttributes]] = None,
     agent_properties: Optional[List[AgentProperties]] = None,
-    states_history: Optional[List[List[AgentState]]] = None,
+    states_history: Optional[List[Union[AgentStateBatch, List[AgentState]]]] = None,
     traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
     get_birdview: bool = False,
     location_of_interest: Optional[Tuple[float, float]] = None,
@@ -73,7 +126,7 @@ def serialize_initialize_request_parameters(
     return dict(
         location=location,
         num_agents_to_spawn=agent_count,
-        states_history=states_history if states_history is None else [[st.tolist() for st in states] for states in states_history],
+        states_history=states_history if states_history is None else [_serialize_agent_states(states) for states in states_history],
         agent_attributes=agent_attributes if agent_attributes is None else [state.tolist() for state in agent_attributes],
         agent_properties=agent_properties if agent_properties is None else [ap.serialize() if ap else None for ap in agent_properties] ,
         traffic_light_state_history=traffic_light_state_history,
@@ -89,7 +142,7 @@ def initialize(
     location: str,
     agent_attributes: Optional[List[AgentAttributes]] = None,
     agent_properties: Optional[List[AgentProperties]] = None,
-    states_history: Optional[List[List[AgentState]]] = None,
+    states_history: Optional[List[Union[AgentStateBatch, List[AgentState]]]] = None,
     traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
     get_birdview: bool = False,
     location_of_interest: Optional[Tuple[float, float]] = None,
@@ -132,6 +185,9 @@ def initialize(
         in chronological order, i.e., index 0 is the oldest state and index -1 is the current state.
         The order of agents should be the same as in `agent_attributes`.
         For best results, provide at least 10 historical states for each agent.
+        The states of each time step can also be given as an :class:`AgentStateBatch`. If the
+        most recent time step is given as one, the initial states are returned as an :class:`AgentStateBatch` as well,
+        and the recurrent states as a :class:`RecurrentStateBatch`.
 
     traffic_light_state_history:
        History of traffic light states - the list is over time, in chronological order, i.e.
@@ -210,43 +266,15 @@ def initialize(
         random_seed=random_seed,
         api_model_version=api_model_version
     )
+    is_agent_state_batch = states_history is not None and len(states_history) > 0 and isinstance(states_history[-1], AgentStateBatch)
     start = time.time()
     timeout = TIMEOUT
     while True:
         try:
             response = iai.session.request(model="initialize", data=model_inputs)
-            response = InitializeResponse(
-                agent_states=[
-                    AgentState.fromlist(state) for state in response["agent_states"]
-                ],
-                agent_attributes=[
-                    AgentAttributes.fromlist(attr) for attr in response["agent_attributes"]
-                ] if response["agent_attributes"] is not None else [],
-                agent_properties=[
-                    AgentProperties.deserialize(ap) for ap in response["agent_properties"]
-                ],
-                recurrent_states=[
-                    RecurrentState.fromval(r) for r in response["recurrent_states"]
-                ],
-                birdview=Image.fromval(response["birdview"])
-                if response["birdview"] is not None
-                else None,
-                infractions=[
-                    InfractionIndicators.fromlist(infractions)
-                    for infractions in response["infraction_indicators"]
-                ]
-                if response["infraction_indicators"]
-                else [],
-                api_model_version=response["model_version"],
-                traffic_lights_states=response["traffic_lights_states"] 
-                if response["traffic_lights_states"] is not None 
-                else None,
-                light_recurrent_states=[
-                    LightRecurrentState(state=state_arr[0], time_remaining=state_arr[1]) 
-                    for state_arr in response["light_recurrent_states"]
-                ] 
-                if response["light_recurrent_states"] is not None 
-                else None
+            response = _deserialize_initialize_response(
+                response=response,
+                is_agent_state_batch=is_agent_state_batch
             )
             return response
         except TryAgain as e:
@@ -260,7 +288,7 @@ async def async_initialize(
     location: str,
     agent_attributes: Optional[List[AgentAttributes]] = None,
     agent_properties: Optional[List[AgentProperties]] = None,
-    states_history: Optional[List[List[AgentState]]] = None,
+    states_history: Optional[List[Union[AgentStateBatch, List[AgentState]]]] = None,
     traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
     get_birdview: bool = False,
     location_of_interest: Optional[Tuple[float, float]] = None,
@@ -278,7 +306,7 @@ async def async_initialize(
         num_agents_to_spawn=agent_count,
         states_history=states_history
         if states_history is None
-        else [[st.tolist() for st in states] for states in states_history],
+        else [_serialize_agent_states(states) for states in states_history],
         agent_attributes=agent_attributes
         if agent_attributes is None
         else [state.tolist() for state in agent_attributes],
@@ -292,43 +320,15 @@ async def async_initialize(
         model_version=api_model_version
     )
 
+    is_agent_state_batch = states_history is not None and len(states_history) > 0 and isinstance(states_history[-1], AgentStateBatch)
     response = await iai.session.async_request(model="initialize", data=model_inputs)
     agents_spawned = len(response["agent_states"])
     if agents_spawned != agent_count:
         iai.logger.warning(
             f"Unable to spawn a scenario for {agent_count} agents,  {agents_spawned} spawned instead."
         )
-    response = InitializeResponse(
-        agent_states=[
-            AgentState.fromlist(state) for state in response["agent_states"]
-        ],
-        agent_attributes=[
-            AgentAttributes.fromlist(attr) for attr in response["agent_attributes"]
-        ],
-        agent_properties=[
-                    AgentProperties.deserialize(ap) for ap in response["agent_properties"]
-                ],
-        recurrent_states=[
-            RecurrentState.fromval(r) for r in response["recurrent_states"]
-        ],
-        birdview=Image.fromval(response["birdview"])
-        if response["birdview"] is not None
-        else None,
-        infractions=[
-            InfractionIndicators.fromlist(infractions)
-            for infractions in response["infraction_indicators"]
-        ]
-        if response["infraction_indicators"]
-        else [],
-        api_model_version=response["model_version"],
-        traffic_lights_states=response["traffic_lights_states"]
-        if response["traffic_lights_states"] is not None 
-        else None,
-        light_recurrent_states=[
-            LightRecurrentState(state=state_arr[0], time_remaining=state_arr[1]) 
-            for state_arr in response["light_recurrent_states"]
-            ] 
-        if response["light_recurrent_states"] is not None 
-        else None
+    response = _deserialize_initialize_response(
+        response=response,
+        is_agent_state_batch=is_agent_state_batch
     )
     return response
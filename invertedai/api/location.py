@@ -1,12 +1,12 @@
 import time
 from pydantic import BaseModel, validate_call
 from typing import Optional, List, Tuple
-import tempfile
 
 import invertedai as iai
-from invertedai.api.config import TIMEOUT, should_use_mock_api
+from invertedai.api.config import TIMEOUT, should_use_mock_api, should_trust_responses
 from invertedai.error import TryAgain
 from invertedai.api.mock import get_mock_birdview
+from invertedai.api._location_cache import get_location_info_cache
 
 from invertedai.common import Point, Origin, Image, LocationMap, StaticMapActor
 
@@ -27,20 +27,28 @@ class LocationResponse(BaseModel):
     static_actors: List[StaticMapActor]  #: Lists traffic lights with their IDs and locations.
 
     
+    def get_map_context(self, origin: Optional[Point] = None):
+        """
+        Return a :class:`LaneletMapContext` holding the lanelet map of this location together with its traffic
+        rules and routing graph. The map is parsed once per location and origin, and the context is shared by
+        all later calls, so it can be passed to the waypoint helpers for any number of agents.
+        """
+        if self.osm_map is None or not self.osm_map.encoded_map:
+            raise ValueError("osm_map was none or empty, please ensure this response was obtained with `include_map_source` set to true.")
+        from invertedai.helpers.map_context import get_map_context
+
+        return get_map_context(self.osm_map, origin=origin)
+
     def get_lanelet_map(self, origin: Optional[Point] = None):
+        """
+        Return the projected lanelet map of this location, parsed anew on each call so that it can be modified.
+        Use :func:`get_map_context` to share a single parsed map and its routing graph between calls.
+        """
         if self.osm_map is None or not self.osm_map.encoded_map:
             raise ValueError("osm_map was none or empty, please ensure this response was obtained with `include_map_source` set to true.")
-        import lanelet2
-
-        with tempfile.NamedTemporaryFile(suffix=".osm", delete=True) as tmp:
-            self.osm_map.save_osm_file(tmp.name)
-            tmp.flush()
-            origin_x = origin.x if origin else self.osm_map.origin.x
-            origin_y = origin.y if origin else self.osm_map.origin.y
-            projector = lanelet2.projection.UtmProjector(
-                lanelet2.io.Origin(origin_x, origin_y)
-            )
-            return lanelet2.io.load(tmp.name, projector)
+        from invertedai.helpers.map_context import load_lanelet_map
+
+        return load_lanelet_map(self.osm_map, origin=origin)
 
 @validate_call
 def location_info(
@@ -66,6 +74,12 @@ def location_info(
 
     rendering_center:
         Optional center x,y coordinates for the rendered birdview.
+
+    If enabled with :func:`iai.use_location_info_cache`, responses are cached on disk (see the `IAI_CACHE_DIR`
+    environment variable) for a day, so repeated calls with the same arguments are served without a network
+    call, even if the map was updated on the server in the meantime. Fetching a new map version of a location
+    removes the cached responses for its other versions.
+
     See Also
     --------
     :func:`drive`
@@ -93,23 +107,41 @@ def location_info(
 
     params = {"location": location, "include_map_source": include_map_source, "rendering_fov": rendering_fov,
               "rendering_center": ",".join([str(rendering_center[0]), str(rendering_center[1])]) if rendering_center else rendering_center}
+    cache = get_location_info_cache()
     while True:
         try:
-            response = iai.session.request(model="location_info", params=params)
+            response = cache.get(iai.session.base_url, params) if cache is not None else None
+            if response is not None and iai.session._debug_logger is not None:
+                # Keep debug logs replayable when the response is served from the cache
+                iai.session._debug_logger.append_request("location_info", params)
+                iai.session._debug_logger.append_response(
+                    "location_info", dict(response, birdview_image=list(response["birdview_image"]))
+                )
+            if response is None:
+                response = iai.session.request(model="location_info", params=params)
+                if cache is not None:
+                    try:
+                        cache.put(iai.session.base_url, params, response)
+                    except OSError as e:
+                        iai.logger.warning(iai.logger.logfmt("Unable to cache location info", error=e))
+            trusted = should_trust_responses()
             if response['bounding_polygon'] is not None:
-                response['bounding_polygon'] = [Point(x=x, y=y) for (x, y) in response['bounding_polygon']]
+                response['bounding_polygon'] = [Point.fromlist(point, trusted=trusted) for point in response['bounding_polygon']]
             if response["static_actors"] is not None:
                 response["static_actors"] = [
-                    StaticMapActor.fromdict(actor) for actor in response["static_actors"]
+                    StaticMapActor.fromdict(actor, trusted=trusted) for actor in response["static_actors"]
                 ]
             if response["osm_map"] is not None:
-                response["osm_map"] = LocationMap(
+                response["osm_map"] = (LocationMap.model_construct if trusted else LocationMap)(
                     encoded_map=response["osm_map"],
                     origin=Origin.fromlist(
-                        response["map_origin"]))
+                        response["map_origin"], trusted=trusted))
             del response["map_origin"]
-            response["map_center"] = Point.fromlist(response["map_center"])
-            response['birdview_image'] = Image.fromval(response['birdview_image'])
+            response["map_center"] = Point.fromlist(response["map_center"], trusted=trusted)
+            # Cached birdview images are the bytes of a previously received response and are not validated again
+            response['birdview_image'] = Image.fromval(response['birdview_image'], trusted=trusted or isinstance(response['birdview_image'], bytes))
+            if trusted:
+                return LocationResponse.model_construct(**response)
             return LocationResponse(**response)
         except TryAgain as e:
             if timeout is not None and time.time() > start + timeout:
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Tuple
 from enum import Enum
 from pydantic import BaseModel, model_validator
+from pydantic_core import core_schema
 import math
 from PIL import Image as PImage
 import numpy as np
@@ -13,6 +14,21 @@ from invertedai.error import InvalidInputType, InvalidInput
 RECURRENT_SIZE = 152
 TrafficLightId = int
 
+
+_object_setattr = object.__setattr__
+
+
+def _construct(cls, **fields):
+    # Same result as `cls.model_construct(**fields)` when every field is given, without its per-field
+    # overhead, which makes it slower than validation for the small models built once per agent.
+    obj = cls.__new__(cls)
+    _object_setattr(obj, "__dict__", fields)
+    _object_setattr(obj, "__pydantic_fields_set__", set(fields))
+    _object_setattr(obj, "__pydantic_extra__", None)
+    _object_setattr(obj, "__pydantic_private__", None)
+    return obj
+
+
 class RecurrentState(BaseModel):
     """
     Recurrent state used in :func:`iai.drive`.
@@ -22,10 +38,97 @@ class RecurrentState(BaseModel):
     packed: List[float] = [0.0] * RECURRENT_SIZE
 
     @classmethod
-    def fromval(cls, val):
+    def fromval(cls, val, trusted: bool = False):
+        if trusted:
+            return _construct(cls, packed=val)
         return cls(packed=val)
 
 
+class RecurrentStateBatch:
+    """
+    Recurrent states of many agents stored in a single contiguous float32 array of shape (N, RECURRENT_SIZE),
+    where each row is the packed recurrent state of one agent. Like :class:`RecurrentState` it should not
+    be modified, but rather passed along as received. It can be passed to :func:`iai.drive` in place of
+    a list of :class:`RecurrentState`, which avoids any per-agent work when building the request.
+    Indexing or iterating over the batch gives :class:`RecurrentState` objects, which are only built on
+    first access, while slicing gives a new RecurrentStateBatch.
+
+    See Also
+    --------
+    RecurrentState
+    """
+
+    def __init__(
+        self,
+        packed: np.ndarray
+    ):
+        self.packed = np.ascontiguousarray(packed, dtype=np.float32) #: Packed recurrent states of all agents, one agent per row.
+        if self.packed.ndim != 2:
+            raise InvalidInput("The packed recurrent states of a RecurrentStateBatch must be two dimensional.")
+        self._recurrent_states = None
+
+    @classmethod
+    def fromlist(cls, l):
+        """
+        Build RecurrentStateBatch from a list (or array) of packed recurrent states, one per agent.
+        """
+        packed = np.asarray(l, dtype=np.float32)
+        if packed.size == 0:
+            packed = packed.reshape(0, RECURRENT_SIZE)
+        return cls(packed=packed)
+
+    @classmethod
+    def from_recurrent_states(cls, recurrent_states: List[RecurrentState]):
+        """
+        Build RecurrentStateBatch from a list of :class:`RecurrentState`.
+        """
+        if isinstance(recurrent_states, cls):
+            return recurrent_states
+        return cls.fromlist([r.packed for r in recurrent_states])
+
+    @classmethod
+    def concatenate(cls, batches: List["RecurrentStateBatch"]):
+        """
+        Join several batches into a single batch in the given order.
+        """
+        return cls(packed=np.concatenate([batch.packed for batch in batches], axis=0))
+
+    def tolist(self):
+        """
+        Convert RecurrentStateBatch to a list of packed recurrent states as expected by the API.
+        """
+        return self.packed.tolist()
+
+    def to_recurrent_states(self) -> List[RecurrentState]:
+        """
+        Convert RecurrentStateBatch to a list of :class:`RecurrentState`. The list is built once and cached.
+        """
+        if self._recurrent_states is None:
+            self._recurrent_states = [RecurrentState.fromval(r) for r in self.tolist()]
+        return self._recurrent_states
+
+    def __len__(self):
+        return self.packed.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.to_recurrent_states()[index]
+        return RecurrentStateBatch(packed=self.packed[index])
+
+    def __iter__(self):
+        return iter(self.to_recurrent_states())
+
+    def __repr__(self):
+        return f"RecurrentStateBatch(num_agents={len(self)})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda batch: batch.tolist())
+        )
+
+
 class Point(BaseModel):
     """
     2D coordinates of a point in a given location.
@@ -37,8 +140,10 @@ class Point(BaseModel):
     y: float
 
     @classmethod
-    def fromlist(cls, l):
+    def fromlist(cls, l, trusted: bool = False):
         x, y = l
+        if trusted:
+            return _construct(cls, x=x, y=y)
         return cls(x=x, y=y)
 
     def __sub__(self, other):
@@ -91,7 +196,9 @@ class Image(BaseModel):
         return img_array
 
     @classmethod
-    def fromval(cls, val):
+    def fromval(cls, val, trusted: bool = False):
+        if trusted:
+            return _construct(cls, encoded_image=val)
         return cls(encoded_image=val)
 
     def decode_and_save(self, path):
@@ -124,6 +231,16 @@ class LightRecurrentState(BaseModel):
     """
     state: float
     time_remaining: float
+
+    @classmethod
+    def fromlist(cls, l, trusted: bool = False):
+        """
+        Build LightRecurrentState from a list with this order: [state, time_remaining]
+        """
+        state, time_remaining = l
+        if trusted:
+            return _construct(cls, state=state, time_remaining=time_remaining)
+        return cls(state=state, time_remaining=time_remaining)
     
     def tolist(self):
         """
@@ -155,7 +272,7 @@ class AgentAttributes(BaseModel):
     waypoint: Optional[Point] = None  #: Target waypoint of the agent. If provided the agent will attempt to reach it.
 
     @classmethod
-    def fromlist(cls, l):
+    def fromlist(cls, l, trusted: bool = False):
         length, width, rear_axis_offset, agent_type, waypoint = None, None, None, None, None    
         if len(l) == 5:
             length, width, rear_axis_offset, agent_type, waypoint = l
@@ -183,12 +300,12 @@ class AgentAttributes(BaseModel):
             else:
                 agent_type, = l        
         assert type(waypoint) is list if waypoint is not None else True, "waypoint must be a list of two floats"
-        return cls(
+        return (cls.model_construct if trusted else cls)(
             length=length, 
             width=width, 
             rear_axis_offset=rear_axis_offset, 
             agent_type=agent_type, 
-            waypoint=Point(x=waypoint[0], y=waypoint[1]) if waypoint is not None else None
+            waypoint=Point.fromlist(waypoint, trusted=trusted) if waypoint is not None else None
         )
 
     def tolist(self):
@@ -230,14 +347,14 @@ class AgentProperties(BaseModel):
     max_speed: Optional[float] = None  #: Maximum speed limit of the agent in m/s.
 
     @classmethod
-    def deserialize(cls, val):
-        return cls(
+    def deserialize(cls, val, trusted: bool = False):
+        return (cls.model_construct if trusted else cls)(
             length=val['length'], 
             width=val['width'], 
             rear_axis_offset=val['rear_axis_offset'], 
             agent_type=val['agent_type'], 
-            waypoint=Point(x=val['waypoint'][0], y=val['waypoint'][1]) if val['waypoint'] else None, 
-            waypoints=[Point(x=point[0], y=point[1]) for point in val['waypoints']] if val.get('waypoints', None) else None,
+            waypoint=Point.fromlist(val['waypoint'], trusted=trusted) if val['waypoint'] else None, 
+            waypoints=[Point.fromlist(point, trusted=trusted) for point in val['waypoints']] if val.get('waypoints', None) else None,
             max_speed=val['max_speed']
         )
     
@@ -277,11 +394,19 @@ class AgentState(BaseModel):
         return [self.center.x, self.center.y, self.orientation, self.speed]
 
     @classmethod
-    def fromlist(cls, l):
+    def fromlist(cls, l, trusted: bool = False):
         """
         Build AgentState from a list with this order: [x, y, orientation, speed]
+        If `trusted` is set, the values are assumed to be valid and are stored without validation.
         """
         x, y, psi, v = l
+        if trusted:
+            return _construct(
+                cls,
+                center=_construct(Point, x=x, y=y),
+                orientation=psi,
+                speed=v
+            )
         return cls(
             center=Point(x=x, y=y), 
             orientation=psi, 
@@ -289,6 +414,110 @@ class AgentState(BaseModel):
         )
 
 
+class AgentStateBatch:
+    """
+    The states of many agents stored column-wise as contiguous arrays of x, y, orientation and speed.
+    It can be passed to :func:`iai.drive`, :func:`iai.large_drive` and :func:`iai.initialize` in place of a
+    list of :class:`AgentState`, in which case the agent states in the response are also returned as an
+    AgentStateBatch. Indexing or iterating over the batch gives :class:`AgentState` objects, which are only
+    built on first access, while slicing gives a new AgentStateBatch. A batch should not be modified in place.
+
+    See Also
+    --------
+    AgentState
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        orientation: np.ndarray,
+        speed: np.ndarray
+    ):
+        self.x = np.ascontiguousarray(x, dtype=np.float64) #: Center x coordinates of all agents in meters.
+        self.y = np.ascontiguousarray(y, dtype=np.float64) #: Center y coordinates of all agents in meters.
+        self.orientation = np.ascontiguousarray(orientation, dtype=np.float64) #: Orientations of all agents in radians.
+        self.speed = np.ascontiguousarray(speed, dtype=np.float64) #: Speeds of all agents in meters per second.
+        if not (self.x.ndim == 1 and self.x.shape == self.y.shape == self.orientation.shape == self.speed.shape):
+            raise InvalidInput("All columns of an AgentStateBatch must be one dimensional and of equal length.")
+        self._agent_states = None
+
+    @classmethod
+    def fromlist(cls, l):
+        """
+        Build AgentStateBatch from a list (or array of shape (N, 4)) of agent states with this order: [x, y, orientation, speed]
+        """
+        states = np.asarray(l, dtype=np.float64).reshape(-1, 4)
+        return cls(
+            x=states[:, 0],
+            y=states[:, 1],
+            orientation=states[:, 2],
+            speed=states[:, 3]
+        )
+
+    @classmethod
+    def from_agent_states(cls, agent_states: List[AgentState]):
+        """
+        Build AgentStateBatch from a list of :class:`AgentState`.
+        """
+        if isinstance(agent_states, cls):
+            return agent_states
+        return cls.fromlist([state.tolist() for state in agent_states])
+
+    @classmethod
+    def concatenate(cls, batches: List["AgentStateBatch"]):
+        """
+        Join several batches into a single batch in the given order.
+        """
+        return cls.fromlist(np.concatenate([batch.toarray() for batch in batches], axis=0))
+
+    def toarray(self) -> np.ndarray:
+        """
+        Convert AgentStateBatch to an array of shape (N, 4) with columns in this order: [x, y, orientation, speed]
+        """
+        return np.stack([self.x, self.y, self.orientation, self.speed], axis=1)
+
+    def tolist(self):
+        """
+        Convert AgentStateBatch to a list of flattened agent states, each in this order: [x, y, orientation, speed]
+        """
+        return self.toarray().tolist()
+
+    def to_agent_states(self) -> List[AgentState]:
+        """
+        Convert AgentStateBatch to a list of :class:`AgentState`. The list is built once and cached.
+        """
+        if self._agent_states is None:
+            self._agent_states = [AgentState.fromlist(state) for state in self.tolist()]
+        return self._agent_states
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.to_agent_states()[index]
+        return AgentStateBatch(
+            x=self.x[index],
+            y=self.y[index],
+            orientation=self.orientation[index],
+            speed=self.speed[index]
+        )
+
+    def __iter__(self):
+        return iter(self.to_agent_states())
+
+    def __repr__(self):
+        return f"AgentStateBatch(num_agents={len(self)})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda batch: batch.tolist())
+        )
+
+
 class InfractionIndicators(BaseModel):
     """
     Infractions committed by a given agent, as returned from :func:`iai.drive`.
@@ -299,8 +528,15 @@ class InfractionIndicators(BaseModel):
     wrong_way: bool  #: CURRENTLY DISABLED. True if the cross product of the agent's and its lanelet's directions is negative.
 
     @classmethod
-    def fromlist(cls, l):
+    def fromlist(cls, l, trusted: bool = False):
         collisions, offroad, wrong_way = l
+        if trusted:
+            return _construct(
+                cls,
+                collisions=collisions,
+                offroad=offroad,
+                wrong_way=wrong_way
+            )
         return cls(
             collisions=collisions, 
             offroad=offroad, 
@@ -332,15 +568,24 @@ class StaticMapActor(BaseModel):
     dependant: Optional[List[int]]  # : List of ID's of other actors that are dependant to this actor.
 
     @classmethod
-    def fromdict(cls, d):
+    def fromdict(cls, d, trusted: bool = False):
         """
         Build StaticMapActor from a dictionary
         with keys: `actor_id`, `agent_type`, `orientation`, `length`, `width`, `x`, `y`, `dependant`
         """
         d = d.copy()
-        d["center"] = Point.fromlist([d.pop("x"), d.pop("y")])
+        d["center"] = Point.fromlist([d.pop("x"), d.pop("y")], trusted=trusted)
+        if trusted:
+            return _construct(cls, **d)
         return cls(**d)
 
 
 TrafficLightStatesDict = Dict[TrafficLightId, TrafficLightState]
 LightRecurrentStates = List[LightRecurrentState]
+
+
+def _deserialize_traffic_lights_states(traffic_lights_states: dict, trusted: bool = False):
+    # JSON object keys are always strings, so without validation the light IDs have to be converted here.
+    if trusted:
+        return {int(actor_id): TrafficLightState(state) for actor_id, state in traffic_lights_states.items()}
+    return traffic_lights_states
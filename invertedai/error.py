@@ -45,7 +45,7 @@ class InvertedAIError(Exception):
         return self._message
 
     def __repr__(self):
-        return "%s(message=%r, http_status=%r, request_id=%r)" % (
+        return "%s(message=%r, http_status=%r)" % (
             self.__class__.__name__,
             self._message,
             self.http_status,
@@ -116,7 +116,7 @@ class InvalidRequestError(InvertedAIError):
         self.param = param
 
     def __repr__(self):
-        return "%s(message=%r, param=%r, code=%r, http_status=%r, " "request_id=%r)" % (
+        return "%s(message=%r, param=%r, code=%r, http_status=%r)" % (
             self.__class__.__name__,
             self._message,
             self.param,
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import tempfile
+import lanelet2
+import numpy as np
+
+from invertedai.common import LocationMap, Point
+
+MAP_CONTEXT_CACHE_SIZE = 8
+
+# Contexts of the maps parsed from location info responses, keyed by the map source and the origin
+_map_contexts: "OrderedDict[Tuple[str,float,float], LaneletMapContext]" = OrderedDict()
+# Context of the last lanelet map passed directly to the waypoint helpers
+_last_lanelet_map_context: "Optional[LaneletMapContext]" = None
+
+
+class LaneletMapContext:
+    """
+    A projected lanelet map of a location together with the traffic rules and routing graph used to plan
+    routes on it. Building the routing graph is the most expensive step of route generation, so it is built
+    on first use and shared by all routes generated with this context. Lanelets are looked up by id in an
+    index, and the centerline of each lanelet is converted to an array with its cumulative arc lengths the
+    first time it is used.
+    """
+
+    def __init__(
+        self,
+        lanelet_map: lanelet2.core.LaneletMap
+    ):
+        self.lanelet_map = lanelet_map
+        self.traffic_rules = lanelet2.traffic_rules.create(
+            lanelet2.traffic_rules.Locations.Germany,
+            lanelet2.traffic_rules.Participants.Vehicle
+        )
+        self._routing_graph = None
+        self._lanelets: Optional[Dict[int,lanelet2.core.Lanelet]] = None
+        self._centerlines: Dict[int,Tuple[np.ndarray,np.ndarray]] = {}
+
+    @property
+    def routing_graph(self) -> lanelet2.routing.RoutingGraph:
+        if self._routing_graph is None:
+            self._routing_graph = lanelet2.routing.RoutingGraph(self.lanelet_map, self.traffic_rules)
+        return self._routing_graph
+
+    def get_lanelet(
+        self,
+        lanelet_id: int
+    ) -> Optional[lanelet2.core.Lanelet]:
+        """
+        Return the lanelet with the given id, or None if the map has no such lanelet.
+        """
+
+        if self._lanelets is None:
+            self._lanelets = {lanelet.id: lanelet for lanelet in self.lanelet_map.laneletLayer}
+        return self._lanelets.get(lanelet_id)
+
+    def get_centerline(
+        self,
+        lanelet_id: int
+    ) -> Tuple[np.ndarray,np.ndarray]:
+        """
+        Return the centerline points of the lanelet with the given id as an array of shape (N,2), together
+        with the arc length along the centerline at each point.
+        """
+
+        centerline = self._centerlines.get(lanelet_id)
+        if centerline is None:
+            lanelet = self.get_lanelet(lanelet_id)
+            if lanelet is None:
+                raise ValueError(f"Lanelet {lanelet_id} does not exist in the map.")
+            points = np.array([[point.x, point.y] for point in lanelet.centerline], dtype=float).reshape(-1, 2)
+            deltas = np.diff(points, axis=0)
+            arc_lengths = np.concatenate(([0.0], np.cumsum(np.hypot(deltas[:, 0], deltas[:, 1]))))
+            centerline = points, arc_lengths
+            self._centerlines[lanelet_id] = centerline
+        return centerline
+
+
+def load_lanelet_map(
+    osm_map: LocationMap,
+    origin: Optional[Point] = None
+) -> lanelet2.core.LaneletMap:
+    """
+    Parse a lanelet map from its OSM source, projected with a UTM projector around the given origin or
+    around the origin of the map if none is given.
+    """
+
+    with tempfile.NamedTemporaryFile(suffix=".osm", delete=True) as tmp:
+        osm_map.save_osm_file(tmp.name)
+        tmp.flush()
+        origin_x = origin.x if origin else osm_map.origin.x
+        origin_y = origin.y if origin else osm_map.origin.y
+        projector = lanelet2.projection.UtmProjector(
+            lanelet2.io.Origin(origin_x, origin_y)
+        )
+        return lanelet2.io.load(tmp.name, projector)
+
+
+def get_map_context(
+    osm_map: LocationMap,
+    origin: Optional[Point] = None
+) -> LaneletMapContext:
+    """
+    Return the context of the lanelet map parsed from the given OSM source, parsing it only the first time.
+    The contexts of the most recently used maps are kept, so repeated calls for the same location share
+    the same lanelet map and routing graph, which must therefore not be modified.
+    """
+
+    origin_x = origin.x if origin else osm_map.origin.x
+    origin_y = origin.y if origin else osm_map.origin.y
+    key = (hashlib.sha256(osm_map.encoded_map.encode()).hexdigest(), origin_x, origin_y)
+    context = _map_contexts.get(key)
+    if context is None:
+        context = LaneletMapContext(load_lanelet_map(osm_map, origin=origin))
+        _map_contexts[key] = context
+        if len(_map_contexts) > MAP_CONTEXT_CACHE_SIZE:
+            _map_contexts.popitem(last=False)
+    _map_contexts.move_to_end(key)
+    return context
+
+
+def get_lanelet_map_context(
+    lanelet_map: lanelet2.core.LaneletMap
+) -> LaneletMapContext:
+    """
+    Return the context of an already projected lanelet map. Maps obtained from :func:`get_map_context` and
+    the last map passed to this function reuse their context, other maps get a new one.
+    """
+
+    global _last_lanelet_map_context
+    for context in _map_contexts.values():
+        if context.lanelet_map is lanelet_map:
+            return context
+    if _last_lanelet_map_context is None or _last_lanelet_map_context.lanelet_map is not lanelet_map:
+        _last_lanelet_map_context = LaneletMapContext(lanelet_map)
+    return _last_lanelet_map_context
@@ -1,22 +1,139 @@
-from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
 import lanelet2
+import os
 import random
 import numpy as np
 
-from invertedai.common import AgentState, Point
+from invertedai.common import AgentState, Point, LocationMap
+from invertedai.helpers.map_context import LaneletMapContext, get_lanelet_map_context, get_map_context
+
+ROUTE_SAMPLING_BATCH_SIZE = 64
+
+
+def _get_map_context(
+    lanelet_map: Union[lanelet2.core.LaneletMapLayers, LaneletMapContext]
+) -> LaneletMapContext:
+    if isinstance(lanelet_map, LaneletMapContext):
+        return lanelet_map
+    return get_lanelet_map_context(lanelet_map)
+
+def _get_route_centerline(
+    start_state: AgentState,
+    map_context: LaneletMapContext,
+    lane_ids: List[int]
+) -> Optional[Tuple[np.ndarray,np.ndarray]]:
+    # Centerline points of the route ahead of the start state and the arc length at each point, or None if
+    # the route is already behind the start state
+    x, y, yaw = start_state.center.x, start_state.center.y, start_state.orientation
+    forward_vec = np.array([np.cos(yaw), np.sin(yaw)])
+    all_points, all_arc_lengths = [], []
+    route_length = 0.0
+    for i, lane_id in enumerate(lane_ids):
+        points, arc_lengths = map_context.get_centerline(lane_id)
+        if i == 0:
+            idx = int(np.argmin((points[:, 0] - x)**2 + (points[:, 1] - y)**2))
+            # check if the nearest point is in front of the given position and orientation
+            if np.dot(forward_vec, points[idx] - [x, y]) < 0:
+                idx = idx + 1 if idx < len(points) - 1 else len(points)
+            points, arc_lengths = points[idx:], arc_lengths[idx:] - arc_lengths[idx:idx + 1]
+            # check if the second point is already behind the current position
+            if len(points) > 1 and np.dot(forward_vec, points[1] - [x, y]) < 0:
+                return None
+        elif len(all_points) > 0:
+            # continue the arc length across the gap between consecutive centerlines
+            arc_lengths = arc_lengths + route_length + np.hypot(*(points[0] - all_points[-1][-1]))
+        if len(points) == 0:
+            continue
+        all_points.append(points)
+        all_arc_lengths.append(arc_lengths)
+        route_length = arc_lengths[-1]
+    if len(all_points) == 0:
+        return None
+    return np.concatenate(all_points), np.concatenate(all_arc_lengths)
+
+
+def generate_waypoints_from_lane_ids_batch(
+    start_states: List[AgentState],
+    lanelet_map: Union[lanelet2.core.LaneletMapLayers, LaneletMapContext],
+    all_lane_ids: List[List[int]],
+    waypoint_spacing: float = 15.0
+) -> List[List[Point]]:
+    """
+    Generates lists of waypoints for many agents at once, each from its own sequence of lane ids.
+    The centerlines of the lanelets are looked up in the map context, and the waypoints of all agents
+    are resampled along their routes with a single interpolation.
+
+    Args:
+        start_states (List[AgentState]): The starting state of each agent.
+        lanelet_map (Union[lanelet2.core.LaneletMapLayers, LaneletMapContext]): Projected lanelet map or its context.
+        all_lane_ids (List[List[int]]): Sequence of lane ids to follow for each agent.
+        waypoint_spacing (float): Spacing between the waypoints in meters. Defaults to 15.
+
+    Returns:
+        List[List[Point]]: List of waypoints for each agent to follow.
+    """
+    assert len(start_states) == len(all_lane_ids), "Expected one sequence of lane ids per start state"
+    assert all(len(lane_ids) >= 1 for lane_ids in all_lane_ids), "Expected the lane_ids to be populated"
+    map_context = _get_map_context(lanelet_map)
+
+    # Lay out the routes one after another along a single axis, separated by one meter
+    route_indices, route_points, route_arc_lengths, route_offsets, num_waypoints = [], [], [], [], []
+    offset = 0.0
+    for i, (start_state, lane_ids) in enumerate(zip(start_states, all_lane_ids)):
+        route_centerline = _get_route_centerline(start_state, map_context, lane_ids)
+        if route_centerline is None:
+            continue
+        points, arc_lengths = route_centerline
+        total_length = arc_lengths[-1]
+        num_points = int(np.ceil(total_length / waypoint_spacing)) + 1
+        if num_points < 2:
+            continue
+        route_indices.append(i)
+        route_points.append(points)
+        route_arc_lengths.append(arc_lengths + offset)
+        route_offsets.append((offset, total_length))
+        num_waypoints.append(num_points - 1)
+        offset += total_length + 1.0
+
+    all_waypoints = [[] for _ in start_states]
+    if len(route_indices) == 0:
+        return all_waypoints
+
+    num_waypoints = np.array(num_waypoints)
+    route_start, route_length = np.array(route_offsets).T
+    steps = np.arange(num_waypoints.sum()) - np.repeat(np.cumsum(num_waypoints) - num_waypoints, num_waypoints) + 1
+    distances = np.repeat(route_start, num_waypoints) + steps / np.repeat(num_waypoints, num_waypoints) * np.repeat(route_length, num_waypoints)
+    points = np.concatenate(route_points)
+    arc_lengths = np.concatenate(route_arc_lengths)
+    new_x = np.interp(distances, arc_lengths, points[:, 0]).tolist()
+    new_y = np.interp(distances, arc_lengths, points[:, 1]).tolist()
+
+    waypoint_index = 0
+    for i, num_points in zip(route_indices, num_waypoints.tolist()):
+        all_waypoints[i] = [
+            Point(x=x, y=y) for x, y in zip(
+                new_x[waypoint_index:waypoint_index + num_points],
+                new_y[waypoint_index:waypoint_index + num_points]
+            )
+        ]
+        waypoint_index += num_points
+    return all_waypoints
+
 
 def generate_waypoints_from_lane_ids(
     start_state: AgentState, 
-    lanelet_map: lanelet2.core.LaneletMapLayers, 
+    lanelet_map: Union[lanelet2.core.LaneletMapLayers, LaneletMapContext], 
     lane_ids: List[int], 
     waypoint_spacing: float = 15.0
 ) -> List[Point]:
     """
-    Generates a list of waypoints from a sequence of lane ids.
+    Generates a list of waypoints from a sequence of lane ids. To generate waypoints for many agents,
+    use :func:`generate_waypoints_from_lane_ids_batch` instead.
 
     Args:
         start_state (AgentState): The starting state of the agent.
-        lanelet_map (lanelet2.core.LaneletMapLayers): Projected lanelet map.
+        lanelet_map (Union[lanelet2.core.LaneletMapLayers, LaneletMapContext]): Projected lanelet map or its context.
         lane_ids (List[int]): Sequence of lane ids to follow.
         waypoint_spacing (float): Spacing between the waypoints in meters. Defaults to 15.
 
@@ -24,94 +141,53 @@ def generate_waypoints_from_lane_ids(
         List[Point]: List of waypoints for the agent to follow.
     """
     assert len(lane_ids) >= 1, "Expected the lane_ids to be populated"
-    def get_lanelet(id):
-        for l in lanelet_map.laneletLayer:
-            if l.id == id:
-                return l
-        return None
-
-    all_centerline_points = []
-    x, y, yaw = start_state.center.x, start_state.center.y, start_state.orientation
-    for i, lane_id in enumerate(lane_ids):
-        current_lanelet = get_lanelet(lane_id)
-        lane_centerline_points = [point for point in current_lanelet.centerline]
-        if i == 0:
-            distances = [(p.x-x)**2 + (p.y-y)**2 for p in lane_centerline_points]
-            idx = distances.index(min(distances))
-            # check if waypoints[idx] is in front of the given position and orientation
-            forward_vec = np.array([np.cos(yaw), np.sin(yaw)])
-            waypoint_vec = np.array([lane_centerline_points[idx].x, lane_centerline_points[idx].y]) - np.array([x, y])
-            dot_product = np.dot(forward_vec, waypoint_vec)
-            if dot_product < 0:
-                if idx < len(lane_centerline_points) - 1:
-                    idx += 1
-                else:
-                    idx = -1
-            if idx == -1:
-                lane_centerline_points = []
-            else:
-                lane_centerline_points = lane_centerline_points[idx:]
-            if len(lane_centerline_points) > 1:
-                # check if the second point is already behind the current position
-                second_point = lane_centerline_points[1]
-                forward_vec = np.array([np.cos(yaw), np.sin(yaw)])
-                waypoint_vec = np.array([second_point.x, second_point.y]) - np.array([x, y])
-                dot_product = np.dot(forward_vec, waypoint_vec)
-                if dot_product < 0:
-                    return []
-        all_centerline_points.extend(lane_centerline_points)
-    all_centerline_points = np.array([[point.x, point.y] for point in all_centerline_points])
-    deltas = np.diff(all_centerline_points, axis=0)
-    seg_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
-    total_length = np.sum(seg_lengths)
-    cumdist = np.concatenate(([0], np.cumsum(seg_lengths)))
-    num_points = int(np.ceil(total_length / waypoint_spacing)) + 1
-    if num_points < 2:
-        return []
-    new_distances = np.linspace(0, total_length, num_points)
-
-    new_x = np.interp(new_distances, cumdist, all_centerline_points[:, 0])[1:]
-    new_y = np.interp(new_distances, cumdist, all_centerline_points[:, 1])[1:]
-    waypoints = [Point(x=x, y=y) for x, y in zip(new_x, new_y)]
-
-    return waypoints
+    return generate_waypoints_from_lane_ids_batch([start_state], lanelet_map, [lane_ids], waypoint_spacing)[0]
     
 
 def generate_lane_ids_from_lanelet_map(
     start_state: AgentState, 
-    lanelet_map: lanelet2.core.LaneletMapLayers, 
+    lanelet_map: Union[lanelet2.core.LaneletMapLayers, LaneletMapContext], 
     target_distance: float = 600.0, 
-    waypoint: Optional[Point] = None
+    waypoint: Optional[Point] = None,
+    rng: Optional[random.Random] = None
 ) -> List[int]:
     """
     Generates a sequence of lane ids. If given a waypoint, it will generate the shortest possible route between
     current starting state and the specified waypoint. Otherwise, a random route will be generated that is at 
-    least `target_distance` long in meters unless there are no more lanes to follow.
+    least `target_distance` long in meters unless there are no more lanes to follow. When generating routes
+    for many agents, pass the context from :func:`LocationResponse.get_map_context` so that the routing graph
+    is built only once.
     
     Args:
         start_state (AgentState): The starting state of the agent.
-        lanelet_map (lanelet2.core.LaneletMapLayers): Projected lanelet map.
+        lanelet_map (Union[lanelet2.core.LaneletMapLayers, LaneletMapContext]): Projected lanelet map or its context.
         target_distance (float): Target distance in meters to generate. Ignored if waypoint is specified. Defaults to 600.
         waypoint (Optional[Point], optional): Desired final waypoint. Defaults to None.
+        rng (Optional[random.Random], optional): Random number generator used to choose the lanes. Defaults to
+            the global generator of the `random` module.
 
     Returns:
         List[int]: Sequence of lane ids to follow.
     """
     
-    traffic_rules = lanelet2.traffic_rules.create(lanelet2.traffic_rules.Locations.Germany,
-                                                    lanelet2.traffic_rules.Participants.Vehicle)
-    routing_graph = lanelet2.routing.RoutingGraph(lanelet_map, traffic_rules)
+    rng = random if rng is None else rng
+    map_context = _get_map_context(lanelet_map)
+    lanelet_map, routing_graph = map_context.lanelet_map, map_context.routing_graph
     x, y, yaw = start_state.center.x, start_state.center.y, start_state.orientation
     starting_lanelets = lanelet2.geometry.findWithin2d(lanelet_map.laneletLayer, lanelet2.core.BasicPoint2d(x, y), 0)
     filtered_lanelets = []
     for _, lanelet in starting_lanelets:
-        a, b = find_direction_and_nearest_points(lanelet.centerline, lanelet2.core.BasicPoint3d(x, y, 0))
-        lane_orientation = np.arctan2(b.y - a.y, b.x - a.x)
+        centerline = map_context.get_centerline(lanelet.id)[0]
+        segment_index = _find_nearest_segment(centerline, x, y)
+        if segment_index < 0:
+            raise ValueError('Failed to find direction of the linestring at a given point')
+        a, b = centerline[segment_index], centerline[segment_index + 1]
+        lane_orientation = np.arctan2(b[1] - a[1], b[0] - a[0])
         angle = np.absolute((yaw - lane_orientation + np.pi) % (2 * np.pi) - np.pi)
         if angle < 75 * np.pi / 180:
             filtered_lanelets.append(lanelet)
     if len(filtered_lanelets) > 0:
-        current_lanelet = random.choice(filtered_lanelets)
+        current_lanelet = rng.choice(filtered_lanelets)
     else:
         return []
     if waypoint is not None:
@@ -124,7 +200,7 @@ def generate_lane_ids_from_lanelet_map(
                     possible_routes.append(possible_route)
         if not possible_routes:
             return []
-        return [lanelet.id for lanelet in random.choice(possible_routes).shortestPath()]
+        return [lanelet.id for lanelet in rng.choice(possible_routes).shortestPath()]
     
     total_lane_distance = 0
     path = []
@@ -137,18 +213,213 @@ def generate_lane_ids_from_lanelet_map(
         total_lane_distance += lane_length
         reachable_lanelets = routing_graph.following(current_lanelet, withLaneChanges=False)
         if reachable_lanelets:
-            current_lanelet = random.choice(reachable_lanelets)
+            current_lanelet = rng.choice(reachable_lanelets)
         else:
             break
 
     return path
 
+def _get_agent_rng(
+    seed: int,
+    agent_index: int
+) -> random.Random:
+    # Depends only on the seed and the index of the agent, so routes do not depend on how agents are batched
+    return random.Random(f"{seed}:{agent_index}")
+
+
+_worker_map_context: Optional[LaneletMapContext] = None
+
+
+def _init_route_sampling_worker(
+    osm_map: LocationMap,
+    origin: Optional[Point]
+):
+    global _worker_map_context
+    _worker_map_context = get_map_context(osm_map, origin=origin)
+
+
+def _generate_lane_ids_for_agents(
+    agents: List[Tuple[int,AgentState,Optional[Point]]],
+    target_distance: float,
+    seed: int,
+    map_context: Optional[LaneletMapContext] = None
+) -> List[List[int]]:
+    map_context = _worker_map_context if map_context is None else map_context
+    return [
+        generate_lane_ids_from_lanelet_map(
+            start_state,
+            map_context,
+            target_distance=target_distance,
+            waypoint=waypoint,
+            rng=_get_agent_rng(seed, agent_index)
+        ) for agent_index, start_state, waypoint in agents
+    ]
+
+
+def generate_lane_ids_batch(
+    start_states: List[AgentState],
+    osm_map: LocationMap,
+    target_distance: float = 600.0,
+    waypoints: Optional[List[Optional[Point]]] = None,
+    seed: Optional[int] = None,
+    origin: Optional[Point] = None,
+    num_workers: Optional[int] = None,
+    batch_size: int = ROUTE_SAMPLING_BATCH_SIZE
+) -> List[List[int]]:
+    """
+    Generates a sequence of lane ids for each of many agents, as :func:`generate_lane_ids_from_lanelet_map`
+    does for one agent, in a pool of worker processes. Each worker parses the map once and then generates
+    routes for batches of agents. The lanes of each agent are chosen with its own random number generator,
+    seeded from `seed` and the index of the agent, so the routes are the same for any number of workers.
+    Since worker processes may import the calling module, scripts calling this function should guard their
+    entry point with `if __name__ == '__main__':`.
+
+    Args:
+        start_states (List[AgentState]): The starting state of each agent.
+        osm_map (LocationMap): Map source of the location, as returned in `LocationResponse.osm_map`.
+        target_distance (float): Target distance in meters to generate. Ignored for agents with a waypoint. Defaults to 600.
+        waypoints (Optional[List[Optional[Point]]], optional): Desired final waypoint of each agent. Defaults to None.
+        seed (Optional[int], optional): Seed of the routes. Defaults to a seed drawn from the global generator
+            of the `random` module.
+        origin (Optional[Point], optional): Origin of the projection of the map. Defaults to the origin of the map.
+        num_workers (Optional[int], optional): Number of worker processes. If 1 or less, the routes are generated
+            in the calling process. Defaults to the number of CPUs.
+        batch_size (int): Number of agents sent to a worker at a time. Defaults to 64.
+
+    Returns:
+        List[List[int]]: Sequence of lane ids to follow for each agent.
+    """
+    if waypoints is not None:
+        assert len(waypoints) == len(start_states), "Expected one waypoint per start state"
+    seed = random.getrandbits(64) if seed is None else seed
+    num_workers = os.cpu_count() if num_workers is None else num_workers
+    agents = [
+        (agent_index, start_state, waypoints[agent_index] if waypoints is not None else None)
+        for agent_index, start_state in enumerate(start_states)
+    ]
+
+    if num_workers <= 1 or len(agents) <= batch_size:
+        return _generate_lane_ids_for_agents(agents, target_distance, seed, map_context=get_map_context(osm_map, origin=origin))
+
+    batches = [agents[i:i+batch_size] for i in range(0, len(agents), batch_size)]
+    with ProcessPoolExecutor(
+        max_workers=min(num_workers, len(batches)),
+        initializer=_init_route_sampling_worker,
+        initargs=(osm_map, origin)
+    ) as executor:
+        batch_lane_ids = executor.map(
+            _generate_lane_ids_for_agents,
+            batches,
+            [target_distance] * len(batches),
+            [seed] * len(batches)
+        )
+        return [lane_ids for batch in batch_lane_ids for lane_ids in batch]
+
+
+def _find_nearest_segments(
+    linestrings: List[np.ndarray],
+    points: np.ndarray
+) -> np.ndarray:
+    # For each linestring of shape (N,2) and the query point at the same index, find the two vertices nearest
+    # to the projection of the point onto the linestring. Returns the index of the first of the two vertices,
+    # or -1 where they are not consecutive.
+    lengths = np.array([len(linestring) for linestring in linestrings])
+    vertices = np.concatenate(linestrings).reshape(-1, 2)
+    vertex_query = np.repeat(np.arange(len(linestrings)), lengths)
+    first_vertex = np.cumsum(lengths) - lengths
+    vertex_index = np.arange(len(vertices)) - first_vertex[vertex_query]
+
+    # Project each point onto every segment of its linestring and keep the nearest projection
+    segments = np.flatnonzero(vertex_index < lengths[vertex_query] - 1)
+    segment_query = vertex_query[segments]
+    segment_start, segment_end = vertices[segments], vertices[segments + 1]
+    segment_vec = segment_end - segment_start
+    segment_length2 = np.einsum("ij,ij->i", segment_vec, segment_vec)
+    t = np.einsum("ij,ij->i", points[segment_query] - segment_start, segment_vec)
+    t = np.clip(np.divide(t, segment_length2, out=np.zeros_like(t), where=segment_length2 > 0), 0.0, 1.0)
+    projections = segment_start + t[:, None] * segment_vec
+    projection_distance2 = np.sum((points[segment_query] - projections)**2, axis=1)
+    order = np.lexsort((segments, projection_distance2, segment_query))
+    has_segment = lengths > 1
+    nearest_projection = np.full((len(linestrings), 2), np.nan)
+    nearest_projection[has_segment] = projections[order[np.searchsorted(segment_query[order], np.flatnonzero(has_segment))]]
+
+    # Find the two vertices nearest to the projection, the earlier vertex first among equally distant ones
+    vertex_distance2 = np.sum((vertices - nearest_projection[vertex_query])**2, axis=1)
+    order = np.lexsort((vertex_index, vertex_distance2, vertex_query))
+    segment_index = np.full(len(linestrings), -1)
+    closest = vertex_index[order[first_vertex[has_segment]]]
+    second_closest = vertex_index[order[first_vertex[has_segment] + 1]]
+    segment_index[has_segment] = np.where(np.abs(closest - second_closest) == 1, np.minimum(closest, second_closest), -1)
+    return segment_index
+
+
+def _find_nearest_segment(
+    linestring: np.ndarray,
+    x: float,
+    y: float
+) -> int:
+    # Same as _find_nearest_segments for a single linestring, with less overhead
+    if len(linestring) < 2:
+        return -1
+    location = np.array([x, y])
+    segment_start, segment_vec = linestring[:-1], np.diff(linestring, axis=0)
+    segment_length2 = np.einsum("ij,ij->i", segment_vec, segment_vec)
+    t = np.einsum("ij,ij->i", location - segment_start, segment_vec)
+    t = np.clip(np.divide(t, segment_length2, out=np.zeros_like(t), where=segment_length2 > 0), 0.0, 1.0)
+    projections = segment_start + t[:, None] * segment_vec
+    projected_reference = projections[np.argmin(np.sum((location - projections)**2, axis=1))]
+    closest_point_idx, second_closest_point_idx = np.argsort(
+        np.sum((linestring - projected_reference)**2, axis=1), kind="stable"
+    )[:2].tolist()
+    if not abs(closest_point_idx - second_closest_point_idx) == 1:
+        return -1
+    return min(closest_point_idx, second_closest_point_idx)
+
+
+def find_direction_and_nearest_points_batch(
+    lanelet_map: Union[lanelet2.core.LaneletMapLayers, LaneletMapContext],
+    lanelet_ids: List[int],
+    points: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each lanelet id and a point near the centerline of that lanelet, finds the nearest 2 points of the
+    centerline in forward direction, as :func:`find_direction_and_nearest_points` does for one linestring.
+    All points are handled at once with array operations, using the centerlines cached in the map context.
+
+    Args:
+        lanelet_map (Union[lanelet2.core.LaneletMapLayers, LaneletMapContext]): Projected lanelet map or its context.
+        lanelet_ids (List[int]): Id of the lanelet whose centerline is checked for each point.
+        points (np.ndarray): Array of shape (N,2) holding the x,y coordinates of the points to check.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Arrays of shape (N,2) holding the nearest 2 points in forward direction
+        for each point, with NaN rows where the direction could not be found.
+    """
+    map_context = _get_map_context(lanelet_map)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    assert len(lanelet_ids) == len(points), "Expected one lanelet id per point"
+    if len(points) == 0:
+        return np.zeros((0, 2)), np.zeros((0, 2))
+
+    centerlines = {lanelet_id: map_context.get_centerline(lanelet_id)[0] for lanelet_id in set(lanelet_ids)}
+    linestrings = [centerlines[lanelet_id] for lanelet_id in lanelet_ids]
+    segment_index = _find_nearest_segments(linestrings, points)
+
+    point_a, point_b = np.full((len(points), 2), np.nan), np.full((len(points), 2), np.nan)
+    for i in np.flatnonzero(segment_index >= 0).tolist():
+        point_a[i] = linestrings[i][segment_index[i]]
+        point_b[i] = linestrings[i][segment_index[i] + 1]
+    return point_a, point_b
+
+
 def find_direction_and_nearest_points(
     linestring: lanelet2.core.ConstLineString3d, 
     location3d: lanelet2.core.BasicPoint3d
 ) -> Tuple[lanelet2.core.Point2d, lanelet2.core.Point2d]:
     """
     For a given linestring and a point near it, finds the nearest 2 points in forward direction.
+    Distances are measured in the x,y plane.
 
     Args:
         linestring (lanelet2.core.ConstLineString3d): Linestring to check.
@@ -160,27 +431,10 @@ def find_direction_and_nearest_points(
     Returns:
         Tuple[lanelet2.core.Point2d, lanelet2.core.Point2d]: The nearest 2 points in forward direction.
     """
-    projected_reference = lanelet2.geometry.project(linestring, location3d)
-    first, second = float("inf"), float("inf")
-    closest_point_idx, second_closest_point_idx = 0, 0
-
-    for i, point in enumerate(linestring):
-        point_dist = lanelet2.geometry.distance(projected_reference, point)
-        if point_dist < first:
-            second = first
-            first = point_dist
-            second_closest_point_idx = closest_point_idx
-            closest_point_idx = i
-        elif point_dist < second:
-            second = point_dist
-            second_closest_point_idx = i
+    linestring_points = np.array([[point.x, point.y] for point in linestring], dtype=float).reshape(-1, 2)
+    segment_index = _find_nearest_segment(linestring_points, location3d.x, location3d.y)
 
-    if not abs(closest_point_idx - second_closest_point_idx) == 1:
+    if segment_index < 0:
         raise ValueError('Failed to find direction of the linestring at a given point')
 
-    if closest_point_idx > second_closest_point_idx:
-        point_a, point_b = linestring[second_closest_point_idx], linestring[closest_point_idx]
-    else:
-        point_b, point_a = linestring[second_closest_point_idx], linestring[closest_point_idx]
-
-    return point_a, point_b
\ No newline at end of file
+    return linestring[segment_index], linestring[segment_index + 1]
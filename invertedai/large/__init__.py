@@ -1,2 +1,3 @@
-from invertedai.large.drive import large_drive
+from invertedai.large.drive import large_drive, large_drive_unchecked, async_large_drive, stream_large_drive, LargeDriveStream, RegionDriveResult, RegionCallMetrics
+from invertedai.large._quadtree import PartitionCost
 from invertedai.large.initialize import large_initialize, get_regions_default, get_regions_in_grid, get_number_of_agents_per_region_by_drivable_area
@@ -0,0 +1,97 @@
+from collections import defaultdict
+from math import floor, hypot
+from typing import Dict, List, Optional, Tuple
+
+from invertedai.large.common import Region
+from invertedai.common import AgentState
+
+AGENT_GRID_CELL_SIZE = 80.0
+
+
+class RegionAgentGrid:
+    """
+    A uniform grid over the agents placed in a list of regions, used to find the agents of other regions that
+    lie within the field of view of a region. Each grid cell maps a region index to the agents of that region
+    within the cell, so the agents of a single region can be replaced whenever that region is initialized.
+    The agents of each region are identified by their index within the agent states of that region.
+    """
+
+    def __init__(
+        self,
+        regions: List[Region],
+        cell_size: float = AGENT_GRID_CELL_SIZE
+    ):
+        self.cell_size = cell_size
+        self.region_centers = [(region.center.x, region.center.y) for region in regions]
+        self._cells: Dict[Tuple[int,int], Dict[int,List[Tuple[int,float,float]]]] = defaultdict(dict)
+        self._region_cells: List[List[Tuple[int,int]]] = [[] for _ in regions]
+        for region_index, region in enumerate(regions):
+            self.update_region(region_index, region.agent_states)
+
+    def _get_cell(self, x: float, y: float) -> Tuple[int,int]:
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def update_region(
+        self,
+        region_index: int,
+        agent_states: Optional[List[AgentState]]
+    ):
+        """
+        Replace the agents of a region by the given agent states.
+        """
+
+        for cell in self._region_cells[region_index]:
+            del self._cells[cell][region_index]
+            if len(self._cells[cell]) == 0:
+                del self._cells[cell]
+
+        region_cells = []
+        for agent_index, state in enumerate(agent_states or []):
+            cell = self._get_cell(state.center.x, state.center.y)
+            cell_agents = self._cells[cell].setdefault(region_index, [])
+            if len(cell_agents) == 0:
+                region_cells.append(cell)
+            cell_agents.append((agent_index, state.center.x, state.center.y))
+        self._region_cells[region_index] = region_cells
+
+    def query(
+        self,
+        center_x: float,
+        center_y: float,
+        fov: float,
+        exclude_index: Optional[int] = None,
+        max_region_distance: Optional[float] = None
+    ) -> List[Tuple[int,int]]:
+        """
+        Return the (region index, agent index) pairs of all agents strictly inside the square of side length `fov`
+        around the given center, ordered by region and then agent index. Agents of the region `exclude_index` and
+        of regions whose center is farther than `max_region_distance` from the given center are left out.
+        """
+
+        min_x, max_x = center_x - fov / 2, center_x + fov / 2
+        min_y, max_y = center_y - fov / 2, center_y + fov / 2
+        min_cell_x, min_cell_y = self._get_cell(min_x, min_y)
+        max_cell_x, max_cell_y = self._get_cell(max_x, max_y)
+
+        agent_ids = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                cell_agents = self._cells.get((cell_x, cell_y))
+                if cell_agents is None:
+                    continue
+                for region_index, agents in cell_agents.items():
+                    if region_index == exclude_index:
+                        continue
+                    agent_ids.extend(
+                        (region_index, agent_index) for agent_index, x, y in agents
+                        if min_x < x < max_x and min_y < y < max_y
+                    )
+
+        if max_region_distance is not None:
+            nearby_regions = {
+                region_index for region_index in {agent_id[0] for agent_id in agent_ids}
+                if hypot(self.region_centers[region_index][0] - center_x, self.region_centers[region_index][1] - center_y) <= max_region_distance
+            }
+            agent_ids = [agent_id for agent_id in agent_ids if agent_id[0] in nearby_regions]
+
+        return sorted(agent_ids)
@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import Dict, List, Optional
+
+import invertedai as iai
+from invertedai.large.common import Region
+from invertedai.api.initialize import InitializeResponse, _deserialize_initialize_response
+
+
+def get_checkpoint_fingerprint(
+    regions: List[Region],
+    **parameters
+) -> str:
+    """
+    Hash the regions to initialize, including their predefined agents, and all other parameters that affect the
+    result, so that a checkpoint is only resumed by a run with the same inputs.
+    """
+
+    inputs = dict(
+        regions=[
+            [
+                region.center.x,
+                region.center.y,
+                region.size,
+                [state.tolist() for state in region.agent_states],
+                [properties.serialize() for properties in region.agent_properties]
+            ] for region in regions
+        ],
+        **parameters
+    )
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _serialize_region_response(response: InitializeResponse) -> dict:
+    # Same format as the INITIALIZE responses of the server, without the birdview
+    return dict(
+        agent_states=[state.tolist() for state in response.agent_states],
+        agent_attributes=None,
+        agent_properties=[properties.serialize() for properties in response.agent_properties],
+        recurrent_states=[recurrent_state.packed for recurrent_state in response.recurrent_states],
+        birdview=None,
+        infraction_indicators=[infractions.tolist() for infractions in response.infractions] if response.infractions else [],
+        model_version=response.api_model_version,
+        traffic_lights_states=response.traffic_lights_states,
+        light_recurrent_states=[
+            light_recurrent_state.tolist() for light_recurrent_state in response.light_recurrent_states
+        ] if response.light_recurrent_states is not None else None
+    )
+
+
+class RegionCheckpoint:
+    """
+    An append-only file holding the responses of the regions completed so far by :func:`large_initialize`.
+    The file is a sequence of gzip members that each hold one JSON line: a header with the fingerprint of
+    the inputs, followed by one record per completed region. A record is appended as soon as a region is
+    completed, so an interrupted run loses at most the record being written, which is discarded on load.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fingerprint: str
+    ):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.region_responses: Dict[int,Optional[InitializeResponse]] = {}
+
+        records, is_complete = self._read_records()
+        if len(records) == 0 or records[0].get("fingerprint") != fingerprint:
+            if len(records) > 0:
+                iai.logger.warning(iai.logger.logfmt(
+                    "Checkpoint was written for different inputs, starting a new one", path=path
+                ))
+            self._write_records([])
+            return
+
+        if not is_complete:
+            # Drop the incomplete record so that new records can be appended after the last complete one
+            self._write_records(records[1:])
+        for record in records[1:]:
+            self.region_responses[record["region_index"]] = None if record["response"] is None \
+                else _deserialize_initialize_response(record["response"])
+        iai.logger.info(iai.logger.logfmt(
+            "Resuming from checkpoint", path=path, completed_regions=len(self.region_responses)
+        ))
+
+    def _read_records(self):
+        records = []
+        try:
+            with gzip.open(self.path, "rt") as f:
+                for line in f:
+                    records.append(json.loads(line))
+        except FileNotFoundError:
+            return records, True
+        except (EOFError, OSError, zlib.error, ValueError) as e:
+            iai.logger.debug(iai.logger.logfmt("Incomplete checkpoint record", path=self.path, error=e))
+            return records, False
+        return records, True
+
+    def _write_records(self, records: List[dict]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            with gzip.open(f, "wt") as gzip_file:
+                for record in [dict(fingerprint=self.fingerprint)] + records:
+                    gzip_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(f.name, self.path)
+
+    def append(
+        self,
+        region_index: int,
+        response: Optional[InitializeResponse]
+    ):
+        """
+        Record the response of a completed region, or None if the region was completed without a response.
+        """
+
+        record = dict(
+            region_index=region_index,
+            response=None if response is None else _serialize_region_response(response)
+        )
+        # Every append adds a new gzip member, which readers decompress as a continuation of the file
+        with gzip.open(self.path, "at") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.region_responses[region_index] = response
@@ -0,0 +1,226 @@
+import os
+import re
+import tempfile
+import time
+from math import ceil
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from tqdm.contrib import tenumerate
+
+import invertedai as iai
+from invertedai.api.config import get_cache_dir, get_location_info_cache_max_age
+
+DRIVABLE_AREA_PIXELS_PER_METER = 1
+DRIVABLE_AREA_TILE_SIZE = 200
+DRIVABLE_AREA_CACHE_SUBDIR = "drivable_area"
+
+
+class DrivableAreaMask:
+    """
+    A raster of the drivable area of a location, with DRIVABLE_AREA_PIXELS_PER_METER pixels per meter over the
+    area covered by the map. The raster is filled in lazily with square tiles of DRIVABLE_AREA_TILE_SIZE meters
+    rendered by :func:`location_info`, so only the parts of the map that are used are ever fetched. Row 0 of the
+    raster is the top of the map, as in the birdview images. Pixels outside the map are not drivable.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        version: str,
+        map_center: Tuple[float,float],
+        map_fov: float
+    ):
+        self.location = location
+        self.version = version
+        self.version_checked = time.time()
+        self.min_x = map_center[0] - map_fov / 2
+        self.max_y = map_center[1] + map_fov / 2
+        num_tiles = max(ceil(map_fov / DRIVABLE_AREA_TILE_SIZE), 1)
+        self.is_tile_fetched = np.zeros((num_tiles, num_tiles), dtype=bool)
+        num_pixels = ceil(map_fov * DRIVABLE_AREA_PIXELS_PER_METER)
+        self.mask = np.zeros((num_pixels, num_pixels), dtype=bool)
+        self._summed_area = None
+
+    def _get_pixel_bounds(self, centers: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray,...]:
+        # Pixel index ranges [row_start, row_end) x [col_start, col_end) of squares, not clipped to the raster
+        col_start = np.floor((centers[:,0] - sizes / 2 - self.min_x) * DRIVABLE_AREA_PIXELS_PER_METER).astype(int)
+        col_end = np.ceil((centers[:,0] + sizes / 2 - self.min_x) * DRIVABLE_AREA_PIXELS_PER_METER).astype(int)
+        row_start = np.floor((self.max_y - centers[:,1] - sizes / 2) * DRIVABLE_AREA_PIXELS_PER_METER).astype(int)
+        row_end = np.ceil((self.max_y - centers[:,1] + sizes / 2) * DRIVABLE_AREA_PIXELS_PER_METER).astype(int)
+        return row_start, row_end, col_start, col_end
+
+    def get_missing_tiles(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Return the (row, column) indexes of the tiles overlapping any of the given squares that were not fetched yet.
+        """
+
+        tile_pixels = DRIVABLE_AREA_TILE_SIZE * DRIVABLE_AREA_PIXELS_PER_METER
+        row_start, row_end, col_start, col_end = self._get_pixel_bounds(centers, sizes)
+        is_on_map = (row_end > 0) & (row_start < self.mask.shape[0]) & (col_end > 0) & (col_start < self.mask.shape[1])
+
+        num_tiles = self.is_tile_fetched.shape[0]
+        is_tile_needed = np.zeros_like(self.is_tile_fetched)
+        for tile_row_start, tile_row_end, tile_col_start, tile_col_end in zip(
+            np.clip(row_start[is_on_map] // tile_pixels, 0, num_tiles - 1),
+            np.clip((row_end[is_on_map] - 1) // tile_pixels, 0, num_tiles - 1),
+            np.clip(col_start[is_on_map] // tile_pixels, 0, num_tiles - 1),
+            np.clip((col_end[is_on_map] - 1) // tile_pixels, 0, num_tiles - 1)
+        ):
+            is_tile_needed[tile_row_start:tile_row_end+1, tile_col_start:tile_col_end+1] = True
+        return np.argwhere(is_tile_needed & ~self.is_tile_fetched)
+
+    def fetch_tiles(self, tiles: np.ndarray, display_progress_bar: bool = False):
+        """
+        Render the given tiles with :func:`location_info` and insert their drivable area into the raster.
+        """
+
+        tile_pixels = DRIVABLE_AREA_TILE_SIZE * DRIVABLE_AREA_PIXELS_PER_METER
+        if display_progress_bar:
+            iterable_tiles = tenumerate(tiles, total=len(tiles), desc=f"Fetching drivable area")
+        else:
+            iterable_tiles = enumerate(tiles)
+
+        for _, (tile_row, tile_col) in iterable_tiles:
+            birdview = iai.location_info(
+                location=self.location,
+                rendering_fov=DRIVABLE_AREA_TILE_SIZE,
+                rendering_center=(
+                    self.min_x + (tile_col + 0.5) * DRIVABLE_AREA_TILE_SIZE,
+                    self.max_y - (tile_row + 0.5) * DRIVABLE_AREA_TILE_SIZE
+                )
+            ).birdview_image.decode()
+            is_drivable = birdview.sum(axis=-1) != 0
+
+            # Resample the birdview to the resolution of the raster, cropping tiles at the edge of the map
+            tile_mask = self.mask[
+                tile_row*tile_pixels:(tile_row+1)*tile_pixels,
+                tile_col*tile_pixels:(tile_col+1)*tile_pixels
+            ]
+            pixel_index = (np.arange(tile_pixels) + 0.5) / tile_pixels
+            rows = (pixel_index[:tile_mask.shape[0]] * is_drivable.shape[0]).astype(int)
+            cols = (pixel_index[:tile_mask.shape[1]] * is_drivable.shape[1]).astype(int)
+            tile_mask[:] = is_drivable[np.ix_(rows, cols)]
+            self.is_tile_fetched[tile_row, tile_col] = True
+
+        self._summed_area = None
+
+    def get_drivable_area_ratios(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Return the fraction of drivable pixels within each of the squares with the given centers and side lengths.
+        """
+
+        if self._summed_area is None:
+            # Half the memory of int64 for any map with fewer pixels than int32 can count
+            dtype = np.int32 if self.mask.size <= np.iinfo(np.int32).max else np.int64
+            self._summed_area = np.zeros((self.mask.shape[0] + 1, self.mask.shape[1] + 1), dtype=dtype)
+            np.cumsum(self.mask, axis=0, dtype=dtype, out=self._summed_area[1:,1:])
+            np.cumsum(self._summed_area[1:,1:], axis=1, out=self._summed_area[1:,1:])
+
+        row_start, row_end, col_start, col_end = self._get_pixel_bounds(centers, sizes)
+        num_pixels = (row_end - row_start) * (col_end - col_start)
+        row_start, row_end = np.clip(row_start, 0, self.mask.shape[0]), np.clip(row_end, 0, self.mask.shape[0])
+        col_start, col_end = np.clip(col_start, 0, self.mask.shape[1]), np.clip(col_end, 0, self.mask.shape[1])
+        num_drivable_pixels = (
+            self._summed_area[row_end, col_end] - self._summed_area[row_start, col_end] -
+            self._summed_area[row_end, col_start] + self._summed_area[row_start, col_start]
+        )
+        return num_drivable_pixels / np.maximum(num_pixels, 1)
+
+    def save(self, path: str):
+        """
+        Write the raster to a compressed file, replacing any existing file only once it is fully written.
+        """
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".npz", delete=False) as f:
+            np.savez_compressed(
+                f,
+                version=self.version,
+                bounds=np.array([self.min_x, self.max_y]),
+                shape=np.array(self.mask.shape),
+                mask=np.packbits(self.mask),
+                is_tile_fetched=self.is_tile_fetched
+            )
+        os.replace(f.name, path)
+
+    def load(self, path: str) -> bool:
+        """
+        Read the tiles fetched so far from a file written by :func:`save`. Returns False and leaves the raster
+        unchanged if the file does not exist or belongs to a different map version or extent.
+        """
+
+        try:
+            with np.load(path) as data:
+                if (
+                    str(data["version"]) != self.version or
+                    not np.allclose(data["bounds"], [self.min_x, self.max_y]) or
+                    tuple(data["shape"]) != self.mask.shape or
+                    data["is_tile_fetched"].shape != self.is_tile_fetched.shape
+                ):
+                    return False
+                self.mask = np.unpackbits(data["mask"], count=self.mask.size).reshape(self.mask.shape).astype(bool)
+                self.is_tile_fetched = data["is_tile_fetched"]
+        except (OSError, KeyError, ValueError) as e:
+            iai.logger.debug(iai.logger.logfmt("Unable to load cached drivable area", path=path, error=e))
+            return False
+
+        self._summed_area = None
+        return True
+
+
+_drivable_area_masks: Dict[str, DrivableAreaMask] = {}
+
+
+def _get_cache_path(location: str, version: str) -> Optional[str]:
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{location}_{version}")
+    return os.path.join(cache_dir, DRIVABLE_AREA_CACHE_SUBDIR, f"{file_name}.npz")
+
+
+def get_drivable_area_ratios(
+    location: str,
+    centers: np.ndarray,
+    sizes: np.ndarray,
+    display_progress_bar: bool = False
+) -> np.ndarray:
+    """
+    Return the fraction of drivable surface within each of the square regions with the given centers and side
+    lengths. The drivable area of each location is kept in memory and cached on disk per map version, so that
+    :func:`location_info` is only called for the parts of the map that were never used before. The map version
+    of a location is checked with a single small rendering when the location is first used in a process and
+    again once the maximum age of cached location info set with :func:`use_location_info_cache` has passed.
+    """
+
+    mask = _drivable_area_masks.get(location)
+    max_age = get_location_info_cache_max_age()
+    if mask is None or (max_age is not None and time.time() - mask.version_checked > max_age):
+        location_response = iai.location_info(location=location, rendering_fov=DRIVABLE_AREA_TILE_SIZE)
+        if mask is not None and mask.version == location_response.version:
+            mask.version_checked = time.time()
+        else:
+            # The mask of another map version of the location is outdated
+            mask = DrivableAreaMask(
+                location=location,
+                version=location_response.version,
+                map_center=(location_response.map_center.x, location_response.map_center.y),
+                map_fov=location_response.map_fov
+            )
+            cache_path = _get_cache_path(location, mask.version)
+            if cache_path is not None:
+                mask.load(cache_path)
+            _drivable_area_masks[location] = mask
+
+    missing_tiles = mask.get_missing_tiles(centers, sizes)
+    if len(missing_tiles) > 0:
+        mask.fetch_tiles(missing_tiles, display_progress_bar=display_progress_bar)
+        cache_path = _get_cache_path(location, mask.version)
+        if cache_path is not None:
+            try:
+                mask.save(cache_path)
+            except OSError as e:
+                iai.logger.warning(iai.logger.logfmt("Unable to cache drivable area", path=cache_path, error=e))
+
+    return mask.get_drivable_area_ratios(centers, sizes)
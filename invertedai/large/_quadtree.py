@@ -1,154 +1,210 @@
-from typing import Optional
+from math import ceil
 
+import numpy as np
 from pydantic import BaseModel
 
-import invertedai as iai
-from invertedai.large.common import Region
-from invertedai.common import Point, AgentState, AgentProperties, RecurrentState
+from invertedai.error import InvertedAIError
 
 BUFFER_FOV = 35
 QUADTREE_SIZE_BUFFER = 1
+QUADTREE_MINIMUM_SIZE = 1
+REGION_COMBINATION_WINDOW = 16
 
 
-class QuadTreeAgentInfo(BaseModel):
+class QuadTreeNode:
     """
-    All information relevant to a single agent.
-
-    See Also
-    --------
-    AgentState
-    AgentProperties
-    RecurrentState
+    A node of the quadtree built by :func:`build_quadtree`, covering a square region of the map.
     """
 
-    agent_state: AgentState
-    recurrent_state: Optional[RecurrentState] = None
-    agent_properties: AgentProperties
-    agent_id: int
-
-    def tolist(self):
-        return [self.agent_state, self.agent_properties, self.recurrent_state, self.agent_id]
-
-    @classmethod
-    def fromlist(cls, l):
-        agent_state, agent_properties, recurrent_state, agent_id = l
-        return cls(agent_state=agent_state, agent_properties=agent_properties, recurrent_state=recurrent_state, agent_id=agent_id)
-
-
-class QuadTree:
     def __init__(
-        self, 
-        capacity: int, 
-        region: Region, 
+        self,
+        center_x: float,
+        center_y: float,
+        size: float
     ):
-        self.capacity = capacity
-        self.region = region
-        self.leaf = True
-        self.northWest = None
-        self.northEast = None
-        self.southWest = None
-        self.southEast = None
-
-        self.region_buffer = Region.create_square_region(
-            center=self.region.center,
-            size=self.region.size+2*BUFFER_FOV
-        )
-        self.particles = []
-        self.particles_buffer = []
+        self.center_x = center_x
+        self.center_y = center_y
+        self.size = size
+        self.children = None
+
+    @property
+    def leaf(self):
+        return self.children is None
 
     def subdivide(self):
-        parent = self.region
-        new_size = self.region.size/2
+        new_size = self.size/2
         new_center_dist = new_size/2
-        parent_x = parent.center.x
-        parent_y = parent.center.y
-
-        region_nw = Region.create_square_region(
-            center=Point.fromlist([parent_x-new_center_dist,parent_y+new_center_dist]),
-            size=new_size
-        )
-        region_ne = Region.create_square_region(
-            center=Point.fromlist([parent_x+new_center_dist,parent_y+new_center_dist]),
-            size=new_size
-        )
-        region_sw = Region.create_square_region(
-            center=Point.fromlist([parent_x-new_center_dist,parent_y-new_center_dist]),
-            size=new_size
-        )
-        region_se = Region.create_square_region(
-            center=Point.fromlist([parent_x+new_center_dist,parent_y-new_center_dist]),
-            size=new_size
-        )
-
-        self.northWest = QuadTree(self.capacity,region_nw)
-        self.northEast = QuadTree(self.capacity,region_ne)
-        self.southWest = QuadTree(self.capacity,region_sw)
-        self.southEast = QuadTree(self.capacity,region_se)
-
-        self.leaf = False
-        self.region.clear_agents()
-        self.region_buffer.clear_agents()
-
-        for particle in self.particles:
-            is_inserted = self.insert_particle_in_leaf_nodes(particle,False)
-        for particle in self.particles_buffer:
-            is_inserted = self.insert_particle_in_leaf_nodes(particle,True)
-        self.particles = []
-        self.particles_buffer = []
-        
-    def insert_particle_in_leaf_nodes(self,particle,is_inserted):
-        is_inserted_in_this_branch = self.northWest.insert(particle,is_inserted)
-        is_inserted_in_this_branch = self.northEast.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
-        is_inserted_in_this_branch = self.southWest.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
-        is_inserted_in_this_branch = self.southEast.insert(particle,is_inserted_in_this_branch or is_inserted) or is_inserted_in_this_branch
-
-        return is_inserted_in_this_branch
-
-    def insert(self, particle, is_particle_placed=False):
-        is_in_region = self.region.is_inside(particle.agent_state.center)
-        is_in_buffer = self.region_buffer.is_inside(particle.agent_state.center)
-
-        if (not is_in_region) and (not is_in_buffer):
-            return False
-
-        if (len(self.particles) + len(self.particles_buffer)) < self.capacity and self.leaf:
-            if is_in_region and not is_particle_placed:
-                self.particles.append(particle)
-                self.region.insert_all_agent_details(*particle.tolist()[:-1])
-                return True
-
-            else: # Particle is within the buffer region of this leaf node
-                self.particles_buffer.append(particle)
-                self.region_buffer.insert_all_agent_details(*particle.tolist()[:-1])
-                return False
-
-        else:
-            if self.leaf:
-                self.subdivide()
-
-            is_inserted = self.insert_particle_in_leaf_nodes(particle,is_particle_placed)
+        self.children = [
+            QuadTreeNode(self.center_x-new_center_dist,self.center_y+new_center_dist,new_size),
+            QuadTreeNode(self.center_x+new_center_dist,self.center_y+new_center_dist,new_size),
+            QuadTreeNode(self.center_x-new_center_dist,self.center_y-new_center_dist,new_size),
+            QuadTreeNode(self.center_x+new_center_dist,self.center_y-new_center_dist,new_size)
+        ]
+
+
+def _get_root_node(x, y):
+    max_x, min_x, max_y, min_y = x.max(), x.min(), y.max(), y.min()
+    region_size = ceil(max(max_x - min_x, max_y - min_y)) + QUADTREE_SIZE_BUFFER
+    return QuadTreeNode(
+        center_x=round((max_x+min_x)/2),
+        center_y=round((max_y+min_y)/2),
+        size=region_size
+    )
+
+def _is_inside_nodes(x, y, center_x, center_y, size, margin=0.0):
+    # Same arithmetic as Region.is_inside so that agents on a boundary are treated identically
+    half_size = (size+2*margin)/2
+    return (center_x - half_size <= x) & (x <= center_x + half_size) & (center_y - half_size <= y) & (y <= center_y + half_size)
+
+def build_quadtree(
+    x: np.ndarray,
+    y: np.ndarray,
+    node: QuadTreeNode,
+    agent_ids: np.ndarray,
+    capacity: int,
+    buffer_fov: float = BUFFER_FOV
+):
+    """
+    Subdivide `node` until no leaf node holds more than `capacity` agents within its region and buffer, using
+    vectorized operations over the arrays of agent positions `x` and `y` instead of inserting agents one at a time.
+    The resulting leaf nodes are the same as those of a quadtree built by inserting the agents one at a time: a node
+    is subdivided if and only if more than `capacity` of the agents in `agent_ids` lie within its buffer, and each
+    agent belongs to the first leaf node in depth-first order whose region contains it.
+
+    Returns the leaf nodes in depth-first order, the ids of all agents within the buffer of each leaf node in
+    ascending order, and for each leaf node a mask over those ids marking the agents that belong to it.
+    """
+    agent_ids = np.asarray(agent_ids, dtype=np.int64)
+    leaf_nodes, leaf_agent_ids = [], []
+    nodes = [(node, agent_ids)]
+    while nodes:
+        node, agent_ids = nodes.pop()
+        if len(agent_ids) <= capacity:
+            leaf_nodes.append(node)
+            leaf_agent_ids.append(agent_ids)
+            continue
+        if node.size/2 < QUADTREE_MINIMUM_SIZE:
+            raise InvertedAIError(message=f"Unable to divide agents into regions: too many agents are within {buffer_fov} metres of each other.")
+        node.subdivide()
+        node_x, node_y = x[agent_ids], y[agent_ids]
+        for child in reversed(node.children):
+            nodes.append((child, agent_ids[_is_inside_nodes(node_x, node_y, child.center_x, child.center_y, child.size, buffer_fov)]))
+
+    if not leaf_nodes:
+        return leaf_nodes, leaf_agent_ids, []
+
+    num_leaf_agents = [len(ids) for ids in leaf_agent_ids]
+    leaf_index = np.repeat(np.arange(len(leaf_nodes)), num_leaf_agents)
+    all_agent_ids = np.concatenate(leaf_agent_ids)
+    center_x = np.array([leaf_node.center_x for leaf_node in leaf_nodes], dtype=np.float64)[leaf_index]
+    center_y = np.array([leaf_node.center_y for leaf_node in leaf_nodes], dtype=np.float64)[leaf_index]
+    size = np.array([leaf_node.size for leaf_node in leaf_nodes], dtype=np.float64)[leaf_index]
+    all_x, all_y = x[all_agent_ids], y[all_agent_ids]
+
+    # The home of an agent is its first occurrence among the leaf nodes whose region contains it
+    is_in_region = _is_inside_nodes(all_x, all_y, center_x, center_y, size)
+    in_region_index = np.flatnonzero(is_in_region)
+    placed_ids, first_index = np.unique(all_agent_ids[in_region_index], return_index=True)
+    is_home = np.zeros(len(all_agent_ids), dtype=bool)
+    is_home[in_region_index[first_index]] = True
+
+    # Rounding can leave an agent exactly on a boundary outside of all leaf nodes, in which case
+    # it belongs to the leaf node whose region is closest
+    for agent_id in np.setdiff1d(np.unique(all_agent_ids), placed_ids, assume_unique=True):
+        agent_index = np.flatnonzero(all_agent_ids == agent_id)
+        distance = np.maximum(np.abs(all_x[agent_index] - center_x[agent_index]), np.abs(all_y[agent_index] - center_y[agent_index])) - size[agent_index]/2
+        is_home[agent_index[np.argmin(distance)]] = True
+
+    leaf_is_home = np.split(is_home, np.cumsum(num_leaf_agents)[:-1])
+    return leaf_nodes, leaf_agent_ids, leaf_is_home
+
+def partition_agents(
+    x: np.ndarray,
+    y: np.ndarray,
+    capacity: int,
+    buffer_fov: float = BUFFER_FOV
+):
+    """
+    Divide agents at positions `x` and `y` into the regions of a quadtree with the given leaf node capacity,
+    equivalent to inserting all agents one at a time into a quadtree covering their bounding box. Returns a list
+    with an entry for each leaf node in depth-first order holding an array of the ids of the agents that
+    belong to the leaf node and an array of the ids of the agents within its buffer, both in ascending order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    _, leaf_agent_ids, leaf_is_home = build_quadtree(
+        x=x,
+        y=y,
+        node=_get_root_node(x, y),
+        agent_ids=np.arange(len(x)),
+        capacity=capacity,
+        buffer_fov=buffer_fov
+    )
+    return [(agent_ids[is_home], agent_ids[~is_home]) for agent_ids, is_home in zip(leaf_agent_ids, leaf_is_home)]
+
+
+class PartitionCost(BaseModel):
+    """
+    The cost of driving all agents with the given division into regions, one :func:`drive` call per region.
+    """
 
-            return is_inserted
+    num_calls: int #: Number of :func:`drive` calls, one for each region containing at least one agent.
+    num_agents_sent: int #: Total number of agents in all calls, counting agents in the buffer of a region again in every call they are part of.
+    max_agents_per_call: int #: Largest number of agents in a single call.
 
-    def get_regions(self):
-        if self.leaf:
-            return [self.region]
-        else:
-            return self.northWest.get_regions() + self.northEast.get_regions() + \
-                self.southWest.get_regions() + self.southEast.get_regions()
+    @classmethod
+    def fromregions(cls, region_agent_ids):
+        """
+        Compute the cost of a list of (region agent ids, buffer agent ids) as returned by :func:`partition_agents`.
+        Regions without any agents of their own are skipped since they do not need a call.
+        """
+        num_agents_per_call = [len(agent_ids) + len(buffer_agent_ids) for agent_ids, buffer_agent_ids in region_agent_ids if len(agent_ids) > 0]
+        return cls(
+            num_calls=len(num_agents_per_call),
+            num_agents_sent=sum(num_agents_per_call),
+            max_agents_per_call=max(num_agents_per_call, default=0)
+        )
 
-    def get_leaf_nodes(self):
-        if self.leaf:
-            return [self]
+def combine_regions(
+    region_agent_ids,
+    capacity: int,
+    window: int = REGION_COMBINATION_WINDOW
+):
+    """
+    Combine regions such that fewer :func:`drive` calls are needed, while no call holds more than `capacity` agents.
+    Regions are visited in the given order, which for quadtree leaf nodes in depth-first order keeps nearby regions
+    close together, and each region is added to the one of the last `window` combined regions with enough space
+    that grows the least, counting agents shared with it only once. Since neighbouring regions share the agents in
+    their buffers, combining them also reduces the total number of agents sent. A new combined region is started if
+    none of them has enough space.
+
+    Takes and returns a list of (region agent ids, buffer agent ids) as returned by :func:`partition_agents`, where
+    the agents of a combined region are those of all regions in it and its buffer consists of all agents in any of
+    their buffers that do not belong to a combined region themselves.
+    """
+    combined_agent_ids = []
+    combined_all_agent_ids = []
+    for agent_ids, buffer_agent_ids in region_agent_ids:
+        if len(agent_ids) == 0:
+            continue
+        all_agent_ids = set(agent_ids.tolist())
+        all_agent_ids.update(buffer_agent_ids.tolist())
+
+        best_index, best_num_added = None, None
+        for index in range(max(len(combined_agent_ids) - window, 0), len(combined_agent_ids)):
+            num_added = len(all_agent_ids - combined_all_agent_ids[index])
+            if len(combined_all_agent_ids[index]) + num_added <= capacity and (best_num_added is None or num_added < best_num_added):
+                best_index, best_num_added = index, num_added
+        if best_index is None:
+            combined_agent_ids.append([agent_ids])
+            combined_all_agent_ids.append(all_agent_ids)
         else:
-            return self.northWest.get_leaf_nodes() + self.northEast.get_leaf_nodes() + \
-                self.southWest.get_leaf_nodes() + self.southEast.get_leaf_nodes()
-
-    def get_number_of_agents_in_node(self):
-        return len(self.particles)
-
-def _flatten_and_sort(nested_list,index_list):
-    flat_list = [x for sublist in nested_list for x in sublist]
-    sorted_list = [x[1] for x in sorted(zip(index_list, flat_list))]
-    
-    return sorted_list
\ No newline at end of file
+            combined_agent_ids[best_index].append(agent_ids)
+            combined_all_agent_ids[best_index] |= all_agent_ids
+
+    combined_regions = []
+    for agent_ids, all_agent_ids in zip(combined_agent_ids, combined_all_agent_ids):
+        agent_ids = np.sort(np.concatenate(agent_ids))
+        all_agent_ids = np.sort(np.fromiter(all_agent_ids, dtype=np.int64, count=len(all_agent_ids)))
+        combined_regions.append((agent_ids, np.setdiff1d(all_agent_ids, agent_ids, assume_unique=True)))
+    return combined_regions
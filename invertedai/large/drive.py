@@ -1,37 +1,198 @@
 import asyncio
+import random
+import time
 import warnings
 from typing import Tuple, Optional, List, Union
 from pydantic import BaseModel, validate_call
 from math import ceil
+import numpy as np
 
 import invertedai as iai
 from invertedai.large.common import Region
-from invertedai.common import Point, AgentState, AgentAttributes, AgentProperties, RecurrentState, TrafficLightStatesDict, LightRecurrentState, LightRecurrentStates
-from invertedai.api.drive import DriveResponse, serialize_drive_request_parameters
+from invertedai.common import Point, AgentState, AgentStateBatch, AgentAttributes, AgentProperties, RecurrentState, RecurrentStateBatch, TrafficLightStatesDict, LightRecurrentState, LightRecurrentStates
+from invertedai.api.drive import DriveResponse, drive_unchecked, _async_drive, _serialize_drive_request_parameters
 from invertedai.utils import convert_attributes_to_properties
-from invertedai.error import InvertedAIError, InvalidRequestError
+from invertedai.error import InvertedAIError, InvalidRequestError, APIConnectionError, RateLimitError, ServiceUnavailableError, ServerTimeoutError, RequestTimeoutError, TryAgain
 from invertedai.logs.debug_logger import DebugLogger
-from ._quadtree import QuadTreeAgentInfo, QuadTree, _flatten_and_sort, QUADTREE_SIZE_BUFFER
+from ._quadtree import PartitionCost, partition_agents, combine_regions
 
 DRIVE_MAXIMUM_NUM_AGENTS = 100
+REGION_MAXIMUM_RETRIES = 3
+RETRYABLE_REGION_ERRORS = (RateLimitError, ServiceUnavailableError, ServerTimeoutError, RequestTimeoutError, TryAgain)
 
-async def async_drive_all(async_input_params):
-    all_responses = await asyncio.gather(*[iai.async_drive(**input_params) for input_params in async_input_params])
+def _gather(values, agent_ids):
+    # Batches support indexing with an array of agent ids directly
+    if isinstance(values, (AgentStateBatch, RecurrentStateBatch)):
+        return values[agent_ids]
+    return [values[i] for i in agent_ids.tolist()]
+
+def _scatter(region_values, agent_id_order):
+    flat_values = [value for values in region_values for value in values]
+    return [flat_values[i] for i in agent_id_order.tolist()]
+
+class RegionCallMetrics(BaseModel):
+    """
+    The :func:`drive` calls made for the regions of a single :func:`large_drive` time step.
+    """
+
+    num_attempts: List[int] = [] #: Number of attempts made for each region, in the order in which the regions are driven.
+    errors: List[str] = [] #: The errors of all failed attempts, each prefixed with the index of its region.
+
+    @property
+    def retried_regions(self) -> List[int]:
+        """
+        Indices of the regions whose call had to be retried.
+        """
+        return [region_index for region_index, num_attempts in enumerate(self.num_attempts) if num_attempts > 1]
+
+
+def _should_retry_region(e: Exception) -> bool:
+    if isinstance(e, APIConnectionError):
+        return e.should_retry
+    return isinstance(e, RETRYABLE_REGION_ERRORS)
+
+def _get_region_backoff(num_attempts: int) -> float:
+    # Same exponential backoff with jitter as the session uses for individual requests
+    backoff = iai.session.base_backoff * iai.session.backoff_factor ** (num_attempts - 1)
+    if iai.session.jitter_factor is not None:
+        backoff *= 1 + random.uniform(-iai.session.jitter_factor, iai.session.jitter_factor)
+    if iai.session.max_backoff is not None:
+        backoff = min(backoff, iai.session.max_backoff)
+    return backoff
+
+def _record_region_error(metrics, region_index, e, max_retries_per_region, deadline):
+    # Returns the time to wait before retrying the region, or raises if it must not be retried
+    metrics.errors.append(f"{region_index}: {e!r}")
+    num_attempts = metrics.num_attempts[region_index]
+    if not _should_retry_region(e) or num_attempts > max_retries_per_region:
+        raise e
+    backoff = _get_region_backoff(num_attempts)
+    if deadline is not None and time.monotonic() + backoff >= deadline:
+        raise e
+    iai.logger.warning(f"Retrying region {region_index} of large_drive after error: {e!r}, Retry #{num_attempts}, Backoff {backoff:.2f} seconds")
+    return backoff
+
+def drive_all(
+    input_params_list,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None,
+    metrics: Optional[RegionCallMetrics] = None
+):
+    """
+    Call :func:`drive` on each set of input parameters in turn. Failed calls are retried according to
+    the same policy as in :func:`async_drive_all`.
+    """
+    if metrics is None:
+        metrics = RegionCallMetrics()
+    metrics.num_attempts = [0] * len(input_params_list)
+    deadline = None if step_timeout is None else time.monotonic() + step_timeout
+
+    all_responses = []
+    for region_index, input_params in enumerate(input_params_list):
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise RequestTimeoutError(f"The drive calls of a large_drive step did not complete within {step_timeout} seconds.")
+            metrics.num_attempts[region_index] += 1
+            try:
+                all_responses.append(drive_unchecked(**input_params))
+                break
+            except InvertedAIError as e:
+                time.sleep(_record_region_error(metrics, region_index, e, max_retries_per_region, deadline))
     return all_responses
 
+def _log_region_calls(metrics: RegionCallMetrics):
+    retried_regions = metrics.retried_regions
+    if retried_regions:
+        iai.logger.info(iai.logger.logfmt(
+            "large_drive retried regions",
+            retried_regions=retried_regions,
+            num_attempts=[metrics.num_attempts[region_index] for region_index in retried_regions]
+        ))
+
+async def async_drive_all(
+    async_input_params,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None,
+    metrics: Optional[RegionCallMetrics] = None
+):
+    """
+    Call :func:`async_drive` concurrently on each set of input parameters, with at most `max_concurrent_calls`
+    calls in progress at any time. A call that fails with a transient error, such as a connection error or
+    rate limiting, is retried on its own up to `max_retries_per_region` times with exponential backoff while
+    the results of all other calls are kept. If a call fails otherwise or runs out of retries, or if not all
+    calls complete within `step_timeout` seconds, the remaining calls are cancelled and the error is raised.
+    The attempts made for each call are recorded in `metrics`.
+    """
+    all_responses = [None] * len(async_input_params)
+    async for region_index, response in _async_drive_as_completed(
+        async_input_params = async_input_params,
+        max_concurrent_calls = max_concurrent_calls,
+        max_retries_per_region = max_retries_per_region,
+        step_timeout = step_timeout,
+        metrics = metrics
+    ):
+        all_responses[region_index] = response
+    return all_responses
+
+async def _async_drive_as_completed(
+    async_input_params,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None,
+    metrics: Optional[RegionCallMetrics] = None
+):
+    # Same as async_drive_all, but yields the index and response of each call as soon as it completes
+    if metrics is None:
+        metrics = RegionCallMetrics()
+    metrics.num_attempts = [0] * len(async_input_params)
+    deadline = None if step_timeout is None else time.monotonic() + step_timeout
+
+    # Limit the number of requests in flight, by default to the size of the connection pool
+    if max_concurrent_calls is None:
+        max_concurrent_calls = iai.session.max_connections or len(async_input_params)
+    semaphore = asyncio.Semaphore(max(max_concurrent_calls, 1))
+
+    async def drive_region(region_index, input_params):
+        while True:
+            metrics.num_attempts[region_index] += 1
+            try:
+                async with semaphore:
+                    return region_index, await _async_drive(**input_params)
+            except InvertedAIError as e:
+                await asyncio.sleep(_record_region_error(metrics, region_index, e, max_retries_per_region, deadline))
+
+    tasks = [asyncio.ensure_future(drive_region(region_index, input_params)) for region_index, input_params in enumerate(async_input_params)]
+    try:
+        for next_completed in asyncio.as_completed(tasks, timeout=step_timeout):
+            try:
+                region_index, response = await next_completed
+            except asyncio.TimeoutError:
+                raise RequestTimeoutError(f"The drive calls of a large_drive step did not complete within {step_timeout} seconds.") from None
+            yield region_index, response
+    finally:
+        # Do not leave the remaining calls running when one of them fails, the step is cancelled or the results are no longer needed
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 @validate_call
 def large_drive(
     location: str,
-    agent_states: List[AgentState],
+    agent_states: Union[AgentStateBatch, List[AgentState]],
     agent_properties: List[Union[AgentAttributes,AgentProperties]],
-    recurrent_states: Optional[List[RecurrentState]] = None,
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
     traffic_lights_states: Optional[TrafficLightStatesDict] = None,
     light_recurrent_states: Optional[List[LightRecurrentState]] = None,
     get_infractions: bool = False,
     random_seed: Optional[int] = None,
     api_model_version: Optional[str] = None,
     single_call_agent_limit: Optional[int] = None,
-    async_api_calls: bool = True
+    async_api_calls: bool = True,
+    pack_regions: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None
 ) -> DriveResponse:
     """
     A utility function to drive more than the normal capacity of agents in a call to :func:`drive`.
@@ -47,12 +208,14 @@ def large_drive(
 
     agent_states:
         Please refer to the documentation of :func:`drive` for information on this parameter.
+        If given as an :class:`AgentStateBatch`, the predicted states are returned as an :class:`AgentStateBatch` as well.
 
     agent_properties:
         Please refer to the documentation of :func:`drive` for information on this parameter.
 
     recurrent_states:
         Please refer to the documentation of :func:`drive` for information on this parameter.
+        If given as a :class:`RecurrentStateBatch`, the predicted agent states and recurrent states are returned as batches.
 
     traffic_lights_states:
        Please refer to the documentation of :func:`drive` for information on this parameter.
@@ -76,109 +239,288 @@ def large_drive(
         will be limited to the maximum currently supported by :func:`drive`.
 
     async_api_calls:
-        A flag to control whether to use asynchronous DRIVE calls.
+        A flag to control whether to use asynchronous DRIVE calls. The calls are made on an event loop
+        that is kept running in a background thread between calls to this function, so this also works
+        when an event loop is already running, for example in Jupyter notebooks.
+
+    pack_regions:
+        If True, the agents of several regions are driven in the same :func:`drive` call whenever they fit
+        within `single_call_agent_limit`, preferring nearby regions that share agents in their buffers.
+        This reduces the number of calls and the number of agents sent twice when many regions hold only
+        a few agents, as on sparse maps. The achieved cost of each step is logged at debug level.
+
+    max_concurrent_calls:
+        The maximum number of asynchronous :func:`drive` calls in progress at any time, by default the
+        maximum number of connections of the session.
+
+    max_retries_per_region:
+        The number of times the :func:`drive` call of a single region is retried after a transient error,
+        such as a connection error or rate limiting, while the results of all other regions are kept.
+        If a call fails with any other error or runs out of retries, the remaining calls are cancelled
+        and the error is raised. Regions that were retried are logged at info level.
+
+    step_timeout:
+        If given, the maximum time in seconds to spend on the :func:`drive` calls of this time step including
+        retries, after which any remaining calls are cancelled and a :class:`RequestTimeoutError` is raised.
 
     See Also
     --------
     :func:`drive`
     """
 
-    # Validate input arguments
-    if single_call_agent_limit is None:
-        single_call_agent_limit = DRIVE_MAXIMUM_NUM_AGENTS
-    if single_call_agent_limit > DRIVE_MAXIMUM_NUM_AGENTS:
-        single_call_agent_limit = DRIVE_MAXIMUM_NUM_AGENTS
-        iai.logger.warning(f"Single Call Agent Limit cannot be more than {DRIVE_MAXIMUM_NUM_AGENTS}, limiting this value to {DRIVE_MAXIMUM_NUM_AGENTS} and proceeding.")
-    num_agents = len(agent_states)
-    if not (num_agents == len(agent_properties)):
-        if recurrent_states is not None and not (num_agents == len(recurrent_states)):
-            raise InvalidRequestError(message="Input lists are not of equal size.")
-    if not num_agents > 0:
-        raise InvalidRequestError(message="Valid call must contain at least 1 agent.")
-
-    # Convert any AgentAttributes to AgentProperties for backwards compatibility 
-    agent_properties_new = []
-    is_using_attributes = False
-    for properties in agent_properties:
-        properties_new = properties
-        if isinstance(properties,AgentAttributes):
-            properties_new = convert_attributes_to_properties(properties)
-            is_using_attributes = True
-        agent_properties_new.append(properties_new)
-    agent_properties = agent_properties_new
-
-    if is_using_attributes:
-        warnings.warn('agent_attributes is deprecated. Please use agent_properties.',category=DeprecationWarning)
-
-    is_debug_logging = iai.debug_logger is not None
-    if is_debug_logging:
-        debug_large_drive_parameters = serialize_drive_request_parameters(
-            location = location,
-            agent_states = agent_states,
-            agent_attributes = None,
-            agent_properties = agent_properties,
-            recurrent_states = recurrent_states,
-            traffic_lights_states = traffic_lights_states,
-            light_recurrent_states = light_recurrent_states,
-            get_birdview = False,
-            rendering_center = None,
-            rendering_fov = None,
-            get_infractions = get_infractions,
-            random_seed = random_seed,
-            api_model_version = api_model_version
-        )
-        iai.debug_logger.append_request(
-            model = "large_drive",
-            data_dict = debug_large_drive_parameters
+    return large_drive_unchecked(
+        location = location,
+        agent_states = agent_states,
+        agent_properties = agent_properties,
+        recurrent_states = recurrent_states,
+        traffic_lights_states = traffic_lights_states,
+        light_recurrent_states = light_recurrent_states,
+        get_infractions = get_infractions,
+        random_seed = random_seed,
+        api_model_version = api_model_version,
+        single_call_agent_limit = single_call_agent_limit,
+        async_api_calls = async_api_calls,
+        pack_regions = pack_regions,
+        max_concurrent_calls = max_concurrent_calls,
+        max_retries_per_region = max_retries_per_region,
+        step_timeout = step_timeout
+    )
+
+
+def large_drive_unchecked(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_properties: List[Union[AgentAttributes,AgentProperties]],
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[List[LightRecurrentState]] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None,
+    single_call_agent_limit: Optional[int] = None,
+    async_api_calls: bool = True,
+    pack_regions: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None
+) -> DriveResponse:
+    """
+    Same as :func:`large_drive`, but the arguments are not validated. All arguments must already be
+    of the types documented in :func:`large_drive`, lists included. Use it in place of :func:`large_drive`
+    to avoid validating the same inputs again on every step of a long simulation.
+
+    See Also
+    --------
+    :func:`large_drive`
+    :func:`drive_unchecked`
+    """
+
+    step = _LargeDriveStep(
+        location = location,
+        agent_states = agent_states,
+        agent_properties = agent_properties,
+        recurrent_states = recurrent_states,
+        traffic_lights_states = traffic_lights_states,
+        light_recurrent_states = light_recurrent_states,
+        get_infractions = get_infractions,
+        random_seed = random_seed,
+        api_model_version = api_model_version,
+        single_call_agent_limit = single_call_agent_limit,
+        pack_regions = pack_regions
+    )
+
+    # Call DRIVE API on all leaf nodes
+    call_metrics = RegionCallMetrics()
+    if async_api_calls and len(step.all_input_params) > 1:
+        all_responses = iai.session.run_async(async_drive_all(
+            async_input_params = step.all_input_params,
+            max_concurrent_calls = max_concurrent_calls,
+            max_retries_per_region = max_retries_per_region,
+            step_timeout = step_timeout,
+            metrics = call_metrics
+        ))
+    else:
+        all_responses = drive_all(
+            input_params_list = step.all_input_params,
+            max_retries_per_region = max_retries_per_region,
+            step_timeout = step_timeout,
+            metrics = call_metrics
         )
+    _log_region_calls(call_metrics)
+
+    return step.merge_responses(all_responses)
+
+
+@validate_call
+async def async_large_drive(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_properties: List[Union[AgentAttributes,AgentProperties]],
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[List[LightRecurrentState]] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None,
+    single_call_agent_limit: Optional[int] = None,
+    pack_regions: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None
+) -> DriveResponse:
+    """
+    The asynchronous counterpart of :func:`large_drive`, to be awaited from code that already runs an event loop
+    such as an asyncio-based co-simulator. The :func:`drive` calls of all regions are made concurrently on the
+    running event loop, at most `max_concurrent_calls` at a time, and are cancelled as soon as one of them fails.
+    Please refer to the documentation of :func:`large_drive` for information on the parameters.
 
-    # Generate quadtree
-    agent_x = [agent.center.x for agent in agent_states]
-    agent_y = [agent.center.y for agent in agent_states]
-    max_x, min_x, max_y, min_y = max(agent_x), min(agent_x), max(agent_y), min(agent_y)
-    region_size = ceil(max(max_x - min_x, max_y - min_y)) + QUADTREE_SIZE_BUFFER
-    region_center = (round((max_x+min_x)/2),round((max_y+min_y)/2))
-
-    quadtree = QuadTree(
-        capacity=single_call_agent_limit,
-        region=Region.create_square_region(
-            center=Point.fromlist(list(region_center)),
-            size=region_size
-        ),
+    See Also
+    --------
+    :func:`large_drive`
+    :func:`async_drive`
+    """
+
+    step = _LargeDriveStep(
+        location = location,
+        agent_states = agent_states,
+        agent_properties = agent_properties,
+        recurrent_states = recurrent_states,
+        traffic_lights_states = traffic_lights_states,
+        light_recurrent_states = light_recurrent_states,
+        get_infractions = get_infractions,
+        random_seed = random_seed,
+        api_model_version = api_model_version,
+        single_call_agent_limit = single_call_agent_limit,
+        pack_regions = pack_regions
     )
-    for i, (agent, attrs) in enumerate(zip(agent_states,agent_properties)):
-        if recurrent_states is None:
-            recurr_state = None
+    stream = LargeDriveStream(
+        step = step,
+        max_concurrent_calls = max_concurrent_calls,
+        max_retries_per_region = max_retries_per_region,
+        step_timeout = step_timeout
+    )
+
+    return await stream.get_response()
+
+
+class _LargeDriveStep:
+    """
+    A single time step of :func:`large_drive`, consisting of the division of the agents into regions,
+    the inputs to :func:`drive` for each region and the assembly of the responses of all regions into
+    a single response. Shared by all variants of :func:`large_drive`.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        agent_states: Union[AgentStateBatch, List[AgentState]],
+        agent_properties: List[Union[AgentAttributes,AgentProperties]],
+        recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+        traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+        light_recurrent_states: Optional[List[LightRecurrentState]] = None,
+        get_infractions: bool = False,
+        random_seed: Optional[int] = None,
+        api_model_version: Optional[str] = None,
+        single_call_agent_limit: Optional[int] = None,
+        pack_regions: bool = False
+    ):
+        # Validate input arguments
+        if single_call_agent_limit is None:
+            single_call_agent_limit = DRIVE_MAXIMUM_NUM_AGENTS
+        if single_call_agent_limit > DRIVE_MAXIMUM_NUM_AGENTS:
+            single_call_agent_limit = DRIVE_MAXIMUM_NUM_AGENTS
+            iai.logger.warning(f"Single Call Agent Limit cannot be more than {DRIVE_MAXIMUM_NUM_AGENTS}, limiting this value to {DRIVE_MAXIMUM_NUM_AGENTS} and proceeding.")
+        num_agents = len(agent_states)
+        if not (num_agents == len(agent_properties)):
+            if recurrent_states is not None and not (num_agents == len(recurrent_states)):
+                raise InvalidRequestError(message="Input lists are not of equal size.")
+        if not num_agents > 0:
+            raise InvalidRequestError(message="Valid call must contain at least 1 agent.")
+
+        # Convert any AgentAttributes to AgentProperties for backwards compatibility 
+        agent_properties_new = []
+        is_using_attributes = False
+        for properties in agent_properties:
+            properties_new = properties
+            if isinstance(properties,AgentAttributes):
+                properties_new = convert_attributes_to_properties(properties)
+                is_using_attributes = True
+            agent_properties_new.append(properties_new)
+        agent_properties = agent_properties_new
+
+        if is_using_attributes:
+            warnings.warn('agent_attributes is deprecated. Please use agent_properties.',category=DeprecationWarning)
+
+        is_debug_logging = iai.debug_logger is not None
+        if is_debug_logging:
+            debug_large_drive_parameters = _serialize_drive_request_parameters(
+                location = location,
+                agent_states = agent_states,
+                agent_attributes = None,
+                agent_properties = agent_properties,
+                recurrent_states = recurrent_states,
+                traffic_lights_states = traffic_lights_states,
+                light_recurrent_states = light_recurrent_states,
+                get_birdview = False,
+                rendering_center = None,
+                rendering_fov = None,
+                get_infractions = get_infractions,
+                random_seed = random_seed,
+                api_model_version = api_model_version
+            )
+            iai.debug_logger.append_request(
+                model = "large_drive",
+                data_dict = debug_large_drive_parameters
+            )
+
+        # Divide the agents into the regions of a quadtree
+        is_agent_state_batch = isinstance(agent_states, AgentStateBatch)
+        is_recurrent_state_batch = isinstance(recurrent_states, RecurrentStateBatch)
+        if is_agent_state_batch:
+            agent_x, agent_y = agent_states.x, agent_states.y
         else:
-            recurr_state = recurrent_states[i]
+            agent_x = np.fromiter((agent.center.x for agent in agent_states), dtype=np.float64, count=num_agents)
+            agent_y = np.fromiter((agent.center.y for agent in agent_states), dtype=np.float64, count=num_agents)
+        all_leaf_agent_ids = partition_agents(
+            x=agent_x,
+            y=agent_y,
+            capacity=single_call_agent_limit
+        )
 
-        agent_info = QuadTreeAgentInfo.fromlist([agent, attrs, recurr_state, i])
-        is_inserted = quadtree.insert(agent_info)
+        if pack_regions:
+            all_leaf_agent_ids = combine_regions(
+                region_agent_ids = all_leaf_agent_ids,
+                capacity = single_call_agent_limit
+            )
+        partition_cost = PartitionCost.fromregions(all_leaf_agent_ids)
+        iai.logger.debug(iai.logger.logfmt("large_drive regions", **partition_cost.model_dump()))
 
-        if not is_inserted:
-            raise InvertedAIError(message=f"Unable to insert agent into region.")
+        self.partition_cost = partition_cost
+        self.region_agent_ids = [] # Ids of the agents driven by each call, excluding agents in the buffer
+        self.all_input_params = [] # Inputs to drive() for each call
+        self._get_infractions = get_infractions
+        self._is_batched = is_agent_state_batch or is_recurrent_state_batch
+        self._is_debug_logging = is_debug_logging
 
-    
-    # Call DRIVE API on all leaf nodes
-    all_leaf_nodes = quadtree.get_leaf_nodes()
-    async_input_params = []
-    all_responses = []
-    non_empty_nodes = []
-    agent_id_order = []
-    
-    if len(all_leaf_nodes) > 1:
-        for i, leaf_node in enumerate(all_leaf_nodes):
-            region, region_buffer = leaf_node.region, leaf_node.region_buffer
-            region_agents_ids = [particle.agent_id for particle in leaf_node.particles]
-
-            if len(region.agent_states) > 0:
-                non_empty_nodes.append(leaf_node)
-                agent_id_order.extend(region_agents_ids)
-                input_params = {
+        self._is_single_region = len(all_leaf_agent_ids) <= 1
+        if self._is_single_region:
+            # Quadtree capacity has not been surpassed therefore can just call regular drive()
+            all_leaf_agent_ids = [(np.arange(num_agents), np.arange(0))]
+        for region_agent_ids, region_buffer_agent_ids in all_leaf_agent_ids:
+            if len(region_agent_ids) > 0:
+                self.region_agent_ids.append(region_agent_ids)
+                if self._is_single_region:
+                    leaf_agent_states, leaf_recurrent_states, leaf_agent_properties = agent_states, recurrent_states, agent_properties
+                else:
+                    leaf_agent_ids = np.concatenate([region_agent_ids, region_buffer_agent_ids])
+                    leaf_agent_states = _gather(agent_states, leaf_agent_ids)
+                    leaf_recurrent_states = None if recurrent_states is None else _gather(recurrent_states, leaf_agent_ids)
+                    leaf_agent_properties = _gather(agent_properties, leaf_agent_ids)
+                self.all_input_params.append({
                     "location":location,
-                    "agent_states":region.agent_states+region_buffer.agent_states,
-                    "recurrent_states":None if recurrent_states is None else region.recurrent_states+region_buffer.recurrent_states,
-                    "agent_properties":region.agent_properties+region_buffer.agent_properties,
+                    "agent_states":leaf_agent_states,
+                    "recurrent_states":leaf_recurrent_states,
+                    "agent_properties":leaf_agent_properties,
                     "light_recurrent_states":light_recurrent_states,
                     "traffic_lights_states":traffic_lights_states,
                     "get_birdview":False,
@@ -187,47 +529,211 @@ def large_drive(
                     "get_infractions":get_infractions,
                     "random_seed":random_seed,
                     "api_model_version":api_model_version
-                }
-                if not async_api_calls:
-                    all_responses.append(iai.drive(**input_params))
-                else:
-                    async_input_params.append(input_params)
+                })
 
-        if async_api_calls:
-            all_responses = asyncio.run(async_drive_all(async_input_params))
-
-        response = DriveResponse(
-            agent_states = _flatten_and_sort([region_response.agent_states[:leaf_node.get_number_of_agents_in_node()] for region_response, leaf_node in zip(all_responses,non_empty_nodes)],agent_id_order),
-            recurrent_states = _flatten_and_sort([region_response.recurrent_states[:leaf_node.get_number_of_agents_in_node()] for region_response, leaf_node in zip(all_responses,non_empty_nodes)],agent_id_order),
-            is_inside_supported_area = _flatten_and_sort([region_response.is_inside_supported_area[:leaf_node.get_number_of_agents_in_node()] for region_response, leaf_node in zip(all_responses,non_empty_nodes)],agent_id_order),
-            infractions = [] if not get_infractions else _flatten_and_sort([region_response.infractions[:leaf_node.get_number_of_agents_in_node()] for region_response, leaf_node in zip(all_responses,non_empty_nodes)],agent_id_order),
-            api_model_version = all_responses[0].api_model_version,
+    def get_region_response(
+        self,
+        region_index: int,
+        response: DriveResponse
+    ) -> DriveResponse:
+        """
+        Restrict the response to the call of a region to the agents of that region, leaving out the agents in its buffer.
+        """
+        if self._is_single_region:
+            return response
+        num_agents_in_region = len(self.region_agent_ids[region_index])
+        return DriveResponse(
+            agent_states = response.agent_states[:num_agents_in_region],
+            recurrent_states = response.recurrent_states[:num_agents_in_region],
+            is_inside_supported_area = response.is_inside_supported_area[:num_agents_in_region],
+            infractions = None if response.infractions is None else response.infractions[:num_agents_in_region],
+            api_model_version = response.api_model_version,
             birdview = None,
-            traffic_lights_states = all_responses[0].traffic_lights_states,
-            light_recurrent_states = all_responses[0].light_recurrent_states
+            traffic_lights_states = response.traffic_lights_states,
+            light_recurrent_states = response.light_recurrent_states
         )
 
-    else:
-        # Quadtree capacity has not been surpassed therefore can just call regular drive()
-        response = iai.drive(
-            location = location,
-            agent_states = agent_states,
-            agent_properties = agent_properties,
-            recurrent_states = recurrent_states,
-            traffic_lights_states = traffic_lights_states,
-            light_recurrent_states = light_recurrent_states,
-            get_birdview = False,
-            rendering_center = None,
-            rendering_fov = None,
-            get_infractions = get_infractions,
-            random_seed = random_seed,
-            api_model_version = api_model_version
+    def merge_responses(
+        self,
+        all_responses: List[DriveResponse]
+    ) -> DriveResponse:
+        """
+        Combine the responses to all calls, given in the order of :attr:`all_input_params`, into a single response
+        holding the results of all agents in their original order.
+        """
+        if self._is_single_region:
+            response = all_responses[0]
+        else:
+            num_agents_in_regions = [len(region_agent_ids) for region_agent_ids in self.region_agent_ids]
+            # Position of each agent among the concatenated results of all regions
+            agent_id_order = np.argsort(np.concatenate(self.region_agent_ids))
+            if self._is_batched:
+                response_agent_states = AgentStateBatch.concatenate([AgentStateBatch.from_agent_states(region_response.agent_states)[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)])[agent_id_order]
+                response_recurrent_states = RecurrentStateBatch.concatenate([RecurrentStateBatch.from_recurrent_states(region_response.recurrent_states)[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)])[agent_id_order]
+            else:
+                response_agent_states = _scatter([region_response.agent_states[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)],agent_id_order)
+                response_recurrent_states = _scatter([region_response.recurrent_states[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)],agent_id_order)
+            response = DriveResponse(
+                agent_states = response_agent_states,
+                recurrent_states = response_recurrent_states,
+                is_inside_supported_area = _scatter([region_response.is_inside_supported_area[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)],agent_id_order),
+                infractions = [] if not self._get_infractions else _scatter([region_response.infractions[:num_agents_in_region] for region_response, num_agents_in_region in zip(all_responses,num_agents_in_regions)],agent_id_order),
+                api_model_version = all_responses[0].api_model_version,
+                birdview = None,
+                traffic_lights_states = all_responses[0].traffic_lights_states,
+                light_recurrent_states = all_responses[0].light_recurrent_states
+            )
+
+        if self._is_debug_logging:
+            iai.debug_logger.append_response(
+                model = "large_drive",
+                data_dict = response.serialize_drive_response_parameters()
+            )
+
+        return response
+
+
+class RegionDriveResult(BaseModel):
+    """
+    The results of the agents of a single region of a :func:`large_drive` time step, as yielded by a
+    :class:`LargeDriveStream` as soon as the :func:`drive` call of the region completes.
+    """
+
+    region_index: int #: Index of the region in the order in which the regions are driven.
+    agent_ids: List[int] #: Indices of the agents of the region in the list of all agents of the time step.
+    response: DriveResponse #: Response of the :func:`drive` call of the region restricted to its own agents, in the order of `agent_ids`.
+
+
+class LargeDriveStream:
+    """
+    An asynchronous iterator over the results of each region of a :func:`large_drive` time step, returned by
+    :func:`stream_large_drive`. The :func:`drive` calls of all regions start when iteration begins, and a
+    :class:`RegionDriveResult` holding the agent ids and results of a region is yielded as soon as its call
+    completes, so that the agents that are needed first can be used before the slowest region has returned.
+    Once all regions have been yielded, :attr:`response` holds the combined response for all agents, exactly
+    as returned by :func:`large_drive`.
+
+    Remaining calls are cancelled if an error is raised or the stream is closed early with :func:`aclose`,
+    which also happens when the stream is used as an asynchronous context manager.
+
+    Examples
+    --------
+    >>> async with iai.stream_large_drive(location=location, agent_states=agent_states, agent_properties=agent_properties) as stream:
+    ...     async for region_result in stream:
+    ...         update_renderer(region_result.agent_ids, region_result.response.agent_states)
+    >>> response = stream.response
+    """
+
+    def __init__(
+        self,
+        step: _LargeDriveStep,
+        max_concurrent_calls: Optional[int] = None,
+        max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+        step_timeout: Optional[float] = None
+    ):
+        self.partition_cost = step.partition_cost #: The number of calls and agents sent for this time step.
+        self.call_metrics = RegionCallMetrics() #: The attempts made by the call of each region, updated as the calls progress.
+        self.response = None #: The combined response for all agents, available once all regions have been yielded.
+
+        self._step = step
+        self._region_responses = [None] * len(step.all_input_params)
+        self._completed_calls = _async_drive_as_completed(
+            async_input_params = step.all_input_params,
+            max_concurrent_calls = max_concurrent_calls,
+            max_retries_per_region = max_retries_per_region,
+            step_timeout = step_timeout,
+            metrics = self.call_metrics
         )
 
-    if is_debug_logging:
-        iai.debug_logger.append_response(
-            model = "large_drive",
-            data_dict = response.serialize_drive_response_parameters()
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> RegionDriveResult:
+        try:
+            region_index, response = await self._completed_calls.__anext__()
+        except StopAsyncIteration:
+            # The response is incomplete if the stream was closed early
+            if self.response is None and all(response is not None for response in self._region_responses):
+                _log_region_calls(self.call_metrics)
+                self.response = self._step.merge_responses(self._region_responses)
+            raise
+        response = self._step.get_region_response(region_index, response)
+        self._region_responses[region_index] = response
+        return RegionDriveResult(
+            region_index = region_index,
+            agent_ids = self._step.region_agent_ids[region_index].tolist(),
+            response = response
         )
 
-    return response
\ No newline at end of file
+    async def get_response(self) -> DriveResponse:
+        """
+        Wait for all remaining regions and return the combined response for all agents.
+        """
+        async for _ in self:
+            pass
+        return self.response
+
+    async def aclose(self):
+        """
+        Cancel the calls of all regions that have not completed yet.
+        """
+        await self._completed_calls.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+@validate_call
+def stream_large_drive(
+    location: str,
+    agent_states: Union[AgentStateBatch, List[AgentState]],
+    agent_properties: List[Union[AgentAttributes,AgentProperties]],
+    recurrent_states: Optional[Union[RecurrentStateBatch, List[RecurrentState]]] = None,
+    traffic_lights_states: Optional[TrafficLightStatesDict] = None,
+    light_recurrent_states: Optional[List[LightRecurrentState]] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None,
+    single_call_agent_limit: Optional[int] = None,
+    pack_regions: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    max_retries_per_region: int = REGION_MAXIMUM_RETRIES,
+    step_timeout: Optional[float] = None
+) -> LargeDriveStream:
+    """
+    A streaming variant of :func:`async_large_drive` that gives access to the results of each region as soon as
+    its :func:`drive` call completes rather than after the slowest region, for example to first update the agents
+    around an ego vehicle. The agents are divided into regions right away, while the calls are made on the running
+    event loop while iterating over the returned :class:`LargeDriveStream`. Please refer to the documentation of
+    :func:`large_drive` for information on the parameters.
+
+    See Also
+    --------
+    :func:`large_drive`
+    :func:`async_large_drive`
+    """
+
+    step = _LargeDriveStep(
+        location = location,
+        agent_states = agent_states,
+        agent_properties = agent_properties,
+        recurrent_states = recurrent_states,
+        traffic_lights_states = traffic_lights_states,
+        light_recurrent_states = light_recurrent_states,
+        get_infractions = get_infractions,
+        random_seed = random_seed,
+        api_model_version = api_model_version,
+        single_call_agent_limit = single_call_agent_limit,
+        pack_regions = pack_regions
+    )
+
+    return LargeDriveStream(
+        step = step,
+        max_concurrent_calls = max_concurrent_calls,
+        max_retries_per_region = max_retries_per_region,
+        step_timeout = step_timeout
+    )
+
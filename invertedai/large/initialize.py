@@ -1,16 +1,20 @@
+import asyncio
 import time
 import numpy as np
 
 from random import choices, seed, randint
-from math import sqrt
-from copy import deepcopy
 from pydantic import BaseModel, validate_call
 from typing import Union, List, Optional, Tuple, Dict
 from itertools import product
-from tqdm.contrib import tenumerate
+from collections import deque
+from math import ceil
+from tqdm import tqdm
 
 import invertedai as iai
 from invertedai.large.common import Region, REGION_MAX_SIZE
+from invertedai.large._drivable_area import get_drivable_area_ratios
+from invertedai.large._agent_grid import RegionAgentGrid
+from invertedai.large._checkpoint import RegionCheckpoint, get_checkpoint_fingerprint
 from invertedai.api.initialize import InitializeResponse, serialize_initialize_request_parameters
 from invertedai.utils import get_default_agent_properties
 from invertedai.error import InvertedAIError
@@ -26,6 +30,7 @@ from invertedai.common import (
 
 AGENT_SCOPE_FOV_BUFFER = 60
 ATTEMPT_PER_NUM_REGIONS = 15
+REGION_ASSIGNMENT_BATCH_SIZE = 4096
 
 
 @validate_call
@@ -56,7 +61,8 @@ def get_regions_default(
     area_shape:
         Contains the [width, height] to either side of the center of the rectangular area to be broken into 
         smaller regions (i.e. half of full width and height of the region). If this argument is not provided, 
-        a bounding box around the location polygon from :func:`location_info` will be used.
+        a bounding box around the location polygon from :func:`location_info` will be used. Regions lying
+        entirely outside the bounding polygon of the location are removed, see :func:`get_regions_in_grid`.
 
     map_center:
         The coordinates of the center of the rectangular area to be broken into smaller regions. If
@@ -83,7 +89,8 @@ def get_regions_default(
     regions = iai.get_regions_in_grid(
         width = area_shape[0], 
         height = area_shape[1],
-        map_center = map_center
+        map_center = map_center,
+        location = location
     )
 
     new_regions = iai.get_number_of_agents_per_region_by_drivable_area(
@@ -97,12 +104,48 @@ def get_regions_default(
     return new_regions
 
 
+def _is_square_intersecting_polygon(
+    centers: np.ndarray,
+    sizes: np.ndarray,
+    polygon: np.ndarray
+) -> np.ndarray:
+    # Separating axis test between axis-aligned squares and a polygon. A square is dropped only if its projection
+    # onto one of the square axes or one of the polygon edge normals does not overlap that of the polygon, which
+    # proves the shapes are apart. Location polygons are generally not convex, for which overlapping projections
+    # do not prove an intersection, so a square outside the polygon may be kept but one inside is never dropped
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    axes = np.concatenate([np.eye(2), np.stack([-edges[:,1], edges[:,0]], axis=1)])
+    polygon_projections = polygon @ axes.T
+    center_projections = centers @ axes.T
+    half_widths = sizes[:,None] / 2 * np.abs(axes).sum(axis=1)[None,:]
+    is_separated = (center_projections + half_widths < polygon_projections.min(axis=0)) | \
+        (center_projections - half_widths > polygon_projections.max(axis=0))
+    return ~is_separated.any(axis=1)
+
+
+def _get_grid_bfs_order(lattice_indexes: np.ndarray) -> List[int]:
+    # Order lattice points as found by a breadth first search from the origin through diagonal neighbours
+    index_lookup = {index: i for i, index in enumerate(map(tuple, lattice_indexes.tolist()))}
+    order, visited, queue = [], {(0,0)}, deque([(0,0)])
+    while queue:
+        i, j = queue.popleft()
+        order.append(index_lookup[(i,j)])
+        for di, dj in product(*[(-1, 1),]* 2):
+            neighbor = (i + di, j + dj)
+            if neighbor in index_lookup and neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+    return order
+
+
 @validate_call
 def get_regions_in_grid(
     width: float,
     height: float,
     map_center: Optional[Tuple[float,float]] = (0.0,0.0), 
-    stride: Optional[float] = 50.0
+    stride: Optional[float] = 50.0,
+    location: Optional[str] = None,
+    bfs_order: bool = True
 ) -> List[Region]:
     """
     A utility function to help initialize an area larger than 100x100m. This function breaks up an 
@@ -124,34 +167,52 @@ def get_regions_in_grid(
     stride:
         How far apart the centers of the 100x100m regions should be. Some overlap is recommended for 
         best results and if no argument is provided, a value of 50 is used.
-    """
 
-    def check_valid_center(center):
-        return (map_center[0] - width) < center[0] < (map_center[0] + width) and \
-            (map_center[1] - height) < center[1] < (map_center[1] + height)
-
-    def get_neighbors(center):
-        return [
-            (center[0] + (i * stride), center[1] + (j * stride))
-            for i, j in list(product(*[(-1, 1),]* 2))
-        ]
-
-    queue, centers = [map_center], []
+    location:
+        If provided, regions that lie entirely outside the bounding polygon of this location from 
+        :func:`location_info` are removed.
+
+    bfs_order:
+        If True, the regions are ordered by a breadth first search outwards from the map center, the 
+        order used by previous versions of this function, so that results seeded with the same random 
+        seed can be reproduced. Otherwise, the regions are ordered row by row. Previous versions summed
+        floating point strides and so returned some centers several times with slightly different
+        coordinates, which are now returned once. For example, a width of 150, a height of 100, a map
+        center of (-925.48, -121.70) and a stride of 30 used to give 49 regions at 31 distinct centers
+        and now give those 31 regions, so seeded results differ wherever this happened.
+    """
 
-    while queue:
-        center = queue.pop(0)
-        neighbors = filter(check_valid_center, get_neighbors(center))
-        queue.extend([
-            neighbor
-            for neighbor in neighbors
-            if neighbor not in queue and neighbor not in centers
-        ])
-        if center not in centers and check_valid_center(center):
-            centers.append(center)
+    # Region centers lie on a lattice of diagonal steps of size stride around the map center
+    max_i = ceil(width / stride) if width > 0 else 0
+    max_j = ceil(height / stride) if height > 0 else 0
+    lattice_i, lattice_j = np.meshgrid(np.arange(-max_i, max_i + 1), np.arange(-max_j, max_j + 1))
+    lattice_indexes = np.stack([lattice_i.ravel(), lattice_j.ravel()], axis=1)
+    centers = np.array(map_center) + stride * lattice_indexes
+    is_valid_center = (np.abs(centers[:,0] - map_center[0]) < width) & (np.abs(centers[:,1] - map_center[1]) < height)
+    is_valid_center &= lattice_indexes.sum(axis=1) % 2 == 0
+    if not (is_valid_center & (np.abs(lattice_indexes[:,0]) == 1)).any() or not (is_valid_center & (np.abs(lattice_indexes[:,1]) == 1)).any():
+        # Without a diagonal neighbour of the map center, no other center can be reached
+        is_valid_center &= (lattice_indexes == 0).all(axis=1)
+    lattice_indexes = lattice_indexes[is_valid_center]
+    centers = centers[is_valid_center]
+
+    if bfs_order and len(lattice_indexes) > 0:
+        order = _get_grid_bfs_order(lattice_indexes)
+        lattice_indexes, centers = lattice_indexes[order], centers[order]
+
+    if location is not None and len(centers) > 0:
+        bounding_polygon = iai.location_info(location=location).bounding_polygon
+        if bounding_polygon is not None and len(bounding_polygon) >= 3:
+            is_inside_polygon = _is_square_intersecting_polygon(
+                centers = centers,
+                sizes = np.full(len(centers), REGION_MAX_SIZE),
+                polygon = np.array([[point.x, point.y] for point in bounding_polygon])
+            )
+            centers = centers[is_inside_polygon]
     
     regions = [None for _ in range(len(centers))]
-    for i, center in enumerate(centers):
-        regions[i] = Region.create_square_region(center=Point.fromlist(list(center)))
+    for i, center in enumerate(centers.tolist()):
+        regions[i] = Region.create_square_region(center=Point.fromlist(center))
 
     return regions
 
@@ -170,7 +231,10 @@ def get_number_of_agents_per_region_by_drivable_area(
     :func:`location_info`, then creates a new Region object with copied location and shape data and 
     inserts a number of car agents to be **sampled** into it proportional to its drivable surface 
     area relative to the other regions. Regions with no or a relatively small amount of drivable 
-    surface will be removed.
+    surface will be removed. The drivable area of each location is rendered only once, kept in memory 
+    and cached on disk per map version (see the `IAI_CACHE_DIR` environment variable), so that calling this 
+    function again for the same location makes no further :func:`location_info` calls for the same area. The
+    map version is checked again only once the maximum age set with :func:`iai.use_location_info_cache` has passed.
 
     Arguments
     ----------
@@ -205,41 +269,19 @@ def get_number_of_agents_per_region_by_drivable_area(
         agent_list_types = agent_list_types + [agent_type]*num_agents
 
     new_regions = [Region.copy(region) for region in regions]
-    region_road_area = []
-    total_drivable_area_ratio = 0
 
     if random_seed is not None:
         seed(random_seed)
-    
-    if display_progress_bar:
-        iterable_regions = tenumerate(
-            new_regions, 
-            total=len(new_regions),
-            desc=f"Calculating drivable surface areas"
-        )
-    else:
-        iterable_regions = enumerate(new_regions)
-
-    for i, region in iterable_regions:
-        center_tuple = (region.center.x, region.center.y)
-        birdview = iai.location_info(
-            location=location,
-            rendering_fov=int(region.size),
-            rendering_center=center_tuple
-        ).birdview_image.decode()
-
-        birdview_arr_shape = birdview.shape
-        total_num_pixels = birdview_arr_shape[0]*birdview_arr_shape[1]
-        number_of_black_pix = np.sum(birdview.sum(axis=-1) == 0)
 
-        drivable_area_ratio = (total_num_pixels-number_of_black_pix)/total_num_pixels 
-        total_drivable_area_ratio += drivable_area_ratio
-        region_road_area.append(drivable_area_ratio)
+    region_road_area = get_drivable_area_ratios(
+        location = location,
+        centers = np.array([[region.center.x, region.center.y] for region in new_regions]).reshape(-1,2),
+        sizes = np.array([region.size for region in new_regions]),
+        display_progress_bar = display_progress_bar
+    )
 
     # Select region in which to assign agents using drivable area as weight
-    all_region_weights = [0]*len(new_regions)
-    for i, drivable_ratio in enumerate(region_road_area):
-        all_region_weights[i] = drivable_ratio/total_drivable_area_ratio
+    all_region_weights = (region_road_area/region_road_area.sum()).tolist()
     random_indexes = choices(list(range(len(new_regions))), weights=all_region_weights, k=len(agent_list_types))
 
     for agent_id, ind in enumerate(random_indexes):
@@ -260,7 +302,7 @@ def _insert_agents_into_nearest_regions(
     agent_states: List[AgentState],
     return_region_index: Optional[bool] = False,
     random_seed: Optional[int] = None
-) -> Union[List[Region],Tuple[List[Region],List[Tuple[int,int]]]]:
+) -> Tuple[List[Region],Optional[np.ndarray]]:
     """
     Helper function to place pre-existing agents into a group of regions. If agents exist 
     within the bounds of multiple regions, it is placed within the region to which whose 
@@ -268,7 +310,7 @@ def _insert_agents_into_nearest_regions(
     it is not within the bounds of the region. The length of the agent_states list must be
     equal or less than the length of agent_properties. To remain compliant with :func:`initialize`, 
     agents with defined agent states are placed at the beginning of the list. Optionally 
-    using the return_region_index parameter will return a list indicating in which region 
+    using the return_region_index parameter will return an array indicating in which region 
     the agent is placed to preserve agent indexing. A random seed parameter is included for 
     repeatability.
 
@@ -285,7 +327,8 @@ def _insert_agents_into_nearest_regions(
 
     return_region_index:
         Whether to map the region in which agents of the same index have been placed. Returns 
-        a list of the same size as the agent_properties parameter.
+        an array of shape (len(agent_properties), 2) holding the index of the region of each 
+        agent and the index of the agent within that region.
     """
 
     num_agent_states = len(agent_states)
@@ -293,233 +336,435 @@ def _insert_agents_into_nearest_regions(
     assert num_regions > 0, "Invalid parameter: number of regions must be greater than zero."
     assert len(agent_properties) >= num_agent_states, "Invalid parameters: number of agent properties must be larger than number agent states."
 
-    if return_region_index: 
-        region_map = []
-    else:
-        region_map = None
+    region_agent_map = np.zeros((len(agent_properties),2), dtype=int)
 
     if len(agent_states) > 0: 
-        region_agent_states_lengths = [len(region.agent_states) for region in regions]
-
-        for i, (prop, state) in enumerate(zip(agent_properties[:num_agent_states],agent_states)):
-            region_distances = []
-            for region in regions:
-                region_distances.append(sqrt((state.center.x-region.center.x)**2 + (state.center.y-region.center.y)**2))
-
-            closest_region_index = region_distances.index(min(region_distances))
-            insert_index = region_agent_states_lengths[closest_region_index]
-            region_agent_states_lengths[closest_region_index] += 1
-            regions[closest_region_index].agent_properties.insert(insert_index,prop)
-            regions[closest_region_index].agent_states.insert(insert_index,state)
+        agent_positions = np.array([[state.center.x, state.center.y] for state in agent_states])
+        region_centers = np.array([[region.center.x, region.center.y] for region in regions])
+
+        # Compare every agent to every region in batches to bound the size of the distance matrix
+        closest_region_indexes = np.concatenate([
+            np.argmin(np.sqrt(
+                (agent_positions[start:start+REGION_ASSIGNMENT_BATCH_SIZE,None,0] - region_centers[None,:,0])**2 +
+                (agent_positions[start:start+REGION_ASSIGNMENT_BATCH_SIZE,None,1] - region_centers[None,:,1])**2
+            ), axis=1)
+            for start in range(0, num_agent_states, REGION_ASSIGNMENT_BATCH_SIZE)
+        ])
 
-            if return_region_index: region_map.append(tuple([closest_region_index,insert_index]))
+        # Agents are placed after the existing agent states of their region, keeping their order
+        agent_order = np.argsort(closest_region_indexes, kind="stable")
+        region_boundaries = np.searchsorted(closest_region_indexes[agent_order], np.arange(num_regions+1))
+        for region_index, region in enumerate(regions):
+            agent_ids = agent_order[region_boundaries[region_index]:region_boundaries[region_index+1]]
+            if len(agent_ids) == 0:
+                continue
+            num_existing_agent_states = len(region.agent_states)
+            region.agent_states = region.agent_states + [agent_states[i] for i in agent_ids.tolist()]
+            region.agent_properties = region.agent_properties[:num_existing_agent_states] + \
+                [agent_properties[i] for i in agent_ids.tolist()] + region.agent_properties[num_existing_agent_states:]
+            region_agent_map[agent_ids,0] = region_index
+            region_agent_map[agent_ids,1] = num_existing_agent_states + np.arange(len(agent_ids))
 
     if random_seed is not None: seed(random_seed)
-    for prop in agent_properties[num_agent_states:]:
+    for i, prop in enumerate(agent_properties[num_agent_states:], start=num_agent_states):
         random_region_index = randint(0,num_regions-1)
         regions[random_region_index].agent_properties.append(prop)
+        region_agent_map[i] = random_region_index, len(regions[random_region_index].agent_properties)-1
 
-        if return_region_index: region_map.append(tuple([random_region_index,len(regions[random_region_index].agent_properties)-1]))
+    region_map = region_agent_map if return_region_index else None
 
     return regions, region_map
 
 
 def _consolidate_all_responses(
     all_responses: List[InitializeResponse],
-    region_map: Optional[List[Tuple[int,int]]] = None,
+    region_map: Optional[np.ndarray] = None,
     return_exact_agents: bool = False,
     get_infractions: bool = False
 ):
-    if len(all_responses) > 0:
-        # Get non-region-specific values such as api_model_version and traffic_light_states from an existing response
-        response = deepcopy(all_responses[0]) 
+    if len(all_responses) == 0:
+        raise InvertedAIError(message=f"Unable to initialize any given region. Please check the input parameters.")
 
-        agent_states = []
-        agent_properties = []
-        recurrent_states = []
-        infractions = []
+    # Index every agent of every response in a single flat list of agents
+    num_response_agents = np.array([len(response.agent_states) for response in all_responses])
+    response_offsets = np.concatenate([[0], np.cumsum(num_response_agents)])
+    is_kept = np.ones(response_offsets[-1], dtype=bool)
+
+    # Agents with a preserved index are placed first, in the order of the region map
+    mapped_agent_ids = np.zeros(0, dtype=int)
+    if region_map is not None and len(region_map) > 0:
+        region_ids, agent_ids = region_map[:,0], region_map[:,1]
+        is_valid = region_ids < len(all_responses)
+        is_valid[is_valid] = agent_ids[is_valid] < num_response_agents[region_ids[is_valid]]
+        for region_id, agent_id in region_map[~is_valid].tolist():
+            exception_message = f"Warning: Unable to fetch specified agent ID {agent_id} in region {region_id}."
+            if not return_exact_agents: 
+                iai.logger.debug(exception_message)
+            else:
+                raise InvertedAIError(message=exception_message)
+        mapped_agent_ids = response_offsets[region_ids[is_valid]] + agent_ids[is_valid]
+        is_kept[mapped_agent_ids] = False
 
-        region_agent_keep_map = {i: [True]*len(res.agent_properties) for i, res in enumerate(all_responses)}
+    agent_order = np.concatenate([mapped_agent_ids, np.flatnonzero(is_kept)]).tolist()
 
-        if region_map is not None:
-            for (region_id, agent_id) in region_map:
-                try:
-                    agent_states.append(all_responses[region_id].agent_states[agent_id])
-                    agent_properties.append(all_responses[region_id].agent_properties[agent_id])
-                    recurrent_states.append(all_responses[region_id].recurrent_states[agent_id])
-
-                    if get_infractions:
-                        infractions.append(all_responses[region_id].infractions[agent_id])
-
-                    region_agent_keep_map[region_id][agent_id] = False
-                except IndexError as e: 
-                    exception_message = f"Warning: Unable to fetch specified agent ID {agent_id} in region {region_id}."
-                    if not return_exact_agents: 
-                        iai.logger.debug(exception_message)
-                    else:
-                        raise InvertedAIError(message=exception_message)
-        
-        for ind, response in enumerate(all_responses):
-            response_agent_states = response.agent_states
-            agent_states = agent_states + [state for i, state in enumerate(response_agent_states) if region_agent_keep_map[ind][i]]
-            agent_properties = agent_properties + [prop for i, prop in enumerate(response.agent_properties[:len(response_agent_states)]) if region_agent_keep_map[ind][i]]
-            recurrent_states = recurrent_states + [recurr for i, recurr in enumerate(response.recurrent_states) if region_agent_keep_map[ind][i]]
-            if get_infractions:
-                infractions = infractions + [infr for i, infr in enumerate(response.infractions) if region_agent_keep_map[ind][i]]
-        
-        response.infractions = infractions
-        response.agent_states = agent_states
-        response.agent_properties = agent_properties
-        response.recurrent_states = recurrent_states 
-    else:
-        raise InvertedAIError(message=f"Unable to initialize any given region. Please check the input parameters.")
+    def gather(response_values):
+        flat_values = [value for values in response_values for value in values]
+        return [flat_values[i] for i in agent_order]
 
-    return response
+    # Get non-region-specific values such as api_model_version and traffic_light_states from an existing response
+    return all_responses[0].model_copy(update=dict(
+        agent_states = gather(response.agent_states for response in all_responses),
+        agent_properties = gather(response.agent_properties[:len(response.agent_states)] for response in all_responses),
+        recurrent_states = gather(response.recurrent_states for response in all_responses),
+        infractions = gather(response.infractions for response in all_responses) if get_infractions else []
+    ))
+
+
+def _inside_fov(center: Point, agent_scope_fov: float, point: Point) -> bool:
+    return ((center.x - (agent_scope_fov / 2) < point.x < center.x + (agent_scope_fov / 2)) and
+            (center.y - (agent_scope_fov / 2) < point.y < center.y + (agent_scope_fov / 2)))
 
 
-def _get_all_existing_agents_from_regions(
+def _get_region_colours(regions: List[Region]) -> List[List[int]]:
+    """
+    Greedily colour the graph in which two regions are connected if their centers are close enough for the agents 
+    of one region to be conditional agents of the other, visiting the regions in order. Regions of the same colour
+    do not interact and can be initialized at the same time. Returns the indexes of the regions of each colour.
+    """
+
+    region_centers = np.array([[region.center.x, region.center.y] for region in regions]).reshape(-1,2)
+    region_colours = np.zeros(len(regions), dtype=int)
+    for i in range(1,len(regions)):
+        distances = np.hypot(*(region_centers[:i] - region_centers[i]).T)
+        neighbour_colours = np.unique(region_colours[:i][distances <= REGION_MAX_SIZE + AGENT_SCOPE_FOV_BUFFER])
+        # Pick the smallest colour that is not used by a neighbour, the neighbour colours are sorted
+        is_free_colour = neighbour_colours != np.arange(len(neighbour_colours))
+        region_colours[i] = np.argmax(is_free_colour) if is_free_colour.any() else len(neighbour_colours)
+
+    return [np.flatnonzero(region_colours == colour).tolist() for colour in range(region_colours.max(initial=-1) + 1)]
+
+
+def _get_region_initialize_inputs(
     regions: List[Region],
-    exclude_index: Optional[int] = None,
-    nearby_region: Optional[Region] = None,
-):
-    agent_states = []
-    agent_properties = []
+    region_index: int,
+    agent_grid: RegionAgentGrid
+) -> Tuple[List[AgentState],List[AgentProperties],int]:
+    
+    region = regions[region_index]
+
+    # Acquire agents that exist in other regions that must be passed as conditional to avoid collisions
+    out_of_region_conditional_agent_ids = agent_grid.query(
+        center_x = region.center.x,
+        center_y = region.center.y,
+        fov = region.size + AGENT_SCOPE_FOV_BUFFER,
+        exclude_index = region_index,
+        max_region_distance = REGION_MAX_SIZE + AGENT_SCOPE_FOV_BUFFER
+    )
+    out_of_region_conditional_agent_states = [regions[i].agent_states[j] for i, j in out_of_region_conditional_agent_ids]
+    out_of_region_conditional_agent_properties = [regions[i].agent_properties[j] for i, j in out_of_region_conditional_agent_ids]
 
-    for ind, region in enumerate(regions):
-        if not ind == exclude_index:
-            if nearby_region is not None:
-                if sqrt((nearby_region.center.x-region.center.x)**2+(nearby_region.center.y-region.center.y)**2) > (REGION_MAX_SIZE + AGENT_SCOPE_FOV_BUFFER):
-                    continue
-            region_agent_states = region.agent_states
-            agent_states = agent_states + region_agent_states
-            agent_properties = agent_properties + [prop for prop in region.agent_properties[:len(region_agent_states)]]
+    region_conditional_agent_states = [] if region.agent_states is None else region.agent_states
+    num_region_conditional_agents = len(region_conditional_agent_states)
+    region_conditional_agent_properties = [] if region.agent_properties is None else region.agent_properties[:num_region_conditional_agents]
+    region_unsampled_agent_properties = [] if region.agent_properties is None else region.agent_properties[num_region_conditional_agents:]
+    all_agent_states = out_of_region_conditional_agent_states + region_conditional_agent_states
+    all_agent_properties = out_of_region_conditional_agent_properties + region_conditional_agent_properties + region_unsampled_agent_properties
 
-    return agent_states, agent_properties
+    num_out_of_region_conditional_agents = len(out_of_region_conditional_agent_states)
 
+    return all_agent_states, all_agent_properties, num_out_of_region_conditional_agents
 
-def _initialize_regions(
+
+def _initialize_region(
     location: str,
-    regions: List[Region],
+    region: Region,
+    region_index: int,
+    all_agent_states: List[AgentState],
+    all_agent_properties: List[AgentProperties],
+    num_out_of_region_conditional_agents: int,
+    num_attempts: int,
     traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
     get_infractions: bool = False,
     random_seed: Optional[int] = None,
     api_model_version: Optional[str] = None,
-    display_progress_bar: bool = True,
     return_exact_agents: bool = False
-) -> Tuple[List[Region],List[InitializeResponse]]:
+) -> Optional[InitializeResponse]:
     
-    def inside_fov(center: Point, agent_scope_fov: float, point: Point) -> bool:
-        return ((center.x - (agent_scope_fov / 2) < point.x < center.x + (agent_scope_fov / 2)) and
-                (center.y - (agent_scope_fov / 2) < point.y < center.y + (agent_scope_fov / 2)))
+    response = None
+    for attempt in range(num_attempts):
+        try:
+            response = iai.initialize(
+                location=location,
+                states_history=None if len(all_agent_states) == 0 else [all_agent_states],
+                agent_properties=all_agent_properties,
+                get_infractions=get_infractions,
+                traffic_light_state_history=traffic_light_state_history,
+                location_of_interest=(region.center.x, region.center.y),
+                random_seed=random_seed
+            )
+
+        except InvertedAIError as e:
+            # If error has occurred, display the warning and retry
+            iai.logger.debug(f"Region initialize attempt {attempt} error: {e}")
+            continue
+
+        # Initialization of this region was successful, break the loop and proceed to the next region
+        break
     
-    if display_progress_bar:
-        iterable_regions = tenumerate(
-            regions, 
-            total=len(regions),
-            desc=f"Initializing regions"
-        )
     else:
-        iterable_regions = enumerate(regions)
+        exception_string = f"Unable to initialize region {region_index} at {region.center} with size {region.size} after {num_attempts} attempts."
+        if return_exact_agents: 
+            raise InvertedAIError(message=exception_string)
+        else:
+            iai.logger.debug(exception_string)
+            if len(all_agent_states) > num_out_of_region_conditional_agents:
+            # Get the recurrent states for all predefined agents within the region
+                response = iai.initialize(
+                    location=location,
+                    states_history=[all_agent_states],
+                    agent_properties=all_agent_properties[:len(all_agent_states)],
+                    get_infractions=get_infractions,
+                    traffic_light_state_history=traffic_light_state_history,
+                    location_of_interest=(region.center.x, region.center.y),
+                    random_seed=random_seed,
+                    api_model_version=api_model_version
+                )
 
-    num_attempts = 1 + len(regions) // ATTEMPT_PER_NUM_REGIONS
-    all_responses = []
-    for i, region in iterable_regions:
-        region_center = region.center
-        region_size = region.size
-
-        existing_agent_states, existing_agent_properties = _get_all_existing_agents_from_regions(
-            regions = regions,
-            exclude_index = i,
-            nearby_region = region
-        )
+    return response
+
+
+async def _async_initialize_region(
+    location: str,
+    region: Region,
+    region_index: int,
+    all_agent_states: List[AgentState],
+    all_agent_properties: List[AgentProperties],
+    num_out_of_region_conditional_agents: int,
+    num_attempts: int,
+    traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None,
+    return_exact_agents: bool = False
+) -> Optional[InitializeResponse]:
+    """
+    The async version of :func:`_initialize_region`
+    """
 
-        # Acquire agents that exist in other regions that must be passed as conditional to avoid collisions
-        out_of_region_conditional_agents = list(filter(
-            lambda x: inside_fov(center=region_center, agent_scope_fov=region_size+AGENT_SCOPE_FOV_BUFFER, point=x[0].center), 
-            zip(existing_agent_states,existing_agent_properties)
-        ))
+    response = None
+    for attempt in range(num_attempts):
+        try:
+            response = await iai.async_initialize(
+                location=location,
+                states_history=None if len(all_agent_states) == 0 else [all_agent_states],
+                agent_properties=all_agent_properties,
+                get_infractions=get_infractions,
+                traffic_light_state_history=traffic_light_state_history,
+                location_of_interest=(region.center.x, region.center.y),
+                random_seed=random_seed
+            )
+
+        except InvertedAIError as e:
+            iai.logger.debug(f"Region initialize attempt {attempt} error: {e}")
+            continue
 
-        out_of_region_conditional_agent_states = [x[0] for x in out_of_region_conditional_agents]
-        out_of_region_conditional_agent_properties = [x[1] for x in out_of_region_conditional_agents]
+        break
+    
+    else:
+        exception_string = f"Unable to initialize region {region_index} at {region.center} with size {region.size} after {num_attempts} attempts."
+        if return_exact_agents: 
+            raise InvertedAIError(message=exception_string)
+        else:
+            iai.logger.debug(exception_string)
+            if len(all_agent_states) > num_out_of_region_conditional_agents:
+                response = await iai.async_initialize(
+                    location=location,
+                    states_history=[all_agent_states],
+                    agent_properties=all_agent_properties[:len(all_agent_states)],
+                    get_infractions=get_infractions,
+                    traffic_light_state_history=traffic_light_state_history,
+                    location_of_interest=(region.center.x, region.center.y),
+                    random_seed=random_seed,
+                    api_model_version=api_model_version
+                )
 
-        region_conditional_agent_states = [] if region.agent_states is None else region.agent_states
-        num_region_conditional_agents = len(region_conditional_agent_states)
-        region_conditional_agent_properties = [] if region.agent_properties is None else region.agent_properties[:num_region_conditional_agents]
-        region_unsampled_agent_properties = [] if region.agent_properties is None else region.agent_properties[num_region_conditional_agents:]
-        all_agent_states = out_of_region_conditional_agent_states + region_conditional_agent_states
-        all_agent_properties = out_of_region_conditional_agent_properties + region_conditional_agent_properties + region_unsampled_agent_properties
+    return response
 
-        num_out_of_region_conditional_agents = len(out_of_region_conditional_agent_states)
 
-        regions[i].clear_agents()
-        response = None
-        if len(all_agent_properties) > 0:
-            for attempt in range(num_attempts):
-                try:
-                    response = iai.initialize(
-                        location=location,
-                        states_history=None if len(all_agent_states) == 0 else [all_agent_states],
-                        agent_properties=all_agent_properties,
-                        get_infractions=get_infractions,
-                        traffic_light_state_history=traffic_light_state_history,
-                        location_of_interest=(region_center.x, region_center.y),
-                        random_seed=random_seed
-                    )
-
-                except InvertedAIError as e:
-                    # If error has occurred, display the warning and retry
-                    iai.logger.debug(f"Region initialize attempt {attempt} error: {e}")
-                    continue
+async def _async_initialize_colour(
+    region_params: List[dict],
+    max_concurrent_calls: Optional[int] = None
+) -> List[Union[Optional[InitializeResponse],Exception]]:
+    """
+    Call :func:`_async_initialize_region` concurrently for a set of regions that do not interact, with at most 
+    `max_concurrent_calls` regions in progress at any time. The error of a failed region is returned in place 
+    of its response, so that the responses of all other regions are kept.
+    """
 
-                # Initialization of this region was successful, break the loop and proceed to the next region
-                break
-            
-            else:
-                exception_string = f"Unable to initialize region {i} at {region.center} with size {region.size} after {num_attempts} attempts."
-                if return_exact_agents: 
-                    raise InvertedAIError(message=exception_string)
-                else:
-                    iai.logger.debug(exception_string)
-                    if num_region_conditional_agents > 0:
-                    # Get the recurrent states for all predefined agents within the region
-                        response = iai.initialize(
-                            location=location,
-                            states_history=[all_agent_states],
-                            agent_properties=all_agent_properties[:num_out_of_region_conditional_agents+num_region_conditional_agents],
-                            get_infractions=get_infractions,
-                            traffic_light_state_history=traffic_light_state_history,
-                            location_of_interest=(region_center.x, region_center.y),
-                            random_seed=random_seed,
-                            api_model_version=api_model_version
-                        )
-            
-            if response is not None:
-                # Filter out conditional agents from other regions
-                infractions = []
-                for j, (state, props, r_state) in enumerate(zip(
-                    response.agent_states[num_out_of_region_conditional_agents:],
-                    response.agent_properties[num_out_of_region_conditional_agents:],
-                    response.recurrent_states[num_out_of_region_conditional_agents:]
-                )):
-                    if not return_exact_agents:
-                        if not inside_fov(center=region_center, agent_scope_fov=region_size, point=state.center):
-                            continue
+    if max_concurrent_calls is None:
+        max_concurrent_calls = iai.session.max_connections or len(region_params)
+    semaphore = asyncio.Semaphore(max(max_concurrent_calls, 1))
 
-                    regions[i].insert_all_agent_details(state,props,r_state)
-                    if get_infractions:
-                        infractions.append(response.infractions[num_out_of_region_conditional_agents:][j])
+    async def initialize_region(params):
+        async with semaphore:
+            return await _async_initialize_region(**params)
 
-                response.infractions = infractions
+    return await asyncio.gather(*[initialize_region(params) for params in region_params], return_exceptions=True)
+
+
+def _insert_region_response(
+    region: Region,
+    response: InitializeResponse,
+    num_out_of_region_conditional_agents: int,
+    get_infractions: bool = False,
+    return_exact_agents: bool = False
+) -> InitializeResponse:
+    # Filter out conditional agents from other regions
+    infractions = []
+    for j, (state, props, r_state) in enumerate(zip(
+        response.agent_states[num_out_of_region_conditional_agents:],
+        response.agent_properties[num_out_of_region_conditional_agents:],
+        response.recurrent_states[num_out_of_region_conditional_agents:]
+    )):
+        if not return_exact_agents:
+            if not _inside_fov(center=region.center, agent_scope_fov=region.size, point=state.center):
+                continue
+
+        region.insert_all_agent_details(state,props,r_state)
+        if get_infractions:
+            infractions.append(response.infractions[num_out_of_region_conditional_agents:][j])
+
+    response.infractions = infractions
+    response.agent_states = region.agent_states
+    response.agent_properties = region.agent_properties
+    response.recurrent_states = region.recurrent_states
+
+    return response
+
+
+def _initialize_regions(
+    location: str,
+    regions: List[Region],
+    traffic_light_state_history: Optional[List[TrafficLightStatesDict]] = None,
+    get_infractions: bool = False,
+    random_seed: Optional[int] = None,
+    api_model_version: Optional[str] = None,
+    display_progress_bar: bool = True,
+    return_exact_agents: bool = False,
+    async_api_calls: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    checkpoint: Optional[RegionCheckpoint] = None
+) -> Tuple[List[Region],List[InitializeResponse]]:
+    
+    if async_api_calls:
+        region_schedule = _get_region_colours(regions)
+        if traffic_light_state_history is None and len(region_schedule) > 0 and len(region_schedule[0]) > 1:
+            # The traffic light states sampled for the first region are given to all other regions
+            region_schedule = [region_schedule[0][:1], region_schedule[0][1:]] + region_schedule[1:]
+    else:
+        region_schedule = [[i] for i in range(len(regions))]
+
+    progress_bar = tqdm(
+        total=len(regions),
+        desc=f"Initializing regions",
+        disable=not display_progress_bar
+    )
+
+    num_attempts = 1 + len(regions) // ATTEMPT_PER_NUM_REGIONS
+    agent_grid = RegionAgentGrid(regions)
+    region_responses = {}
+    for region_indexes in region_schedule:
+        # Regions scheduled together are too far apart to condition on each other's agents
+        region_params = []
+        for i in region_indexes:
+            if checkpoint is not None and i in checkpoint.region_responses:
+                # Restore the agents of a region completed by a previous run instead of initializing it again
+                response = checkpoint.region_responses[i]
+                regions[i].clear_agents()
+                progress_bar.update(1)
+                if response is None:
+                    continue
+
+                for state, props, r_state in zip(response.agent_states, response.agent_properties, response.recurrent_states):
+                    regions[i].insert_all_agent_details(state,props,r_state)
                 response.agent_states = regions[i].agent_states
                 response.agent_properties = regions[i].agent_properties
                 response.recurrent_states = regions[i].recurrent_states
-                all_responses.append(response)
-
+                region_responses[i] = response
                 if traffic_light_state_history is None and response.traffic_lights_states is not None:
                     traffic_light_state_history = [response.traffic_lights_states]
+                continue
+
+            all_agent_states, all_agent_properties, num_out_of_region_conditional_agents = _get_region_initialize_inputs(
+                regions = regions,
+                region_index = i,
+                agent_grid = agent_grid
+            )
+            regions[i].clear_agents()
+            if len(all_agent_properties) > 0:
+                region_params.append(dict(
+                    location = location,
+                    region = regions[i],
+                    region_index = i,
+                    all_agent_states = all_agent_states,
+                    all_agent_properties = all_agent_properties,
+                    num_out_of_region_conditional_agents = num_out_of_region_conditional_agents,
+                    num_attempts = num_attempts,
+                    traffic_light_state_history = traffic_light_state_history,
+                    get_infractions = get_infractions,
+                    random_seed = random_seed,
+                    api_model_version = api_model_version,
+                    return_exact_agents = return_exact_agents
+                ))
+            else:
+                #There are no agents to initialize within this region, proceed to the next region
+                progress_bar.update(1)
+
+        if async_api_calls and len(region_params) > 1:
+            responses = iai.session.run_async(_async_initialize_colour(
+                region_params = region_params,
+                max_concurrent_calls = max_concurrent_calls
+            ))
         else:
-            #There are no agents to initialize within this region, proceed to the next region
-            continue
+            responses = []
+            for params in region_params:
+                try:
+                    responses.append(_initialize_region(**params))
+                except Exception as e:
+                    responses.append(e)
+                    break
+
+        region_errors = []
+        for params, response in zip(region_params, responses):
+            if isinstance(response, Exception):
+                region_errors.append(response)
+                continue
+
+            progress_bar.update(1)
+            if response is not None:
+                response = _insert_region_response(
+                    region = params["region"],
+                    response = response,
+                    num_out_of_region_conditional_agents = params["num_out_of_region_conditional_agents"],
+                    get_infractions = get_infractions,
+                    return_exact_agents = return_exact_agents
+                )
+                region_responses[params["region_index"]] = response
+                if traffic_light_state_history is None and response.traffic_lights_states is not None:
+                    traffic_light_state_history = [response.traffic_lights_states]
+            if checkpoint is not None:
+                checkpoint.append(params["region_index"], response)
+
+        if len(region_errors) > 0:
+            # Completed regions are kept in the checkpoint, if any, so that a new run can resume from them
+            progress_bar.close()
+            raise region_errors[0]
+
+        for i in region_indexes:
+            agent_grid.update_region(i, regions[i].agent_states)
+
+    progress_bar.close()
+    all_responses = [region_responses[i] for i in sorted(region_responses)]
 
     return regions, all_responses
 
@@ -534,7 +779,10 @@ def large_initialize(
     random_seed: Optional[int] = None,
     api_model_version: Optional[str] = None,
     display_progress_bar: bool = True,
-    return_exact_agents: bool = False
+    return_exact_agents: bool = False,
+    async_api_calls: bool = False,
+    max_concurrent_calls: Optional[int] = None,
+    checkpoint_path: Optional[str] = None
 ) -> InitializeResponse:
     """
     A utility function to initialize an area larger than 100x100m. This function takes in a 
@@ -595,6 +843,25 @@ def large_initialize(
         the requested number of agents in any single region. If set to False, a region that 
         fails to return the number of requested agents will be skipped and only its predefined 
         agents (if any) will be returned with respective RecurrentState's. 
+
+    async_api_calls:
+        A flag to control whether to initialize regions concurrently with asynchronous INITIALIZE calls.
+        Regions whose centers are close enough for their agents to be conditional agents of each other
+        are never initialized at the same time, so every region still conditions on the agents already
+        placed in all nearby regions initialized before it. As the regions are initialized in a different
+        order, the result for a given `random_seed` differs from the default, in which regions are initialized
+        one at a time in the given order.
+
+    max_concurrent_calls:
+        The maximum number of asynchronous :func:`initialize` calls in progress at any time, by default the
+        maximum number of connections of the session.
+
+    checkpoint_path:
+        If provided, the response of each region is appended to this file as soon as the region is 
+        completed. If this function fails or is interrupted, calling it again with the same inputs and 
+        random seed skips the regions completed so far and continues from there. A checkpoint written 
+        for different inputs is replaced. The file is kept after a successful run, so that calling this 
+        function again with the same inputs returns the same agents without calling :func:`initialize`.
     
     See Also
     --------
@@ -634,6 +901,22 @@ def large_initialize(
         random_seed = random_seed
     )
 
+    checkpoint = None
+    if checkpoint_path is not None:
+        checkpoint = RegionCheckpoint(
+            path = checkpoint_path,
+            fingerprint = get_checkpoint_fingerprint(
+                regions = regions,
+                location = location,
+                traffic_light_state_history = traffic_light_state_history,
+                get_infractions = get_infractions,
+                random_seed = random_seed,
+                api_model_version = api_model_version,
+                return_exact_agents = return_exact_agents,
+                async_api_calls = async_api_calls
+            )
+        )
+
     regions, all_responses = _initialize_regions(
         location = location,
         regions = regions,
@@ -642,7 +925,10 @@ def large_initialize(
         random_seed = random_seed,
         api_model_version = api_model_version,
         display_progress_bar = display_progress_bar,
-        return_exact_agents = return_exact_agents
+        return_exact_agents = return_exact_agents,
+        async_api_calls = async_api_calls,
+        max_concurrent_calls = max_concurrent_calls,
+        checkpoint = checkpoint
     )
 
     response = _consolidate_all_responses(
@@ -0,0 +1,423 @@
+import json
+import struct
+import zipfile
+import numpy as np
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from invertedai.common import (
+    AgentProperties,
+    AgentState,
+    AgentStateBatch,
+    LightRecurrentState,
+    Point,
+    RecurrentState,
+    TrafficLightState
+)
+from invertedai.logs.logger import ScenarioLog, LogWriter
+
+COLUMNAR_LOG_FORMAT_VERSION = 1
+COLUMNAR_LOG_EXTENSION = ".npz"
+#: Traffic light states in the order of their integer codes, a code of -1 marks a light without a state.
+TRAFFIC_LIGHT_STATE_CODES = [state.value for state in TrafficLightState]
+
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def _optional_float(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+def _float_or_none(value: float) -> Optional[float]:
+    return None if np.isnan(value) else value
+
+
+def _memmap_npz(path: str) -> Dict[str,np.ndarray]:
+    # Arrays saved with np.savez are stored uncompressed, so each one can be memory mapped at the offset of
+    # its data within the archive. np.load ignores mmap_mode for archives.
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            f.seek(info.header_offset)
+            local_header = f.read(_ZIP_LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if info.compress_type != zipfile.ZIP_STORED or dtype.hasobject or int(np.prod(shape)) == 0 or len(shape) == 0:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+            else:
+                arrays[name] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=f.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C"
+                )
+    return arrays
+
+
+class ColumnarLog:
+    """
+    A scenario log stored column-wise in arrays, as an alternative to the IAI JSON log format for long
+    simulations with many agents. Agent states are stored as an array of shape (T, A, 4) for T time steps
+    and A agents with a mask of shape (T, A) of the agents present at each time step, agent properties as
+    one array per property, and traffic light states as an array of integer codes of shape (T, L) for L
+    traffic lights. A log is saved as an uncompressed `.npz` file, whose arrays are memory mapped when it
+    is loaded, so only the time steps that are accessed are read from disk.
+
+    Agent properties other than the length, width, rear axis offset, agent type and maximum speed are not
+    stored.
+    """
+
+    def __init__(
+        self,
+        arrays: Dict[str,np.ndarray],
+        metadata: Dict[str,Any]
+    ):
+        self.agent_states = arrays["agent_states"] #: Array of shape (T, A, 4) of x, y, orientation and speed, NaN for absent agents.
+        self.present = arrays["present"] #: Boolean array of shape (T, A) of the agents present at each time step.
+        self.agent_lengths = arrays["agent_lengths"] #: Length of each agent, NaN if not given.
+        self.agent_widths = arrays["agent_widths"] #: Width of each agent, NaN if not given.
+        self.agent_rear_axis_offsets = arrays["agent_rear_axis_offsets"] #: Rear axis offset of each agent, NaN if not given.
+        self.agent_max_speeds = arrays["agent_max_speeds"] #: Maximum speed of each agent, NaN if not given.
+        self.agent_types = arrays["agent_types"] #: Agent type of each agent.
+        self.traffic_light_ids = arrays["traffic_light_ids"] #: IDs of all traffic lights with a state in the log.
+        self.traffic_lights_states = arrays["traffic_lights_states"] #: Array of shape (T, L) of indexes into `TRAFFIC_LIGHT_STATE_CODES`.
+        self.waypoint_agent_ids = arrays["waypoint_agent_ids"] #: Agent IDs with waypoints, as in `ScenarioLog.waypoints`.
+        self.waypoint_offsets = arrays["waypoint_offsets"] #: Start of the waypoints of each agent ID in `waypoint_points`, followed by the total number of waypoints.
+        self.waypoint_points = arrays["waypoint_points"] #: Array of shape (W, 2) of the waypoints of all agent IDs.
+        self.recurrent_states = arrays.get("recurrent_states") #: Recurrent states of the agents present at the last time step, if any.
+        self.metadata = metadata #: All remaining fields of the scenario log.
+
+    @property
+    def simulation_length(self) -> int:
+        return self.agent_states.shape[0]
+
+    @property
+    def num_agents(self) -> int:
+        return self.agent_states.shape[1]
+
+    def get_present_indexes(self, timestep: int) -> List[int]:
+        """
+        Return the indexes of the agents present at the given time step.
+        """
+
+        return np.flatnonzero(self.present[timestep]).tolist()
+
+    def get_agent_states(self, timestep: int) -> AgentStateBatch:
+        """
+        Return the states of the agents present at the given time step, ordered by agent index.
+        """
+
+        return AgentStateBatch.fromlist(self.agent_states[timestep][self.present[timestep]])
+
+    def get_agent_state_list(self, timestep: int) -> List[AgentState]:
+        """
+        Return the states of the agents present at the given time step as a list of :class:`AgentState`, ordered by agent index.
+        """
+
+        return [AgentState.fromlist(state, trusted=True) for state in self.agent_states[timestep][self.present[timestep]].tolist()]
+
+    def get_agent_properties(self) -> List[AgentProperties]:
+        """
+        Return the properties of all agents in the log.
+        """
+
+        return [
+            AgentProperties(
+                length=_float_or_none(length),
+                width=_float_or_none(width),
+                rear_axis_offset=_float_or_none(rear_axis_offset),
+                agent_type=str(agent_type),
+                max_speed=_float_or_none(max_speed)
+            ) for length, width, rear_axis_offset, agent_type, max_speed in zip(
+                self.agent_lengths.tolist(),
+                self.agent_widths.tolist(),
+                self.agent_rear_axis_offsets.tolist(),
+                self.agent_types.tolist(),
+                self.agent_max_speeds.tolist()
+            )
+        ]
+
+    def get_traffic_lights_states(self, timestep: int) -> Dict[int,TrafficLightState]:
+        """
+        Return the states of the traffic lights at the given time step.
+        """
+
+        return {
+            light_id: TrafficLightState(TRAFFIC_LIGHT_STATE_CODES[code])
+            for light_id, code in zip(self.traffic_light_ids.tolist(), self.traffic_lights_states[timestep].tolist())
+            if code >= 0
+        }
+
+    def to_scenario_log(
+        self,
+        timestep_range: Optional[Tuple[int,int]] = None
+    ) -> ScenarioLog:
+        """
+        Build a :class:`ScenarioLog` from the whole log, or from the time steps in the given half-open range
+        of time steps. Only the arrays of those time steps are read.
+        """
+
+        start, end = (0, self.simulation_length) if timestep_range is None else timestep_range
+        agent_states, present_indexes = [], []
+        for timestep in range(start, end):
+            agent_states.append(self.get_agent_state_list(timestep))
+            present_indexes.append(self.get_present_indexes(timestep))
+
+        traffic_lights_states = None
+        if self.metadata["has_traffic_lights_states"]:
+            traffic_lights_states = [
+                self.get_traffic_lights_states(timestep)
+                for timestep in range(start, min(end, self.traffic_lights_states.shape[0]))
+            ]
+
+        waypoints = None
+        if len(self.waypoint_agent_ids) > 0 or self.metadata["has_waypoints"]:
+            waypoint_offsets = self.waypoint_offsets.tolist()
+            waypoint_points = self.waypoint_points.tolist()
+            waypoints = {
+                str(agent_id): [Point.fromlist(point, trusted=True) for point in waypoint_points[waypoint_offsets[i]:waypoint_offsets[i+1]]]
+                for i, agent_id in enumerate(self.waypoint_agent_ids.tolist())
+            }
+
+        metadata = self.metadata
+        return ScenarioLog.model_construct(
+            agent_states=agent_states,
+            agent_properties=self.get_agent_properties(),
+            traffic_lights_states=traffic_lights_states,
+            location=metadata["location"],
+            rendering_center=None if metadata["rendering_center"] is None else tuple(metadata["rendering_center"]),
+            rendering_fov=metadata["rendering_fov"],
+            lights_random_seed=metadata["lights_random_seed"],
+            initialize_random_seed=metadata["initialize_random_seed"],
+            drive_random_seed=metadata["drive_random_seed"],
+            initialize_model_version=metadata["initialize_model_version"],
+            drive_model_version=metadata["drive_model_version"],
+            light_recurrent_states=None if metadata["light_recurrent_states"] is None else [
+                LightRecurrentState.fromlist(state) for state in metadata["light_recurrent_states"]
+            ],
+            recurrent_states=None if self.recurrent_states is None else [
+                RecurrentState.fromval(packed) for packed in self.recurrent_states.tolist()
+            ],
+            waypoints=waypoints,
+            present_indexes=present_indexes
+        )
+
+    @classmethod
+    def from_scenario_log(
+        cls,
+        scenario_log: ScenarioLog
+    ) -> "ColumnarLog":
+        """
+        Convert a :class:`ScenarioLog` into columns.
+        """
+
+        num_timesteps, num_agents = len(scenario_log.agent_states), len(scenario_log.agent_properties)
+        present_indexes = scenario_log.present_indexes
+        if present_indexes is None:
+            present_indexes = [list(range(num_agents))] * num_timesteps
+
+        agent_states = np.full((num_timesteps, num_agents, 4), np.nan)
+        present = np.zeros((num_timesteps, num_agents), dtype=bool)
+        for timestep, (states, indexes) in enumerate(zip(scenario_log.agent_states, present_indexes)):
+            if len(indexes) == 0:
+                continue
+            agent_states[timestep, indexes] = [state.tolist() for state in states]
+            present[timestep, indexes] = True
+
+        traffic_light_ids = sorted({
+            light_id for states in (scenario_log.traffic_lights_states or []) for light_id in states.keys()
+        })
+        traffic_lights_states = np.full((len(scenario_log.traffic_lights_states or []), len(traffic_light_ids)), -1, dtype=np.int8)
+        light_columns = {light_id: column for column, light_id in enumerate(traffic_light_ids)}
+        for timestep, states in enumerate(scenario_log.traffic_lights_states or []):
+            for light_id, state in states.items():
+                traffic_lights_states[timestep, light_columns[light_id]] = TRAFFIC_LIGHT_STATE_CODES.index(TrafficLightState(state).value)
+
+        waypoints = scenario_log.waypoints or {}
+        properties = scenario_log.agent_properties
+        arrays = dict(
+            agent_states=agent_states,
+            present=present,
+            agent_lengths=np.array([_optional_float(prop.length) for prop in properties], dtype=np.float64),
+            agent_widths=np.array([_optional_float(prop.width) for prop in properties], dtype=np.float64),
+            agent_rear_axis_offsets=np.array([_optional_float(prop.rear_axis_offset) for prop in properties], dtype=np.float64),
+            agent_max_speeds=np.array([_optional_float(prop.max_speed) for prop in properties], dtype=np.float64),
+            agent_types=np.array([str(prop.agent_type) for prop in properties], dtype=str),
+            traffic_light_ids=np.array(traffic_light_ids, dtype=np.int64),
+            traffic_lights_states=traffic_lights_states,
+            waypoint_agent_ids=np.array(list(waypoints.keys()), dtype=str),
+            waypoint_offsets=np.cumsum([0] + [len(points) for points in waypoints.values()], dtype=np.int64),
+            waypoint_points=np.array([[point.x, point.y] for points in waypoints.values() for point in points], dtype=np.float64).reshape(-1, 2)
+        )
+        if scenario_log.recurrent_states is not None:
+            arrays["recurrent_states"] = np.array([state.packed for state in scenario_log.recurrent_states], dtype=np.float64)
+
+        metadata = dict(
+            location=scenario_log.location,
+            rendering_center=None if scenario_log.rendering_center is None else list(scenario_log.rendering_center),
+            rendering_fov=scenario_log.rendering_fov,
+            lights_random_seed=scenario_log.lights_random_seed,
+            initialize_random_seed=scenario_log.initialize_random_seed,
+            drive_random_seed=scenario_log.drive_random_seed,
+            initialize_model_version=scenario_log.initialize_model_version,
+            drive_model_version=scenario_log.drive_model_version,
+            light_recurrent_states=None if scenario_log.light_recurrent_states is None else [
+                state.tolist() for state in scenario_log.light_recurrent_states
+            ],
+            has_traffic_lights_states=scenario_log.traffic_lights_states is not None,
+            has_waypoints=scenario_log.waypoints is not None
+        )
+        return cls(arrays, metadata)
+
+    @classmethod
+    def from_iai_json(
+        cls,
+        log_data: Dict[str,Any]
+    ) -> "ColumnarLog":
+        """
+        Convert a loaded log in the IAI JSON format, as written by :func:`LogWriter.export_to_file`, into columns.
+        Agents are indexed in the order in which they appear in the log, as in :class:`LogReader`.
+        """
+
+        num_timesteps = log_data["scenario_length"]
+        agents = list(log_data["predetermined_agents"].values())
+        agent_states = np.full((num_timesteps, len(agents), 4), np.nan)
+        present = np.zeros((num_timesteps, len(agents)), dtype=bool)
+        for agent_index, agent in enumerate(agents):
+            for timestep, state in agent["states"].items():
+                timestep = int(timestep)
+                if timestep >= num_timesteps:
+                    continue
+                agent_states[timestep, agent_index] = (state["center"]["x"], state["center"]["y"], state["orientation"], state["speed"])
+                present[timestep, agent_index] = True
+
+        traffic_lights = {
+            int(actor_id): actor["states"] for actor_id, actor in log_data["predetermined_controls"].items()
+            if actor["entity_type"] == "traffic_light"
+        }
+        traffic_light_ids = list(traffic_lights.keys())
+        traffic_lights_states = np.full((num_timesteps if traffic_lights else 0, len(traffic_light_ids)), -1, dtype=np.int8)
+        for column, states in enumerate(traffic_lights.values()):
+            for timestep in range(traffic_lights_states.shape[0]):
+                traffic_lights_states[timestep, column] = TRAFFIC_LIGHT_STATE_CODES.index(states[str(timestep)]["control_state"])
+
+        suggestions = log_data["individual_suggestions"]
+        arrays = dict(
+            agent_states=agent_states,
+            present=present,
+            agent_lengths=np.array([_optional_float(agent["static_attributes"]["length"]) for agent in agents], dtype=np.float64),
+            agent_widths=np.array([_optional_float(agent["static_attributes"]["width"]) for agent in agents], dtype=np.float64),
+            agent_rear_axis_offsets=np.array([_optional_float(agent["static_attributes"]["rear_axis_offset"]) for agent in agents], dtype=np.float64),
+            agent_max_speeds=np.full(len(agents), np.nan),
+            agent_types=np.array([str(agent["entity_type"]) for agent in agents], dtype=str),
+            traffic_light_ids=np.array(traffic_light_ids, dtype=np.int64),
+            traffic_lights_states=traffic_lights_states,
+            waypoint_agent_ids=np.array(list(suggestions.keys()), dtype=str),
+            waypoint_offsets=np.cumsum([0] + [len(suggestion["states"]) for suggestion in suggestions.values()], dtype=np.int64),
+            waypoint_points=np.array([
+                [point["center"]["x"], point["center"]["y"]] for suggestion in suggestions.values() for point in suggestion["states"]
+            ], dtype=np.float64).reshape(-1, 2)
+        )
+
+        metadata = dict(
+            location=log_data["location"]["identifier"],
+            rendering_center=log_data["birdview_options"]["rendering_center"][:2],
+            rendering_fov=log_data["birdview_options"]["renderingFOV"],
+            lights_random_seed=log_data.get("lights_random_seed"),
+            initialize_random_seed=log_data.get("initialize_random_seed"),
+            drive_random_seed=log_data["drive_random_seed"],
+            initialize_model_version=log_data.get("initialize_model_version"),
+            drive_model_version=log_data["drive_model_version"],
+            light_recurrent_states=log_data["light_recurrent_states"],
+            has_traffic_lights_states=len(traffic_lights) > 0,
+            has_waypoints=len(suggestions) > 0
+        )
+        return cls(arrays, metadata)
+
+    def save(
+        self,
+        log_path: str
+    ):
+        """
+        Save the log to an uncompressed `.npz` file at the given path.
+        """
+
+        arrays = dict(
+            agent_states=self.agent_states,
+            present=self.present,
+            agent_lengths=self.agent_lengths,
+            agent_widths=self.agent_widths,
+            agent_rear_axis_offsets=self.agent_rear_axis_offsets,
+            agent_max_speeds=self.agent_max_speeds,
+            agent_types=self.agent_types,
+            traffic_light_ids=self.traffic_light_ids,
+            traffic_lights_states=self.traffic_lights_states,
+            waypoint_agent_ids=self.waypoint_agent_ids,
+            waypoint_offsets=self.waypoint_offsets,
+            waypoint_points=self.waypoint_points,
+            metadata=np.array(json.dumps(dict(format_version=COLUMNAR_LOG_FORMAT_VERSION, **self.metadata)))
+        )
+        if self.recurrent_states is not None:
+            arrays["recurrent_states"] = self.recurrent_states
+        with open(log_path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(
+        cls,
+        log_path: str,
+        mmap: bool = True
+    ) -> "ColumnarLog":
+        """
+        Load a log saved with :func:`save`. Unless `mmap` is False, the arrays are memory mapped rather than
+        read into memory.
+        """
+
+        if mmap:
+            arrays = _memmap_npz(log_path)
+        else:
+            with np.load(log_path) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+        metadata = json.loads(str(arrays.pop("metadata")))
+        format_version = metadata.pop("format_version")
+        if format_version > COLUMNAR_LOG_FORMAT_VERSION:
+            raise ValueError(f"Columnar log format version {format_version} is not supported by this version of the SDK.")
+        return cls(arrays, metadata)
+
+
+def convert_iai_json_to_columnar_log(
+    json_log_path: str,
+    columnar_log_path: str
+):
+    """
+    Convert a log file in the IAI JSON format into a columnar log file.
+    """
+
+    with open(json_log_path) as f:
+        log_data = json.load(f)
+    ColumnarLog.from_iai_json(log_data).save(columnar_log_path)
+
+
+def convert_columnar_log_to_iai_json(
+    columnar_log_path: str,
+    json_log_path: str
+):
+    """
+    Convert a columnar log file into a log file in the IAI JSON format. As with :func:`LogWriter.export_to_file`,
+    the static actors of the location are requested with :func:`location_info`.
+    """
+
+    LogWriter.export_log_to_file(
+        log_path=json_log_path,
+        scenario_log=ColumnarLog.load(columnar_log_path).to_scenario_log()
+    )
@@ -1,21 +1,74 @@
+import atexit
 import logging
 import json
 import os
+import queue
+import threading
+import warnings
 
 import invertedai as iai
+from invertedai.error import InvertedAIError
 from invertedai.common import AgentState, AgentProperties, TrafficLightState, RecurrentState, LightRecurrentState, Image, StaticMapActor, Point
 from invertedai.api.location import LocationResponse
 
 from collections import defaultdict
-from typing import List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Tuple, Union
 from datetime import datetime, timezone
 import matplotlib.pyplot as plt
 
 logger = logging.getLogger(__name__)
 
+DEBUG_LOG_MODELS = ("location_info", "initialize", "drive", "large_initialize", "large_drive")
+DEBUG_LOG_QUEUE_SIZE = 1024
+DEBUG_LOG_TIMEOUT = 10
+
+_CLOSE_WRITER = object()
+
+
+def _load_payload(payload: Union[str,Dict]) -> Dict:
+    # Debug logs written before the JSON lines format stored every payload as a JSON string
+    return json.loads(payload) if isinstance(payload, str) else payload
+
+
+def read_debug_log(debug_log_path: str) -> Dict[str,List[Any]]:
+    """
+    Read a debug log into a dictionary holding, for each model and event type, the list of logged payloads
+    under keys such as `drive_requests` and the list of their timestamps under keys such as
+    `drive_request_timestamps`. Both the JSON lines format and the single JSON dictionary written by
+    earlier versions of the SDK are supported. An incomplete last line, left by an interrupted program,
+    is ignored.
+    """
+
+    log_data = defaultdict(list)
+    with open(debug_log_path) as log_file:
+        lines = log_file.readlines()
+    for line_number, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            if line_number == len(lines) - 1:
+                logger.warning(f"Ignoring incomplete last line of debug log {debug_log_path}")
+                break
+            raise
+        if "event" not in record:
+            # Legacy format, a single dictionary of lists of JSON strings
+            return {key: [_load_payload(value) for value in values] if not key.endswith("_timestamps") else values for key, values in record.items()}
+        log_data[f"{record['model']}_{record['event']}s"].append(record["data"])
+        log_data[f"{record['model']}_{record['event']}_timestamps"].append(record["timestamp"])
+    return dict(log_data)
+
+
 class DebugLogger:
     """
     A tool for capturing debug logs which contain all serialized data from every request and response.
+    Each request and response is serialized and appended as one line of JSON to the log file by a background
+    thread, so logging takes constant time per event regardless of the length of the simulation. The logged
+    data must therefore not be modified in place after it is passed to the logger. At most `DEBUG_LOG_QUEUE_SIZE`
+    events wait to be written before logging blocks, and all pending events are written when the logger is
+    closed, at the latest when the program exits. An error raised by the background thread is raised again by
+    the next call to log an event, :func:`flush` or :func:`close`. Use :func:`read_debug_log` to load a debug log.
 
     Parameters
     ----------
@@ -30,12 +83,37 @@ class DebugLogger:
         self.debug_dir_path = debug_dir_path
         self._create_directory()
 
-        self.data = defaultdict(list)
-
-        file_name = "iai_log_" + self._get_current_time_human_readable_UTC() + "_UTC.json"
+        file_name = "iai_log_" + self._get_current_time_human_readable_UTC() + "_UTC.jsonl"
         self.debug_log_path = os.path.join(self.debug_dir_path,file_name)
 
+        self._queue = queue.Queue(maxsize=DEBUG_LOG_QUEUE_SIZE)
+        self._is_closed = False
+        self._writer_error = None
+        self._writer_thread = threading.Thread(
+            target=self._write_events,
+            name="iai-debug-logger",
+            daemon=True
+        )
+        self._writer_thread.start()
+        atexit.register(self.close)
+
+    @property
+    def data(self) -> Dict[str,List[Any]]:
+        """
+        Deprecated, use :func:`read_debug_log` on `debug_log_path` instead. All events logged so far, with each
+        payload as a JSON string, in the format the debug logger kept in memory before logs were written as JSON lines.
+        """
+
+        warnings.warn("DebugLogger.data is deprecated. Please use read_debug_log(debug_logger.debug_log_path).", category=DeprecationWarning)
+        self.flush()
+        log_data = defaultdict(list)
+        if os.path.exists(self.debug_log_path):
+            for key, values in read_debug_log(self.debug_log_path).items():
+                log_data[key] = values if key.endswith("_timestamps") else [json.dumps(value) for value in values]
+        return log_data
+
     def reinitialize_logger(self):
+        self.close()
         self.__init__(debug_dir_path = self.debug_dir_path)
 
     def _get_current_time_human_readable_UTC(self):
@@ -46,69 +124,140 @@ class DebugLogger:
             logger.info(f"Debug log directory does not exist: Created new directory at {self.debug_dir_path}")
             os.makedirs(self.debug_dir_path)
 
-    def append_request(
+    def _write_events(self):
+        outfile = None
+        try:
+            while True:
+                events = [self._queue.get()]
+                # Write all events queued in the meantime at once
+                while events[-1] is not _CLOSE_WRITER:
+                    try:
+                        events.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines, flush_events = [], []
+                for event in events:
+                    if isinstance(event, threading.Event):
+                        flush_events.append(event)
+                    elif event is not _CLOSE_WRITER:
+                        try:
+                            lines.append(json.dumps(event) + "\n")
+                        except (TypeError, ValueError) as e:
+                            self._writer_error = e
+                if lines:
+                    try:
+                        if outfile is None:
+                            outfile = open(self.debug_log_path, "a")
+                        outfile.write("".join(lines))
+                        outfile.flush()
+                    except OSError as e:
+                        self._writer_error = e
+                for flush_event in flush_events:
+                    flush_event.set()
+                if events[-1] is _CLOSE_WRITER:
+                    return
+        except BaseException as e:
+            self._writer_error = e
+            raise
+        finally:
+            if outfile is not None:
+                outfile.close()
+
+    def _raise_writer_error(self):
+        # Each error of the background thread is raised once
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise error
+        if not self._is_closed and not self._writer_thread.is_alive():
+            raise InvertedAIError(message=f"Debug log writer for {self.debug_log_path} stopped unexpectedly.")
+
+    def _put(self, item):
+        # Waits for space in the queue while checking that the background thread is still writing
+        while True:
+            self._raise_writer_error()
+            try:
+                self._queue.put(item, timeout=DEBUG_LOG_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def _append_event(
         self,
         model: str,
+        event: str,
         data_dict: Optional[dict] = None
     ):
-        ts = self._get_current_time_human_readable_UTC()
-        data_str = json.dumps(data_dict)
-
-        if model == "location_info":
-            self.data["location_info_requests"].append(data_str)
-            self.data["location_info_request_timestamps"].append(ts)
-
-        elif model == "initialize":
-            self.data["initialize_requests"].append(data_str)
-            self.data["initialize_request_timestamps"].append(ts)
-
-        elif model == "drive":
-            self.data["drive_requests"].append(data_str)
-            self.data["drive_request_timestamps"].append(ts)
-
-        elif model == "large_initialize":
-            self.data["large_initialize_requests"].append(data_str)
-            self.data["large_initialize_request_timestamps"].append(ts)
-
-        elif model == "large_drive":
-            self.data["large_drive_requests"].append(data_str)
-            self.data["large_drive_request_timestamps"].append(ts)
+        if model not in DEBUG_LOG_MODELS:
+            return
+        if self._is_closed:
+            logger.warning(f"Debug logger is closed, {model} {event} not written to {self.debug_log_path}")
+            return
+        # Serialized by the background thread, callers may still replace the values of the dictionary
+        self._put(dict(
+            model=model,
+            event=event,
+            timestamp=self._get_current_time_human_readable_UTC(),
+            data=dict(data_dict) if isinstance(data_dict, dict) else data_dict
+        ))
 
-        self.write_data_to_log()
+    def append_request(
+        self,
+        model: str,
+        data_dict: Optional[dict] = None
+    ):
+        self._append_event(model, "request", data_dict)
 
     def append_response(
         self,
         model: str,
         data_dict: Optional[dict] = None
     ):
-        ts = self._get_current_time_human_readable_UTC()
-        data_str = json.dumps(data_dict)
-
-        if model == "location_info":
-            self.data["location_info_responses"].append(data_str)
-            self.data["location_info_response_timestamps"].append(ts)
+        self._append_event(model, "response", data_dict)
 
-        elif model == "initialize":
-            self.data["initialize_responses"].append(data_str)
-            self.data["initialize_response_timestamps"].append(ts)
-
-        elif model == "drive":
-            self.data["drive_responses"].append(data_str)
-            self.data["drive_response_timestamps"].append(ts)
+    def flush(
+        self,
+        timeout: Optional[float] = DEBUG_LOG_TIMEOUT
+    ):
+        """
+        Wait until all events logged so far are written to the log file, raising a TimeoutError if this takes
+        longer than `timeout` seconds.
+        """
 
-        elif model == "large_initialize":
-            self.data["large_initialize_responses"].append(data_str)
-            self.data["large_initialize_response_timestamps"].append(ts)
+        if self._is_closed:
+            self._raise_writer_error()
+            return
+        is_written = threading.Event()
+        self._put(is_written)
+        if not is_written.wait(timeout):
+            self._raise_writer_error()
+            raise TimeoutError(f"Debug log events not written to {self.debug_log_path} within {timeout} seconds.")
+        self._raise_writer_error()
 
-        elif model == "large_drive":
-            self.data["large_drive_responses"].append(data_str)
-            self.data["large_drive_response_timestamps"].append(ts)
+    def write_data_to_log(self):
+        self.flush()
 
-        self.write_data_to_log()
+    def close(
+        self,
+        timeout: Optional[float] = DEBUG_LOG_TIMEOUT
+    ):
+        """
+        Write all pending events and stop the background writer, waiting at most `timeout` seconds.
+        Called automatically when the program exits.
+        """
 
-    def write_data_to_log(self):
-        with open(self.debug_log_path, "w") as outfile:
-            json.dump(self.data, outfile)
+        if self._is_closed:
+            return
+        self._is_closed = True
+        atexit.unregister(self.close)
+        if self._writer_thread.is_alive():
+            try:
+                self._queue.put(_CLOSE_WRITER, timeout=timeout)
+            except queue.Full:
+                pass
+            self._writer_thread.join(timeout)
+            if self._writer_thread.is_alive():
+                logger.warning(f"Debug log writer did not finish within {timeout} seconds, pending events may be missing from {self.debug_log_path}")
+        self._raise_writer_error()
 
     def _get_scene_plotter(
         self,
@@ -120,8 +269,8 @@ class DebugLogger:
         location = None
         if "location_info_responses" in log_data:
             if len(log_data["location_info_responses"]) > 0:
-                location = json.loads(log_data["location_info_requests"][-1])["location"]
-                lir = json.loads(log_data["location_info_responses"][-1])
+                location = _load_payload(log_data["location_info_requests"][-1])["location"]
+                lir = _load_payload(log_data["location_info_responses"][-1])
                 location_info_response = LocationResponse(
                     version=lir["version"],
                     max_agent_number=lir["max_agent_number"],
@@ -136,7 +285,7 @@ class DebugLogger:
         if location_info_response is None:
             if "initialize_requests" in log_data:
                 if len(log_data["initialize_requests"]) > 0:
-                    location = json.loads(log_data["initialize_requests"][-1])["location"]
+                    location = _load_payload(log_data["initialize_requests"][-1])["location"]
                     location_info_response = iai.location_info(
                         location = location,
                         rendering_fov = fov,
@@ -149,6 +298,7 @@ class DebugLogger:
         if len(log_data["initialize_responses"]) <= 0:
             raise Exception("No initialize responses to visualize.")
         rendered_static_map = location_info_response.birdview_image.decode()
+        initialize_response = _load_payload(log_data["initialize_responses"][-1])
 
         all_properties = [AgentProperties(
             length=s["length"],
@@ -156,12 +306,12 @@ class DebugLogger:
             rear_axis_offset=s["rear_axis_offset"],
             agent_type=s["agent_type"],
             waypoint=s["waypoint"],
-            max_speed=s["max_speed"]) for s in json.loads(log_data["initialize_responses"][-1])["agent_properties"]
+            max_speed=s["max_speed"]) for s in initialize_response["agent_properties"]
         ]
-        agent_states = [AgentState.fromlist(s) for s in json.loads(log_data["initialize_responses"][-1])["agent_states"]]
-        recurrent_states = [RecurrentState.fromval(s) for s in json.loads(log_data["initialize_responses"][-1])["recurrent_states"]]
-        traffic_light_states = json.loads(log_data["initialize_responses"][-1])["traffic_lights_states"]
-        lrs = json.loads(log_data["initialize_responses"][-1])["light_recurrent_states"]
+        agent_states = [AgentState.fromlist(s) for s in initialize_response["agent_states"]]
+        recurrent_states = [RecurrentState.fromval(s) for s in initialize_response["recurrent_states"]]
+        traffic_light_states = initialize_response["traffic_lights_states"]
+        lrs = initialize_response["light_recurrent_states"]
         light_recurrent_states = [LightRecurrentState(
             state=s[0], 
             time_remaining=s[1]) for s in lrs
@@ -206,7 +356,7 @@ class DebugLogger:
         Parameters
         ----------
         log_data:
-            A loaded JSON dictionary of a debug log.
+            A debug log loaded with :func:`read_debug_log`.
         gif_name:
             The path and name of the resulting GIF file.
         fov:
@@ -223,7 +373,7 @@ class DebugLogger:
         )
 
         for response_json in log_data["drive_responses"]:
-            response = json.loads(response_json)
+            response = _load_payload(response_json)
             scene_plotter.record_step([AgentState.fromlist(s) for s in response["agent_states"]],response["traffic_lights_states"])
 
         # save the visualization to disk
@@ -255,7 +405,7 @@ class DebugLogger:
         Parameters
         ----------
         log_data:
-            A loaded JSON dictionary of a debug log.
+            A debug log loaded with :func:`read_debug_log`.
         gif_name:
             The path and name of the resulting GIF file.
         fov:
@@ -279,7 +429,7 @@ class DebugLogger:
         light_recurrent_states = response_data["light_recurrent_states"]
 
         for request_json in log_data["drive_requests"]:
-            request = json.loads(request_json)
+            request = _load_payload(request_json)
             response = iai.large_drive(
                 location = response_data["location"],
                 agent_states = agent_states,
@@ -322,29 +472,28 @@ class DebugLogger:
 
         Parameters
         ----------
-        log_data:
-            A loaded JSON dictionary of a debug log.
+        debug_log_path:
+            The full path to the debug log file, in either the JSON lines or the earlier JSON format.
         is_visualize_log:
             A flag to control whether the log is visualized. Please refer to the appropriate function for the relevant keyword arguments.
         is_reproduce_log:
             A flag to control whether the log is reproduced. Please refer to the appropriate function for the relevant keyword arguments.
         """
 
-        with open(debug_log_path) as json_file:
-            log_data = json.load(json_file)
+        log_data = read_debug_log(debug_log_path)
 
-            if is_visualize_log:
-                cls.visualize_log(
-                    log_data=log_data,
-                    **kwargs
-                )
-            if is_reproduce_log:
-                cls.reproduce_log(
-                    log_data=log_data,
-                    **kwargs
-                )
+        if is_visualize_log:
+            cls.visualize_log(
+                log_data=log_data,
+                **kwargs
+            )
+        if is_reproduce_log:
+            cls.reproduce_log(
+                log_data=log_data,
+                **kwargs
+            )
 
-            return log_data
+        return log_data
 
 
     
\ No newline at end of file
@@ -1,4 +1,3 @@
-import json
 import argparse
 import invertedai as iai
 import matplotlib.pyplot as plt
@@ -7,6 +6,8 @@ from enum import Enum
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Union
 
+from invertedai.logs.debug_logger import read_debug_log, _load_payload
+
 DIAGNOSTIC_ISSUE_LIBRARY = {
     10:"Agent state index change",
     11:"Agent state modified or removed before next request",
@@ -44,9 +45,7 @@ class DiagnosticTool:
         ego_indexes: List[int] = None
     ):
         self.debug_log_path = debug_log_path
-        self.log_data = None
-        with open(debug_log_path) as json_file:
-            self.log_data = json.load(json_file)
+        self.log_data = read_debug_log(debug_log_path)
         (
             self.req_groupings, 
             self.res_groupings,
@@ -282,8 +281,8 @@ class DiagnosticTool:
             drive_res_data = log_data["drive_responses"]
 
         for req_json, res_json in zip(drive_req_data,drive_res_data):
-            res_data = json.loads(res_json)
-            req_data = json.loads(req_json)
+            res_data = _load_payload(res_json)
+            req_data = _load_payload(req_json)
 
             for (state_dict, data) in zip([req_agent_state_dict,res_agent_state_dict],[req_data,res_data]):
                 state_dict["agent_states"].append([[round(x,STATE_DECIMAL) for x in st] for st in data["agent_states"]])
@@ -293,16 +292,16 @@ class DiagnosticTool:
                 state_dict["recurrent_states"].append(recurr_state)
 
         for req_json in drive_req_data:
-            req_data = json.loads(req_json)
+            req_data = _load_payload(req_json)
             req_agent_details.append(self._get_agent_details(req_data))
         
         if "large_initialize_responses" in log_data:
             init_res_data = log_data["large_initialize_responses"]
-            res_data = json.loads(init_res_data[-1])
+            res_data = _load_payload(init_res_data[-1])
             init_agent_details = self._get_agent_details(res_data)
         elif "initialize_responses" in log_data:
             init_res_data = log_data["initialize_responses"]
-            res_data = json.loads(init_res_data[-1])
+            res_data = _load_payload(init_res_data[-1])
             init_agent_details = self._get_agent_details(res_data)
         else:
             init_agent_details = req_agent_details.pop(0)
@@ -14,6 +14,8 @@ from invertedai.common import (
     AgentAttributes, 
     AgentProperties,
     AgentState, 
+    AgentStateBatch,
+    RecurrentStateBatch,
     LightRecurrentState,
     LightRecurrentStates,
     Point,
@@ -93,6 +95,9 @@ class LogBase():
         self._scenario_log = None
         self.simulation_length = None
 
+    def _get_scenario_log(self) -> ScenarioLog:
+        return self._scenario_log
+
     @validate_arguments
     def visualize_range(
         self,
@@ -117,14 +122,15 @@ class LogBase():
             assert timestep >= 0 or timestep <= (self.simulation_length - 1), "Visualization time range valid."
         assert timestep_range[1] >= timestep_range[0], "Visualization time range valid."
 
+        scenario_log = self._get_scenario_log()
         location_info_response = location_info(
-            location=self._scenario_log.location,
+            location=scenario_log.location,
             rendering_fov=fov,
             rendering_center=map_center
         )
         rendered_static_map = location_info_response.birdview_image.decode()
         map_center = tuple([location_info_response.map_center.x, location_info_response.map_center.y]) if map_center is None else map_center
-        traffic_lights_states = [None]*len(self._scenario_log.agent_states) if self._scenario_log.traffic_lights_states is None else self._scenario_log.traffic_lights_states
+        traffic_lights_states = [None]*len(scenario_log.agent_states) if scenario_log.traffic_lights_states is None else scenario_log.traffic_lights_states
         
         scene_plotter = ScenePlotter(
             map_image=rendered_static_map,
@@ -136,16 +142,16 @@ class LogBase():
             left_hand_coordinates=left_hand_coordinates
         )
         scene_plotter.initialize_recording(
-            agent_states=self._scenario_log.agent_states[0],
-            agent_properties=[self._scenario_log.agent_properties[i] for i in self._scenario_log.present_indexes[0]],
+            agent_states=scenario_log.agent_states[0],
+            agent_properties=[scenario_log.agent_properties[i] for i in scenario_log.present_indexes[0]],
             traffic_light_states=traffic_lights_states[timestep_range[0]]
         )
 
-        for states, lights, present in zip(self._scenario_log.agent_states[0:],traffic_lights_states[0:],self._scenario_log.present_indexes[0:]):
+        for states, lights, present in zip(scenario_log.agent_states[0:],traffic_lights_states[0:],scenario_log.present_indexes[0:]):
             scene_plotter.record_step(
                 agent_states=states, 
                 traffic_light_states=lights,
-                agent_properties=[self._scenario_log.agent_properties[i] for i in present]
+                agent_properties=[scenario_log.agent_properties[i] for i in present]
             )
 
         fig, ax = plt.subplots(constrained_layout=True, figsize=(50, 50))
@@ -372,6 +378,26 @@ class LogWriter(LogBase):
 
         cls.export_to_file(cls,log_path,scenario_log)
 
+    @validate_arguments
+    def export_to_columnar_file(
+        self,
+        log_path: str,
+        scenario_log: Optional[ScenarioLog] = None
+    ):
+        """
+        Export the data currently contained within the log, or a given scenario log, to a file in the columnar log format, which is much
+        faster to write and read than the JSON format for long simulations with many agents. Please refer to :class:`ColumnarLog` for details.
+        """
+        from invertedai.logs.columnar import ColumnarLog
+
+        if scenario_log is None:
+            scenario_log = self._scenario_log
+            # Same waypoints as those exported to the JSON format
+            waypoints = {str(i): [prop.waypoint] for i, prop in enumerate(scenario_log.agent_properties) if prop.waypoint is not None}
+            scenario_log = scenario_log.model_copy(update={"waypoints": waypoints if waypoints else None})
+
+        ColumnarLog.from_scenario_log(scenario_log).save(log_path)
+
     @validate_arguments
     def initialize(
         self,
@@ -398,8 +424,12 @@ class LogWriter(LogBase):
             if type(agent_properties[0]) == AgentAttributes:
                 agent_properties = [convert_attributes_to_properties(attr) for attr in agent_properties]
 
+            agent_states = init_response.agent_states
+            if isinstance(agent_states, AgentStateBatch):
+                agent_states = agent_states.to_agent_states()
+
             self._scenario_log = ScenarioLog(
-                agent_states=[init_response.agent_states], 
+                agent_states=[agent_states], 
                 agent_properties=agent_properties, 
                 traffic_lights_states=[init_response.traffic_lights_states] if init_response.traffic_lights_states is not None else None, 
                 location=location,
@@ -414,7 +444,7 @@ class LogWriter(LogBase):
                 initialize_model_version=init_response.api_model_version,
                 drive_model_version=drive_model_version,
                 light_recurrent_states=init_response.light_recurrent_states,
-                recurrent_states=init_response.recurrent_states,
+                recurrent_states=init_response.recurrent_states.to_recurrent_states() if isinstance(init_response.recurrent_states, RecurrentStateBatch) else init_response.recurrent_states,
                 waypoints=None,
                 present_indexes=[list(range(len(agent_properties)))]
             )
@@ -446,8 +476,11 @@ class LogWriter(LogBase):
 
         if current_present_indexes is None:
             current_present_indexes = deepcopy(self._scenario_log.present_indexes[self.simulation_length-1])
+        agent_states = drive_response.agent_states
+        if isinstance(agent_states, AgentStateBatch):
+            agent_states = agent_states.to_agent_states()
         self._scenario_log.add_time_step_data(
-            current_agent_states=drive_response.agent_states,
+            current_agent_states=agent_states,
             current_present_indexes=current_present_indexes
         )
 
@@ -456,7 +489,10 @@ class LogWriter(LogBase):
         
         self._scenario_log.drive_model_version = drive_response.api_model_version
         self._scenario_log.light_recurrent_states = drive_response.light_recurrent_states
-        self._scenario_log.recurrent_states = drive_response.recurrent_states
+        recurrent_states = drive_response.recurrent_states
+        if isinstance(recurrent_states, RecurrentStateBatch):
+            recurrent_states = recurrent_states.to_recurrent_states()
+        self._scenario_log.recurrent_states = recurrent_states
 
         self.simulation_length += 1
 
@@ -488,13 +524,44 @@ class LogReader(LogBase):
         log_path: str
     ):
         """
-        The initialization of this object must be given the path to a JSON file in the IAI format. Assume that the 0th time step is taken
+        The initialization of this object must be given the path to a JSON file in the IAI format, or to a `.npz` file in the columnar log
+        format written by :func:`LogWriter.export_to_columnar_file`. Assume that the 0th time step is taken
         from the output of :func:`initialize` and set the time step to the 1st time step whic correlates to the first time step produced 
         by :func:`drive`.
         """
 
         super().__init__()
 
+        if log_path.endswith(".npz"):
+            from invertedai.logs.columnar import ColumnarLog
+            # Only the fields that do not change between time steps are converted up front, the agents of each time step are
+            # read from the memory mapped arrays when the time step is accessed
+            self._columnar_log = ColumnarLog.load(log_path)
+            self._scenario_log = self._columnar_log.to_scenario_log(timestep_range=(0, 0))
+            self.simulation_length = self._columnar_log.simulation_length
+        else:
+            self._columnar_log = None
+            self._scenario_log = self._read_iai_json(log_path)
+            self.simulation_length = len(self._scenario_log.agent_states)
+        self._scenario_log_original = self._scenario_log
+        self._full_scenario_log = None
+
+        self.reset_log()
+
+        self.initialize_model_version = self._scenario_log.initialize_model_version
+        self.drive_model_version = self._scenario_log.drive_model_version
+        self.all_waypoints = self._scenario_log.waypoints
+        
+        self.location_info_response = location_info(
+            location=self._scenario_log.location,
+            rendering_fov=self._scenario_log.rendering_fov,
+            rendering_center=self._scenario_log.rendering_center,
+        )
+
+    def _read_iai_json(
+        self,
+        log_path: str
+    ) -> ScenarioLog:
         with open(log_path) as f:
             LOG_DATA = json.load(f)
 
@@ -572,7 +639,7 @@ class LogReader(LogBase):
         if not agent_waypoints:
             agent_waypoints = None
 
-        self._scenario_log = ScenarioLog(
+        return ScenarioLog(
             agent_states=all_agent_states, 
             agent_properties=all_agent_properties, 
             traffic_lights_states=all_traffic_light_states, 
@@ -589,20 +656,6 @@ class LogReader(LogBase):
             waypoints=agent_waypoints,
             present_indexes=log_present_indexes
         )
-        self._scenario_log_original = self._scenario_log
-
-        self.reset_log()
-
-        self.simulation_length = len(all_agent_states)
-        self.initialize_model_version = self._scenario_log.initialize_model_version
-        self.drive_model_version = self._scenario_log.drive_model_version
-        self.all_waypoints = agent_waypoints
-        
-        self.location_info_response = location_info(
-            location=self._scenario_log.location,
-            rendering_fov=self._scenario_log.rendering_fov,
-            rendering_center=self._scenario_log.rendering_center,
-        )
 
     def _sort_unsorted_dict(
         self,
@@ -616,22 +669,32 @@ class LogReader(LogBase):
 
         return sorted_list
 
+    def _get_scenario_log(self) -> ScenarioLog:
+        if self._columnar_log is None:
+            return self._scenario_log
+        if self._full_scenario_log is None:
+            self._full_scenario_log = self._columnar_log.to_scenario_log()
+        return self._full_scenario_log
+
     @validate_arguments
     def return_scenario_log(
         self,
         timestep_range: Optional[Tuple[int,int]] = None
     ):
         """
-        Return the original scenario log. Optionally choose a time range within the log of interest.
+        Return the original scenario log. Optionally choose a time range within the log of interest. For a columnar log, only
+        the time steps in the range are read.
         """
 
         if timestep_range is None:
-            return self._scenario_log_original
+            return self._get_scenario_log() if self._columnar_log is not None else self._scenario_log_original
         else:
             for timestep in timestep_range:
                 assert timestep >= 0 or timestep <= (self.simulation_length - 1), "Visualization time range valid."
             assert timestep_range[1] >= timestep_range[0], "Visualization time range valid."
 
+            if self._columnar_log is not None:
+                return self._columnar_log.to_scenario_log(timestep_range=timestep_range)
             i, j = timestep_range[0], timestep_range[1]
             returned_log = deepcopy(self._scenario_log_original)
             returned_log.agent_states = returned_log.agent_states[i:j]
@@ -653,11 +716,17 @@ class LogReader(LogBase):
         if timestep >= self.simulation_length:
             return False
 
-        self.agent_states = self._scenario_log.agent_states[timestep]
+        if self._columnar_log is None:
+            self.agent_states = self._scenario_log.agent_states[timestep]
+            self.traffic_lights_states = None if self._scenario_log.traffic_lights_states is None else self._scenario_log.traffic_lights_states[timestep]
+            present_indexes = self._scenario_log.present_indexes[timestep]
+        else:
+            self.agent_states = self._columnar_log.get_agent_state_list(timestep)
+            self.traffic_lights_states = None if self._scenario_log.traffic_lights_states is None else self._columnar_log.get_traffic_lights_states(timestep)
+            present_indexes = self._columnar_log.get_present_indexes(timestep)
         self.recurrent_states = None
-        self.traffic_lights_states = None if self._scenario_log.traffic_lights_states is None else self._scenario_log.traffic_lights_states[timestep]
         self.light_recurrent_states = self._scenario_log.light_recurrent_states if timestep == (self.simulation_length - 1) else None
-        self.agent_properties = [self._scenario_log.agent_properties[i] for i in self._scenario_log.present_indexes[timestep]]
+        self.agent_properties = [self._scenario_log.agent_properties[i] for i in present_indexes]
 
         return True
 
@@ -741,4 +810,4 @@ class LogReader(LogBase):
         Return the length of the simulation in time steps captured in this log.
         """
 
-        return len(self._scenario_log.agent_states)
+        return self.simulation_length
@@ -3,6 +3,9 @@ import os
 import re
 import csv
 import math
+import asyncio
+import atexit
+import threading
 import logging
 import random
 import time
@@ -18,6 +21,11 @@ from requests import Response
 from requests.auth import AuthBase
 from requests.adapters import HTTPAdapter, Retry
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 import matplotlib.pyplot as plt
 from matplotlib import animation
 from matplotlib.patches import Rectangle
@@ -47,8 +55,12 @@ text_x_offset = 0
 text_y_offset = 0.7
 text_size = 7
 TIMEOUT_SECS = 600
+SHUTDOWN_TIMEOUT_SECS = 10
 MAX_RETRIES = 10
 AGENT_SCOPE_FOV = 120
+ASYNC_MAX_CONNECTIONS = 100
+ASYNC_MAX_CONNECTIONS_PER_HOST = 0
+AIOHTTP_MISSING_MESSAGE = "The non-blocking connection pool requires aiohttp, install it with `pip install invertedai[async]`."
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +103,17 @@ class Session:
         self._current_backoff = self._base_backoff
         self._max_backoff = None
 
+        self._max_connections = ASYNC_MAX_CONNECTIONS
+        self._max_connections_per_host = ASYNC_MAX_CONNECTIONS_PER_HOST
+        self._async_session = None
+        self._async_session_loop = None
+        self._async_session_closer = None
+        self._is_async_pool_outdated = False
+        self._is_async_fallback_warned = False
+        self._background_loop = None
+        self._background_thread = None
+        self._background_loop_lock = threading.Lock()
+
         self._debug_logger = debug_logger
 
     @property
@@ -157,6 +180,29 @@ class Session:
     def jitter_factor(self, value):
         self._jitter_factor = value
 
+    @property
+    def max_connections(self):
+        return self._max_connections
+
+    @max_connections.setter
+    def max_connections(self, value):
+        # The connection pool is rebuilt with the new limits on the next async request
+        self._max_connections = value
+        self._is_async_pool_outdated = True
+
+    @property
+    def max_connections_per_host(self):
+        return self._max_connections_per_host
+
+    @max_connections_per_host.setter
+    def max_connections_per_host(self, value):
+        self._max_connections_per_host = value
+        self._is_async_pool_outdated = True
+
+    @property
+    def is_async_transport_available(self):
+        return aiohttp is not None
+
 
     def should_log(self, retry_count):
         return retry_count == 0 or math.log2(retry_count).is_integer()
@@ -248,12 +294,110 @@ class Session:
                 "Using mock Inverted AI API - predictions will be trivial"
             )
 
+    def use_trusted_responses(
+        self,
+        use_trusted: bool = True
+    ) -> None:
+        """
+        Build response objects from the data returned by the server without validating it.
+        The responses of :func:`iai.drive`, :func:`iai.initialize` and :func:`iai.location_info`
+        then skip the per-field pydantic validation, which dominates the deserialization cost
+        for large numbers of agents. Only use this when the server is trusted to return well-formed data.
+        """
+        invertedai.api.config.trusted_responses = use_trusted
+
+    def use_location_info_cache(
+        self,
+        use_cache: bool = True,
+        max_age: Optional[float] = invertedai.api.config.LOCATION_INFO_CACHE_MAX_AGE
+    ) -> None:
+        """
+        Cache :func:`iai.location_info` responses on disk in the cache directory set by :func:`set_cache_dir`.
+        Cached responses are served without a network call for up to `max_age` seconds, a day by default, so
+        a map updated on the server in the meantime is only seen once the entry expires. If `max_age` is None,
+        entries never expire. Disabled by default.
+        """
+        invertedai.api.config.location_info_cache = use_cache
+        invertedai.api.config.location_info_cache_max_age = max_age
+
+    def set_cache_dir(
+        self,
+        cache_dir: Optional[str] = None
+    ) -> None:
+        """
+        Set the directory in which static map information, such as the drivable area of a location and, if enabled
+        with :func:`use_location_info_cache`, :func:`location_info` responses, is cached between runs. By default
+        this is `~/.cache/invertedai`. If None is given, nothing is cached on disk.
+        """
+        invertedai.api.config.cache_dir = cache_dir
+
     async def async_request(
         self, 
-        *args, 
-        **kwargs
+        model: str, 
+        params: Optional[dict] = None, 
+        data: Optional[dict] = None
     ):
-        return await to_thread(self.request, *args, **kwargs)
+        """
+        Non-blocking counterpart of :func:`request`. Requests are sent through a pooled aiohttp session
+        bound to the running event loop, so many concurrent calls share one loop without occupying a
+        thread each. If aiohttp is not installed, the blocking :func:`request` is run in a worker thread instead,
+        install it with ``pip install invertedai[async]``.
+        """
+        if not self.is_async_transport_available:
+            if not self._is_async_fallback_warned:
+                self._is_async_fallback_warned = True
+                logger.warning(f"{AIOHTTP_MISSING_MESSAGE} Running each async request in a worker thread instead.")
+            return await to_thread(self.request, model, params=params, data=data)
+
+        method, relative_path = iai.model_resources[model]
+
+        if self._debug_logger is not None:
+            request_data = data
+            if params is not None:
+                request_data = params
+            self._debug_logger.append_request(model,request_data)
+
+        response = await self._async_request(
+            method=method,
+            relative_path=relative_path,
+            params=params,
+            json_body=data,
+        )
+
+        if self._debug_logger is not None:
+            self._debug_logger.append_response(model,response)
+
+        return response
+
+    async def async_close(self):
+        """
+        Close the connection pool used by :func:`async_request`. A new pool is created on the next async request.
+        """
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_session_loop = None
+        self._async_session_closer = None
+
+    def run_async(self, coroutine):
+        """
+        Run a coroutine to completion from synchronous code and return its result. The coroutine runs on an
+        event loop owned by the session, which is started in a background thread on first use and kept for
+        later calls. Unlike asyncio.run, the event loop and the connection pool of :func:`async_request` are
+        therefore reused rather than created and torn down on every call, and it also works while an event
+        loop is already running in the calling thread, such as in Jupyter notebooks.
+        """
+        loop = self._get_background_loop()
+        if threading.current_thread() is self._background_thread:
+            coroutine.close()
+            raise error.InvertedAIError(message="Cannot wait for a coroutine from within the event loop running it, await it instead.")
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Also stop the coroutine if waiting was interrupted, e.g. by a KeyboardInterrupt
+            future.cancel()
+            raise
 
     def request(
         self, 
@@ -345,28 +489,7 @@ class Session:
         except requests.exceptions.Timeout as e:
             raise error.APIConnectionError("Error communicating with IAI") from None
         except requests.exceptions.RequestException as e:
-            if e.response.status_code == 403:
-                raise error.AuthenticationError(STATUS_MESSAGE[403]) from None
-            elif e.response.status_code in [400, 422]:
-                raise error.InvalidRequestError(e.response.text, param="") from None
-            elif e.response.status_code == 404:
-                raise error.ResourceNotFoundError(e.response.text) from None
-            elif e.response.status_code == 408:
-                raise error.RequestTimeoutError(e.response.text) from None
-            elif e.response.status_code == 413:
-                raise error.RequestTooLarge(e.response.text) from None
-            elif e.response.status_code == 429:
-                raise error.RateLimitError(STATUS_MESSAGE[429]) from None
-            elif e.response.status_code == 502:
-                raise error.APIError(STATUS_MESSAGE[502]) from None
-            elif e.response.status_code == 503:
-                raise error.RequestTimeoutError(e.response.text) from None
-            elif e.response.status_code == 504:
-                raise error.ServiceUnavailableError(STATUS_MESSAGE[504]) from None
-            elif 400 <= e.response.status_code < 500:
-                raise error.APIError(e.response.text) from None
-            else:
-                raise error.APIError(STATUS_MESSAGE[500]) from None
+            self._raise_status_error(e.response.status_code, e.response.text)
         iai.logger.info(
             iai.logger.logfmt(
                 "IAI API response",
@@ -385,6 +508,187 @@ class Session:
             )
         return data
 
+    async def _async_request(
+        self,
+        method,
+        relative_path: str = "",
+        params=None,
+        headers=None,
+        json_body=None,
+        data=None,
+    ) -> Dict:
+        session = await self._get_async_session()
+        request_headers = self._get_async_headers(headers)
+        if params is not None:
+            # aiohttp only accepts string-like query values, mirror how requests encodes them
+            params = {key: str(value) for key, value in params.items() if value is not None}
+
+        retries = 0
+        status_code, content, response_headers = None, None, None
+        while retries < self.max_retries:
+            try:
+                async with session.request(
+                    method=method,
+                    params=params,
+                    url=self.base_url + relative_path,
+                    headers=request_headers,
+                    data=data,
+                    json=json_body,
+                ) as response:
+                    content = await response.read()
+                    status_code = response.status
+                    response_headers = response.headers
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.warning("Error communicating with IAI, will retry.")
+                status_code, content = None, None
+            if status_code is not None and status_code not in self.status_force_list:
+                self.current_backoff = max(
+                    self.base_backoff, self.current_backoff / self.backoff_factor
+                )
+                break
+            else:
+                if self.jitter_factor is not None:
+                    jitter = random.uniform(-self.jitter_factor, self.jitter_factor)
+                else:
+                    jitter = 0
+                if self.should_log(retries):
+                    if status_code is not None:
+                        logger.warning(
+                            f"Retrying {relative_path}: Status {status_code}, Message {STATUS_MESSAGE.get(status_code, content.decode('utf-8', errors='replace'))} Retry #{retries + 1}, Backoff {self.current_backoff} seconds"
+                        )
+                    else:
+                        logger.warning(f"Retrying {relative_path}: No response received, Retry #{retries + 1}, Backoff {self.current_backoff} seconds")
+                await asyncio.sleep(min(self.current_backoff * (1 + jitter), self.max_backoff if self.max_backoff is not None else float("inf")))
+                self.current_backoff *= self.backoff_factor
+                if self.max_backoff is not None:
+                    self.current_backoff = min(
+                        self.current_backoff, self.max_backoff
+                    )
+                retries += 1
+
+        if status_code is None:
+            raise error.APIConnectionError(
+                "Error communicating with IAI", should_retry=True
+            )
+        if status_code >= 400:
+            self._raise_status_error(status_code, content.decode("utf-8", errors="replace"))
+        iai.logger.info(
+            iai.logger.logfmt(
+                "IAI API response",
+                path=self.base_url,
+                response_code=status_code,
+            )
+        )
+        try:
+            data = json.loads(content)
+        except json.decoder.JSONDecodeError:
+            raise error.APIError(
+                f"HTTP code {status_code} from API ({content})",
+                content,
+                status_code,
+                headers=response_headers,
+            )
+        return data
+
+    async def _get_async_session(self):
+        """
+        Return the aiohttp session bound to the running event loop, creating it if needed. Sessions cannot
+        be shared between event loops, so a new connection pool is created whenever the loop changes.
+        """
+        if not self.is_async_transport_available:
+            raise InvertedAIError(message=AIOHTTP_MISSING_MESSAGE)
+        loop = asyncio.get_running_loop()
+        if self._async_session is not None and not self._async_session.closed and self._async_session_loop is loop:
+            if not self._is_async_pool_outdated:
+                return self._async_session
+            await self._async_session.close()
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+        )
+        self._async_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=TIMEOUT_SECS),
+        )
+        self._async_session_loop = loop
+        self._is_async_pool_outdated = False
+
+        # Registering an async generator hooks into loop shutdown (e.g. at the end of asyncio.run), which
+        # finalizes the generator and closes the pool gracefully before the loop goes away.
+        self._async_session_closer = self._close_async_session_on_shutdown(self._async_session)
+        await self._async_session_closer.__anext__()
+
+        return self._async_session
+
+    def _get_background_loop(self):
+        with self._background_loop_lock:
+            if self._background_loop is None or not self._background_thread.is_alive():
+                self._background_loop = asyncio.new_event_loop()
+                self._background_thread = threading.Thread(
+                    target=self._background_loop.run_forever,
+                    name="invertedai-event-loop",
+                    daemon=True
+                )
+                self._background_thread.start()
+                atexit.register(self._stop_background_loop, self._background_loop)
+            return self._background_loop
+
+    @staticmethod
+    def _stop_background_loop(loop):
+        if not loop.is_running():
+            return
+        # Finalizing the async generators closes the connection pool bound to this loop
+        try:
+            asyncio.run_coroutine_threadsafe(loop.shutdown_asyncgens(), loop).result(timeout=SHUTDOWN_TIMEOUT_SECS)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _close_async_session_on_shutdown(self, async_session):
+        try:
+            yield
+        finally:
+            await async_session.close()
+
+    def _get_async_headers(self, headers=None):
+        request_headers = dict(self.session.headers)
+        # aiohttp only decodes brotli when the optional brotli package is installed
+        request_headers["Accept-Encoding"] = "gzip, deflate"
+        if isinstance(self.session.auth, APITokenAuth):
+            request_headers["x-api-key"] = self.session.auth.api_token
+            request_headers["api-key"] = self.session.auth.api_token
+        if headers is not None:
+            request_headers.update(headers)
+        return request_headers
+
+    def _raise_status_error(
+        self,
+        status_code: int,
+        text: str
+    ):
+        if status_code == 403:
+            raise error.AuthenticationError(STATUS_MESSAGE[403]) from None
+        elif status_code in [400, 422]:
+            raise error.InvalidRequestError(text, param="") from None
+        elif status_code == 404:
+            raise error.ResourceNotFoundError(text) from None
+        elif status_code == 408:
+            raise error.RequestTimeoutError(text) from None
+        elif status_code == 413:
+            raise error.RequestTooLarge(text) from None
+        elif status_code == 429:
+            raise error.RateLimitError(STATUS_MESSAGE[429]) from None
+        elif status_code == 502:
+            raise error.APIError(STATUS_MESSAGE[502]) from None
+        elif status_code == 503:
+            raise error.RequestTimeoutError(text) from None
+        elif status_code == 504:
+            raise error.ServiceUnavailableError(STATUS_MESSAGE[504]) from None
+        elif 400 <= status_code < 500:
+            raise error.APIError(text) from None
+        else:
+            raise error.APIError(STATUS_MESSAGE[500]) from None
+
     def _get_base_url(self) -> str:
         """
         This function returns the endpoint for API calls, which includes the
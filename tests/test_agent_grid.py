@@ -0,0 +1,73 @@
+import sys
+from math import hypot
+import pytest
+import numpy as np
+
+sys.path.insert(0, "../../")
+from invertedai.common import AgentState, Point
+from invertedai.large.common import Region
+from invertedai.large._agent_grid import RegionAgentGrid
+
+
+def get_agent_states(rng, center, size, num_agents):
+    return [
+        AgentState(center=Point(x=center[0] + dx, y=center[1] + dy), orientation=0.0, speed=0.0)
+        for dx, dy in rng.uniform(-size/2, size/2, (num_agents, 2)).tolist()
+    ]
+
+
+def get_regions(rng):
+    centers = [(x, y) for x in range(0, 500, 100) for y in range(0, 500, 100)]
+    return [
+        Region(center=Point(x=x, y=y), size=100, agent_states=get_agent_states(rng, (x, y), 100, int(rng.integers(0, 20))))
+        for x, y in centers
+    ]
+
+
+def query_brute_force(regions, center_x, center_y, fov, exclude_index=None, max_region_distance=None):
+    agent_ids = []
+    for region_index, region in enumerate(regions):
+        if region_index == exclude_index:
+            continue
+        if max_region_distance is not None and hypot(region.center.x - center_x, region.center.y - center_y) > max_region_distance:
+            continue
+        for agent_index, state in enumerate(region.agent_states):
+            if abs(state.center.x - center_x) < fov/2 and abs(state.center.y - center_y) < fov/2:
+                agent_ids.append((region_index, agent_index))
+    return agent_ids
+
+
+@pytest.mark.parametrize("cell_size", [30.0, 80.0, 1000.0])
+def test_agent_grid_query(cell_size):
+    rng = np.random.default_rng(0)
+    regions = get_regions(rng)
+    agent_grid = RegionAgentGrid(regions, cell_size=cell_size)
+    for _ in range(50):
+        center_x, center_y = rng.uniform(-50, 550, 2).tolist()
+        fov = float(rng.uniform(10, 300))
+        exclude_index = int(rng.integers(0, len(regions)))
+        max_region_distance = float(rng.uniform(50, 300))
+        assert agent_grid.query(center_x, center_y, fov) == query_brute_force(regions, center_x, center_y, fov)
+        assert agent_grid.query(center_x, center_y, fov, exclude_index=exclude_index, max_region_distance=max_region_distance) == \
+            query_brute_force(regions, center_x, center_y, fov, exclude_index=exclude_index, max_region_distance=max_region_distance)
+
+
+def test_agent_grid_update_region():
+    rng = np.random.default_rng(1)
+    regions = get_regions(rng)
+    agent_grid = RegionAgentGrid(regions)
+    for region_index in [3, 12, 12, 20]:
+        region = regions[region_index]
+        region.agent_states = get_agent_states(rng, (region.center.x, region.center.y), 100, int(rng.integers(0, 20)))
+        agent_grid.update_region(region_index, region.agent_states)
+        assert agent_grid.query(250, 250, 600) == query_brute_force(regions, 250, 250, 600)
+
+    regions[12].agent_states = []
+    agent_grid.update_region(12, None)
+    assert agent_grid.query(250, 250, 600) == query_brute_force(regions, 250, 250, 600)
+
+
+def test_agent_grid_excludes_agents_on_boundary():
+    agent_states = [AgentState(center=Point(x=x, y=0.0), orientation=0.0, speed=0.0) for x in [-50.0, -49.9, 49.9, 50.0]]
+    agent_grid = RegionAgentGrid([Region(center=Point(x=0, y=0), size=100, agent_states=agent_states)])
+    assert agent_grid.query(0.0, 0.0, 100) == [(0, 1), (0, 2)]
@@ -0,0 +1,116 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+sys.path.insert(0, "../../")
+import invertedai as iai
+import invertedai.large.initialize
+from invertedai.api.initialize import InitializeResponse
+from invertedai.common import AgentProperties, AgentState, Point, RecurrentState
+from invertedai.error import InvertedAIError
+from invertedai.large.common import Region
+from invertedai.large._checkpoint import RegionCheckpoint
+
+
+class FakeRegionInitializer:
+    # Stands in for the INITIALIZE calls of each region, placing the requested agents at random within the region
+    def __init__(self, failing_region_index=None):
+        self.failing_region_index = failing_region_index
+        self.region_indexes = []
+
+    def __call__(self, location, region, region_index, all_agent_states, all_agent_properties, **kwargs):
+        if region_index == self.failing_region_index:
+            raise InvertedAIError(message=f"Unable to initialize region {region_index}.")
+        self.region_indexes.append(region_index)
+        rng = np.random.default_rng(region_index)
+        num_new_agents = len(all_agent_properties) - len(all_agent_states)
+        agent_states = list(all_agent_states) + [
+            AgentState(center=Point(x=region.center.x + dx, y=region.center.y + dy), orientation=orientation, speed=speed)
+            for dx, dy, orientation, speed in rng.uniform(-region.size/2, region.size/2, (num_new_agents, 4)).tolist()
+        ]
+        return InitializeResponse(
+            agent_states=agent_states,
+            recurrent_states=[RecurrentState(packed=rng.normal(size=len(RecurrentState().packed)).tolist()) for _ in agent_states],
+            agent_attributes=[None]*len(agent_states),
+            agent_properties=all_agent_properties,
+            birdview=None,
+            infractions=None,
+            traffic_lights_states=None,
+            light_recurrent_states=None,
+            api_model_version="v0"
+        )
+
+
+def get_regions():
+    return [
+        Region.create_square_region(
+            center=Point(x=x, y=y),
+            size=100,
+            agent_states=[],
+            agent_properties=[AgentProperties(length=4.5, width=2, rear_axis_offset=1.4, agent_type="car") for _ in range(3)],
+            recurrent_states=[]
+        )
+        for x in (0, 300) for y in (0, 300)
+    ]
+
+
+def run_large_initialize(monkeypatch, initializer, checkpoint_path=None):
+    monkeypatch.setattr(invertedai.large.initialize, "_initialize_region", initializer)
+    return iai.large_initialize(
+        location="iai:mock",
+        regions=get_regions(),
+        random_seed=1,
+        display_progress_bar=False,
+        checkpoint_path=checkpoint_path
+    )
+
+
+def test_large_initialize_resumes_from_checkpoint(tmp_path, monkeypatch):
+    checkpoint_path = str(tmp_path / "checkpoint.gz")
+    expected_response = run_large_initialize(monkeypatch, FakeRegionInitializer())
+
+    with pytest.raises(InvertedAIError):
+        run_large_initialize(monkeypatch, FakeRegionInitializer(failing_region_index=2), checkpoint_path)
+
+    # Only the regions that were not completed are initialized again
+    initializer = FakeRegionInitializer()
+    response = run_large_initialize(monkeypatch, initializer, checkpoint_path)
+    assert initializer.region_indexes == [2, 3]
+    assert response.agent_states == expected_response.agent_states
+    assert response.recurrent_states == expected_response.recurrent_states
+
+    # A completed checkpoint returns the same agents without any calls
+    initializer = FakeRegionInitializer()
+    response = run_large_initialize(monkeypatch, initializer, checkpoint_path)
+    assert initializer.region_indexes == []
+    assert response.agent_states == expected_response.agent_states
+
+
+def test_region_checkpoint_discards_incomplete_record(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.gz")
+    initializer = FakeRegionInitializer()
+    regions = get_regions()
+    responses = [initializer("iai:mock", regions[i], i, [], regions[i].agent_properties) for i in range(2)]
+
+    checkpoint = RegionCheckpoint(checkpoint_path, fingerprint="inputs")
+    checkpoint.append(0, responses[0])
+    checkpoint.append(1, responses[1])
+    checkpoint.append(2, None)
+    assert sorted(RegionCheckpoint(checkpoint_path, fingerprint="inputs").region_responses) == [0, 1, 2]
+
+    # An interrupted write leaves the compressed data of the last record incomplete
+    with open(checkpoint_path, "rb+") as f:
+        f.truncate(os.path.getsize(checkpoint_path) - 20)
+    checkpoint = RegionCheckpoint(checkpoint_path, fingerprint="inputs")
+    assert sorted(checkpoint.region_responses) == [0, 1]
+    assert checkpoint.region_responses[1].agent_states == responses[1].agent_states
+    checkpoint.append(2, None)
+    assert sorted(RegionCheckpoint(checkpoint_path, fingerprint="inputs").region_responses) == [0, 1, 2]
+
+
+def test_region_checkpoint_with_different_inputs(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.gz")
+    RegionCheckpoint(checkpoint_path, fingerprint="inputs").append(0, None)
+    assert RegionCheckpoint(checkpoint_path, fingerprint="other inputs").region_responses == {}
+    assert RegionCheckpoint(checkpoint_path, fingerprint="inputs").region_responses == {}
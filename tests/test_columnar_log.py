@@ -0,0 +1,97 @@
+import sys
+import pytest
+import numpy as np
+
+sys.path.insert(0, "../../")
+import invertedai as iai
+from invertedai.common import AgentProperties, AgentState, Point, TrafficLightState
+from invertedai.logs.logger import ScenarioLog, LogWriter, LogReader
+from invertedai.logs.columnar import ColumnarLog, convert_iai_json_to_columnar_log
+
+
+@pytest.fixture
+def mock_api():
+    # LogWriter and LogReader look up the location of the log
+    iai.api.config.mock_api = True
+    yield
+    iai.api.config.mock_api = False
+
+
+def get_scenario_log(simulation_length=20, num_agents=30, seed=0):
+    # Agents enter and leave the scenario at random time steps
+    rng = np.random.default_rng(seed)
+    agent_properties = [
+        AgentProperties(length=float(rng.uniform(4, 5)), width=float(rng.uniform(1.8, 2.2)), rear_axis_offset=1.4, agent_type="car")
+        for _ in range(num_agents)
+    ]
+    agent_states, present_indexes, traffic_lights_states = [], [], []
+    for _ in range(simulation_length):
+        present = np.flatnonzero(rng.random(num_agents) < 0.8).tolist()
+        present_indexes.append(present)
+        agent_states.append([AgentState.fromlist(state) for state in rng.normal(0, 50, (len(present), 4)).tolist()])
+        traffic_lights_states.append({
+            light_id: [TrafficLightState.green, TrafficLightState.yellow, TrafficLightState.red][state]
+            for light_id, state in zip([101, 102, 103], rng.integers(0, 3, 3).tolist())
+        })
+    return ScenarioLog(
+        agent_states=agent_states,
+        agent_properties=agent_properties,
+        traffic_lights_states=traffic_lights_states,
+        location="iai:mock",
+        rendering_center=(0.0, 0.0),
+        rendering_fov=100,
+        drive_random_seed=3,
+        waypoints={"0": [Point(x=1.0, y=2.0), Point(x=3.0, y=4.0)], "5": [Point(x=-1.0, y=0.5)]},
+        present_indexes=present_indexes
+    )
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_columnar_log_round_trip(tmp_path, mmap):
+    scenario_log = get_scenario_log()
+    log_path = str(tmp_path / "scenario_log.npz")
+    ColumnarLog.from_scenario_log(scenario_log).save(log_path)
+
+    columnar_log = ColumnarLog.load(log_path, mmap=mmap)
+    assert columnar_log.simulation_length == len(scenario_log.agent_states)
+    assert columnar_log.to_scenario_log().model_dump() == scenario_log.model_dump()
+    assert columnar_log.get_present_indexes(7) == scenario_log.present_indexes[7]
+    assert columnar_log.get_agent_states(7).tolist() == [state.tolist() for state in scenario_log.agent_states[7]]
+
+    # Only the requested time steps are converted
+    partial_log = columnar_log.to_scenario_log(timestep_range=(5, 10))
+    assert partial_log.agent_states == scenario_log.agent_states[5:10]
+    assert partial_log.present_indexes == scenario_log.present_indexes[5:10]
+
+
+def test_columnar_log_matches_log_writer(tmp_path, mock_api):
+    json_path = str(tmp_path / "scenario_log.json")
+    columnar_path = str(tmp_path / "scenario_log.npz")
+    LogWriter.export_log_to_file(json_path, get_scenario_log())
+    convert_iai_json_to_columnar_log(json_path, columnar_path)
+
+    json_log = LogReader(json_path).return_scenario_log()
+    columnar_log = LogReader(columnar_path).return_scenario_log()
+    assert columnar_log.model_dump() == json_log.model_dump()
+
+
+def test_columnar_log_reader_steps(tmp_path, mock_api):
+    json_path = str(tmp_path / "scenario_log.json")
+    columnar_path = str(tmp_path / "scenario_log.npz")
+    LogWriter.export_log_to_file(json_path, get_scenario_log())
+    convert_iai_json_to_columnar_log(json_path, columnar_path)
+
+    json_reader, columnar_reader = LogReader(json_path), LogReader(columnar_path)
+    assert columnar_reader.log_length == json_reader.log_length
+    assert columnar_reader.initialize() and json_reader.initialize()
+    while True:
+        assert columnar_reader.agent_states == json_reader.agent_states
+        assert columnar_reader.agent_properties == json_reader.agent_properties
+        assert columnar_reader.traffic_lights_states == json_reader.traffic_lights_states
+        is_columnar_driven, is_json_driven = columnar_reader.drive(), json_reader.drive()
+        assert is_columnar_driven == is_json_driven
+        if not is_json_driven:
+            break
+    assert columnar_reader.return_scenario_log(timestep_range=(5, 10)).model_dump() == json_reader.return_scenario_log(timestep_range=(5, 10)).model_dump()
+    # Stepping through the log reads one time step at a time without building the whole scenario log
+    assert columnar_reader._full_scenario_log is None
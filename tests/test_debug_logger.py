@@ -0,0 +1,70 @@
+import sys
+import json
+import pytest
+
+sys.path.insert(0, "../../")
+from invertedai.logs.debug_logger import DebugLogger, read_debug_log
+
+
+def test_debug_log_round_trip(tmp_path):
+    debug_logger = DebugLogger(str(tmp_path))
+    request = {"location": "iai:mock", "agent_states": [[0.0, 1.0, 0.5, 3.0]], "random_seed": 1}
+    debug_logger.append_request("drive", request)
+    # Values replaced after logging do not change the logged event
+    request["random_seed"] = 2
+    debug_logger.append_response("drive", {"agent_states": [[0.1, 1.0, 0.5, 3.0]]})
+    debug_logger.append_request("light", {"location": "iai:mock"})
+    debug_logger.close()
+
+    log_data = read_debug_log(debug_logger.debug_log_path)
+    assert set(log_data) == {"drive_requests", "drive_request_timestamps", "drive_responses", "drive_response_timestamps"}
+    assert log_data["drive_requests"] == [{"location": "iai:mock", "agent_states": [[0.0, 1.0, 0.5, 3.0]], "random_seed": 1}]
+    assert log_data["drive_responses"] == [{"agent_states": [[0.1, 1.0, 0.5, 3.0]]}]
+    assert len(log_data["drive_request_timestamps"]) == 1
+
+
+def test_read_debug_log_ignores_incomplete_last_line(tmp_path):
+    debug_logger = DebugLogger(str(tmp_path))
+    debug_logger.append_request("initialize", {"location": "iai:mock"})
+    debug_logger.close()
+    with open(debug_logger.debug_log_path, "a") as f:
+        f.write('{"model": "initialize", "event": "resp')
+
+    assert read_debug_log(debug_logger.debug_log_path)["initialize_requests"] == [{"location": "iai:mock"}]
+
+
+def test_read_legacy_debug_log(tmp_path):
+    # Logs written before the JSON lines format hold a single dictionary with every payload as a JSON string
+    legacy_log_path = tmp_path / "iai_log_legacy_UTC.json"
+    legacy_log_path.write_text(json.dumps({
+        "location_info_requests": [json.dumps({"location": "iai:mock"})],
+        "location_info_request_timestamps": ["2024-01-01_00:00:00:000000"],
+        "drive_requests": [json.dumps({"random_seed": 1}), json.dumps({"random_seed": 2})],
+        "drive_request_timestamps": ["2024-01-01_00:00:01:000000", "2024-01-01_00:00:02:000000"]
+    }))
+
+    log_data = read_debug_log(str(legacy_log_path))
+    assert log_data["location_info_requests"] == [{"location": "iai:mock"}]
+    assert log_data["drive_requests"] == [{"random_seed": 1}, {"random_seed": 2}]
+    assert log_data["drive_request_timestamps"] == ["2024-01-01_00:00:01:000000", "2024-01-01_00:00:02:000000"]
+
+
+def test_debug_logger_writer_errors(tmp_path):
+    debug_logger = DebugLogger(str(tmp_path))
+    debug_logger.append_request("drive", {"random_seed": object()})
+    with pytest.raises(TypeError):
+        debug_logger.flush()
+
+    # Events logged after the error are still written
+    debug_logger.append_request("drive", {"random_seed": 1})
+    debug_logger.close()
+    assert read_debug_log(debug_logger.debug_log_path)["drive_requests"] == [{"random_seed": 1}]
+
+
+def test_deprecated_debug_logger_data(tmp_path):
+    debug_logger = DebugLogger(str(tmp_path))
+    debug_logger.append_request("drive", {"random_seed": 1})
+    with pytest.warns(DeprecationWarning):
+        data = debug_logger.data
+    assert [json.loads(request) for request in data["drive_requests"]] == [{"random_seed": 1}]
+    debug_logger.close()
@@ -1,4 +1,5 @@
 import sys
+import time
 import pytest
 
 sys.path.insert(0, "../../")
@@ -6,6 +7,7 @@ import invertedai as iai
 from invertedai.api.initialize import initialize
 from invertedai.api.drive import drive, DriveResponse
 from invertedai.api.location import location_info
+from invertedai.api._location_cache import LocationInfoCache, _get_cache_key
 from invertedai.api.light import light
 from invertedai.common import Point
 from invertedai.error import InvalidRequestError
@@ -21,3 +23,116 @@ def test_mock_location_info():
     location = "carla:Town03"
     _ = iai.location_info(location=location, rendering_center=None, rendering_fov=800)
     iai.api.config.mock_api = False
+
+
+def get_raw_location_response(version="v1", birdview_image=(137, 80, 78, 71)):
+    return dict(
+        version=version,
+        birdview_image=list(birdview_image),
+        osm_map="<osm></osm>",
+        map_origin=[0.0, 0.0],
+        static_actors=[],
+        bounding_polygon=[[0.0, 0.0], [1.0, 0.0]],
+        max_agent_number=10,
+        map_center=[0.0, 0.0],
+        map_fov=100.0
+    )
+
+
+def get_location_params(location="carla:Town03", rendering_fov=100):
+    return {"location": location, "include_map_source": True, "rendering_fov": rendering_fov, "rendering_center": None}
+
+
+def test_location_info_cache_hit(tmp_path):
+    cache = LocationInfoCache(str(tmp_path))
+    params = get_location_params()
+    cache.put("https://api.example", params, get_raw_location_response())
+
+    response = cache.get("https://api.example", params)
+    assert response["birdview_image"] == bytes([137, 80, 78, 71])
+    assert response["osm_map"] == "<osm></osm>"
+    assert response["version"] == "v1"
+    assert cache.get("https://api.example", get_location_params(rendering_fov=200)) is None
+    assert cache.get("https://other.example", params) is None
+
+
+def test_location_info_cache_expiry(tmp_path, monkeypatch):
+    cache = LocationInfoCache(str(tmp_path), max_age=60)
+    params = get_location_params()
+    cache.put("https://api.example", params, get_raw_location_response())
+    assert cache.get("https://api.example", params) is not None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("https://api.example", params) is None
+
+
+def test_location_info_cache_max_age(tmp_path, monkeypatch):
+    requests = []
+    def request(model, params=None, data=None):
+        requests.append(params)
+        return get_raw_location_response()
+    monkeypatch.setattr(iai.session, "request", request)
+    monkeypatch.setattr(iai.api.config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(iai.api.config, "location_info_cache", False)
+    monkeypatch.setattr(iai.api.config, "location_info_cache_max_age", iai.api.config.location_info_cache_max_age)
+
+    iai.use_location_info_cache(max_age=60)
+    iai.location_info(location="carla:Town03")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    iai.location_info(location="carla:Town03")
+    assert len(requests) == 1
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    iai.location_info(location="carla:Town03")
+    assert len(requests) == 2
+
+    iai.use_location_info_cache(max_age=None)
+    monkeypatch.setattr(time, "time", lambda: now + 10**6)
+    iai.location_info(location="carla:Town03")
+    assert len(requests) == 2
+
+
+def test_location_info_cache_truncated_data(tmp_path):
+    cache = LocationInfoCache(str(tmp_path))
+    params = get_location_params()
+    cache.put("https://api.example", params, get_raw_location_response())
+    _, data_path = cache._get_paths(_get_cache_key("https://api.example", params))
+    with open(data_path, "r+b") as f:
+        f.truncate(2)
+    assert cache.get("https://api.example", params) is None
+
+
+def test_location_info_cache_version_purge(tmp_path):
+    cache = LocationInfoCache(str(tmp_path))
+    cache.put("https://api.example", get_location_params(rendering_fov=100), get_raw_location_response("v1"))
+    cache.put("https://api.example", get_location_params(rendering_fov=200), get_raw_location_response("v1"))
+    cache.put("https://api.example", get_location_params("carla:Town04"), get_raw_location_response("v1"))
+    cache.put("https://other.example", get_location_params(rendering_fov=200), get_raw_location_response("v1"))
+
+    # A new map version removes the entries of the other versions of the location from the same base URL
+    cache.put("https://api.example", get_location_params(rendering_fov=100), get_raw_location_response("v2"))
+    assert cache.get("https://api.example", get_location_params(rendering_fov=100))["version"] == "v2"
+    assert cache.get("https://api.example", get_location_params(rendering_fov=200)) is None
+    assert cache.get("https://api.example", get_location_params("carla:Town04")) is not None
+    assert cache.get("https://other.example", get_location_params(rendering_fov=200)) is not None
+
+
+def test_location_info_cache_is_opt_in(tmp_path, monkeypatch):
+    requests = []
+    def request(model, params=None, data=None):
+        requests.append(params)
+        return get_raw_location_response()
+    monkeypatch.setattr(iai.session, "request", request)
+    monkeypatch.setattr(iai.api.config, "cache_dir", str(tmp_path))
+
+    iai.location_info(location="carla:Town03", include_map_source=True)
+    iai.location_info(location="carla:Town03", include_map_source=True)
+    assert len(requests) == 2
+
+    monkeypatch.setattr(iai.api.config, "location_info_cache", True)
+    response = iai.location_info(location="carla:Town03", include_map_source=True)
+    cached_response = iai.location_info(location="carla:Town03", include_map_source=True)
+    assert len(requests) == 3
+    assert cached_response.birdview_image.encoded_image == bytes(response.birdview_image.encoded_image)
+    assert cached_response.osm_map == response.osm_map
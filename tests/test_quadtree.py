@@ -0,0 +1,120 @@
+import sys
+from math import ceil
+import pytest
+import numpy as np
+
+sys.path.insert(0, "../../")
+from invertedai.large._quadtree import PartitionCost, partition_agents, combine_regions, BUFFER_FOV, QUADTREE_SIZE_BUFFER
+
+
+def get_agent_positions(num_agents, seed):
+    rng = np.random.default_rng(seed)
+    map_size = 30*np.sqrt(num_agents)
+    x = rng.uniform(-map_size/2, map_size/2, num_agents)
+    y = rng.uniform(-map_size/2, map_size/2, num_agents)
+    return x, y
+
+
+class ReferenceQuadTree:
+    # The quadtree large_drive used before partition_agents, inserting the agents one at a time
+    def __init__(self, capacity, center_x, center_y, size):
+        self.capacity = capacity
+        self.center_x, self.center_y, self.size = center_x, center_y, size
+        self.children = None
+        self.agent_ids, self.buffer_agent_ids = [], []
+
+    def is_inside(self, x, y, size):
+        return self.center_x - size/2 <= x and x <= self.center_x + size/2 and self.center_y - size/2 <= y and y <= self.center_y + size/2
+
+    def subdivide(self, x, y):
+        new_size = self.size/2
+        new_center_dist = new_size/2
+        self.children = [
+            ReferenceQuadTree(self.capacity, self.center_x + dx*new_center_dist, self.center_y + dy*new_center_dist, new_size)
+            for dx, dy in [(-1, 1), (1, 1), (-1, -1), (1, -1)]
+        ]
+        for agent_id in self.agent_ids:
+            self.insert_in_children(agent_id, x, y, False)
+        for agent_id in self.buffer_agent_ids:
+            self.insert_in_children(agent_id, x, y, True)
+        self.agent_ids, self.buffer_agent_ids = [], []
+
+    def insert_in_children(self, agent_id, x, y, is_placed):
+        is_inserted = False
+        for child in self.children:
+            is_inserted = child.insert(agent_id, x, y, is_inserted or is_placed) or is_inserted
+        return is_inserted
+
+    def insert(self, agent_id, x, y, is_placed=False):
+        is_in_region = self.is_inside(x[agent_id], y[agent_id], self.size)
+        is_in_buffer = self.is_inside(x[agent_id], y[agent_id], self.size + 2*BUFFER_FOV)
+        if not is_in_region and not is_in_buffer:
+            return False
+        if self.children is None and len(self.agent_ids) + len(self.buffer_agent_ids) < self.capacity:
+            if is_in_region and not is_placed:
+                self.agent_ids.append(agent_id)
+                return True
+            self.buffer_agent_ids.append(agent_id)
+            return False
+        if self.children is None:
+            self.subdivide(x, y)
+        return self.insert_in_children(agent_id, x, y, is_placed)
+
+    def get_region_agent_ids(self):
+        if self.children is None:
+            return [(sorted(self.agent_ids), sorted(self.buffer_agent_ids))]
+        return [region for child in self.children for region in child.get_region_agent_ids()]
+
+
+def partition_agents_reference(x, y, capacity):
+    x, y = x.tolist(), y.tolist()
+    max_x, min_x, max_y, min_y = max(x), min(x), max(y), min(y)
+    quadtree = ReferenceQuadTree(
+        capacity=capacity,
+        center_x=round((max_x+min_x)/2),
+        center_y=round((max_y+min_y)/2),
+        size=ceil(max(max_x - min_x, max_y - min_y)) + QUADTREE_SIZE_BUFFER
+    )
+    for agent_id in range(len(x)):
+        assert quadtree.insert(agent_id, x, y)
+    return quadtree.get_region_agent_ids()
+
+
+@pytest.mark.parametrize("num_agents, capacity, seed", [(1, 100, 10), (80, 100, 11), (300, 20, 12), (2000, 100, 13)])
+@pytest.mark.parametrize("is_rounded", [False, True])
+def test_partition_agents(num_agents, capacity, seed, is_rounded):
+    x, y = get_agent_positions(num_agents, seed)
+    if is_rounded:
+        # Agents exactly on the boundaries of regions and buffers
+        x, y = np.round(x/5)*5, np.round(y/5)*5
+    region_agent_ids = [(agent_ids.tolist(), buffer_agent_ids.tolist()) for agent_ids, buffer_agent_ids in partition_agents(x, y, capacity)]
+    assert region_agent_ids == partition_agents_reference(x, y, capacity)
+
+
+@pytest.mark.parametrize("num_agents, capacity, seed", [(200, 30, 8), (3000, 100, 9)])
+def test_combine_regions(num_agents, capacity, seed):
+    x, y = get_agent_positions(num_agents, seed)
+    region_agent_ids = partition_agents(x, y, capacity)
+    combined_regions = combine_regions(region_agent_ids, capacity)
+
+    # Every agent is driven by exactly one call
+    all_agent_ids = np.concatenate([agent_ids for agent_ids, _ in combined_regions])
+    assert sorted(all_agent_ids.tolist()) == list(range(num_agents))
+    for agent_ids, buffer_agent_ids in combined_regions:
+        assert len(agent_ids) + len(buffer_agent_ids) <= capacity
+        assert len(np.intersect1d(agent_ids, buffer_agent_ids)) == 0
+
+    # Each region is combined as a whole together with its buffer
+    combined_index = np.empty(num_agents, dtype=np.int64)
+    for index, (agent_ids, _) in enumerate(combined_regions):
+        combined_index[agent_ids] = index
+    for agent_ids, buffer_agent_ids in region_agent_ids:
+        if len(agent_ids) == 0:
+            continue
+        index = combined_index[agent_ids[0]]
+        assert np.all(combined_index[agent_ids] == index)
+        assert set(buffer_agent_ids.tolist()) <= set(np.concatenate(combined_regions[index]).tolist())
+
+    cost, combined_cost = PartitionCost.fromregions(region_agent_ids), PartitionCost.fromregions(combined_regions)
+    assert combined_cost.num_calls <= cost.num_calls
+    assert combined_cost.num_agents_sent <= cost.num_agents_sent
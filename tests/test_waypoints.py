@@ -0,0 +1,178 @@
+import sys
+import pytest
+import numpy as np
+import lanelet2
+
+sys.path.insert(0, "../../")
+from invertedai.common import AgentState, Point
+from invertedai.helpers.map_context import get_lanelet_map_context
+from invertedai.helpers.waypoints import (
+    generate_waypoints_from_lane_ids,
+    generate_waypoints_from_lane_ids_batch,
+    find_direction_and_nearest_points,
+    find_direction_and_nearest_points_batch
+)
+
+
+def get_lanelet_map():
+    # Two lanes side by side, each made of a straight lanelet followed by a curve, plus a lanelet joining
+    # the end of the first lane to the second lane
+    point_ids = iter(range(1000, 100000))
+
+    def get_linestring(linestring_id, xy):
+        return lanelet2.core.LineString3d(linestring_id, [lanelet2.core.Point3d(next(point_ids), x, y, 0.0) for x, y in xy])
+
+    def get_lanelet(lanelet_id, left, right):
+        return lanelet2.core.Lanelet(lanelet_id, get_linestring(lanelet_id * 10, left), get_linestring(lanelet_id * 10 + 1, right))
+
+    lanelet_map = lanelet2.core.LaneletMap()
+    for lane_index, y in enumerate([0.0, 4.0]):
+        straight = np.linspace(0, 100, 9)
+        angles = np.linspace(0, np.pi / 2, 12)
+        radius = 60.0 - y
+        lanelet_map.add(get_lanelet(
+            lane_index * 10 + 1,
+            [(x, y + 2) for x in straight],
+            [(x, y - 2) for x in straight]
+        ))
+        lanelet_map.add(get_lanelet(
+            lane_index * 10 + 2,
+            [(100 + (radius - 2) * np.sin(a), 60 - (radius - 2) * np.cos(a)) for a in angles],
+            [(100 + (radius + 2) * np.sin(a), 60 - (radius + 2) * np.cos(a)) for a in angles]
+        ))
+    lanelet_map.add(get_lanelet(30, [(160, 60), (160, 80), (140, 100)], [(164, 60), (164, 80), (144, 100)]))
+    # A lane turning back sharply, where the direction cannot be found near the middle of the long segment
+    lanelet_map.add(get_lanelet(40, [(0, 22), (50, 22), (100, 22), (60, 26)], [(0, 18), (50, 18), (100, 18), (60, 22)]))
+    return lanelet_map
+
+
+def reference_waypoints(start_state, lanelet_map, lane_ids, waypoint_spacing):
+    # The original waypoint generation for a single agent, scanning the lanelet layer for each lane id
+    def get_lanelet(id):
+        for l in lanelet_map.laneletLayer:
+            if l.id == id:
+                return l
+        return None
+
+    all_centerline_points = []
+    x, y, yaw = start_state.center.x, start_state.center.y, start_state.orientation
+    for i, lane_id in enumerate(lane_ids):
+        lane_centerline_points = [point for point in get_lanelet(lane_id).centerline]
+        if i == 0:
+            distances = [(p.x-x)**2 + (p.y-y)**2 for p in lane_centerline_points]
+            idx = distances.index(min(distances))
+            forward_vec = np.array([np.cos(yaw), np.sin(yaw)])
+            waypoint_vec = np.array([lane_centerline_points[idx].x, lane_centerline_points[idx].y]) - np.array([x, y])
+            if np.dot(forward_vec, waypoint_vec) < 0:
+                idx = idx + 1 if idx < len(lane_centerline_points) - 1 else -1
+            lane_centerline_points = [] if idx == -1 else lane_centerline_points[idx:]
+            if len(lane_centerline_points) > 1:
+                second_point = lane_centerline_points[1]
+                waypoint_vec = np.array([second_point.x, second_point.y]) - np.array([x, y])
+                if np.dot(forward_vec, waypoint_vec) < 0:
+                    return []
+        all_centerline_points.extend(lane_centerline_points)
+    all_centerline_points = np.array([[point.x, point.y] for point in all_centerline_points]).reshape(-1, 2)
+    if len(all_centerline_points) == 0:
+        return []
+    deltas = np.diff(all_centerline_points, axis=0)
+    seg_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    total_length = np.sum(seg_lengths)
+    cumdist = np.concatenate(([0], np.cumsum(seg_lengths)))
+    num_points = int(np.ceil(total_length / waypoint_spacing)) + 1
+    if num_points < 2:
+        return []
+    new_distances = np.linspace(0, total_length, num_points)
+    new_x = np.interp(new_distances, cumdist, all_centerline_points[:, 0])[1:]
+    new_y = np.interp(new_distances, cumdist, all_centerline_points[:, 1])[1:]
+    return [Point(x=x, y=y) for x, y in zip(new_x, new_y)]
+
+
+def get_agents(rng, num_agents):
+    routes = [[1, 2], [1, 2, 30], [11, 12], [1], [2, 30], [12]]
+    start_states, all_lane_ids = [], []
+    for _ in range(num_agents):
+        lane_ids = routes[int(rng.integers(0, len(routes)))]
+        # Some agents face backwards or start near the end of their route
+        x = float(rng.uniform(-5, 105)) if lane_ids[0] in (1, 11) else float(rng.uniform(100, 160))
+        y = 4.0 * (lane_ids[0] > 10) + float(rng.normal(0, 0.5)) if lane_ids[0] in (1, 11) else float(rng.uniform(0, 60))
+        orientation = float(rng.choice([0.0, 0.3, np.pi]))
+        start_states.append(AgentState(center=Point(x=x, y=y), orientation=orientation, speed=10.0))
+        all_lane_ids.append(lane_ids)
+    return start_states, all_lane_ids
+
+
+def assert_waypoints_close(waypoints, expected_waypoints):
+    assert len(waypoints) == len(expected_waypoints)
+    if len(waypoints) > 0:
+        np.testing.assert_allclose(
+            [[point.x, point.y] for point in waypoints],
+            [[point.x, point.y] for point in expected_waypoints],
+            atol=1e-6
+        )
+
+
+@pytest.mark.parametrize("waypoint_spacing", [3.0, 15.0, 500.0])
+def test_generate_waypoints_batch(waypoint_spacing):
+    rng = np.random.default_rng(0)
+    lanelet_map = get_lanelet_map()
+    start_states, all_lane_ids = get_agents(rng, 100)
+
+    all_waypoints = generate_waypoints_from_lane_ids_batch(start_states, get_lanelet_map_context(lanelet_map), all_lane_ids, waypoint_spacing)
+    assert len(all_waypoints) == len(start_states)
+    assert sum(len(waypoints) > 0 for waypoints in all_waypoints) > 0
+    for start_state, lane_ids, waypoints in zip(start_states, all_lane_ids, all_waypoints):
+        assert_waypoints_close(waypoints, reference_waypoints(start_state, lanelet_map, lane_ids, waypoint_spacing))
+        assert_waypoints_close(generate_waypoints_from_lane_ids(start_state, lanelet_map, lane_ids, waypoint_spacing), waypoints)
+
+
+def reference_direction_and_nearest_points(linestring, location3d):
+    # The original search for the direction of a linestring, using the lanelet2 geometry functions
+    projected_reference = lanelet2.geometry.project(linestring, location3d)
+    first, second = float("inf"), float("inf")
+    closest_point_idx, second_closest_point_idx = 0, 0
+    for i, point in enumerate(linestring):
+        point_dist = lanelet2.geometry.distance(projected_reference, point)
+        if point_dist < first:
+            second = first
+            first = point_dist
+            second_closest_point_idx = closest_point_idx
+            closest_point_idx = i
+        elif point_dist < second:
+            second = point_dist
+            second_closest_point_idx = i
+    if not abs(closest_point_idx - second_closest_point_idx) == 1:
+        raise ValueError('Failed to find direction of the linestring at a given point')
+    if closest_point_idx > second_closest_point_idx:
+        return linestring[second_closest_point_idx], linestring[closest_point_idx]
+    return linestring[closest_point_idx], linestring[second_closest_point_idx]
+
+
+def test_find_direction_and_nearest_points_batch():
+    rng = np.random.default_rng(1)
+    lanelet_map = get_lanelet_map()
+    lanelets = list(lanelet_map.laneletLayer)
+    lanelet_ids, points = [], []
+    for lanelet in lanelets:
+        centerline = np.array([[point.x, point.y] for point in lanelet.centerline])
+        lower, upper = centerline.min(axis=0) - 10, centerline.max(axis=0) + 10
+        lanelet_ids.extend([lanelet.id] * 50)
+        points.extend(rng.uniform(lower, upper, (50, 2)).tolist())
+
+    point_a, point_b = find_direction_and_nearest_points_batch(get_lanelet_map_context(lanelet_map), lanelet_ids, np.array(points))
+    num_failures = 0
+    for lanelet_id, (x, y), a, b in zip(lanelet_ids, points, point_a, point_b):
+        centerline = lanelet_map.laneletLayer[lanelet_id].centerline
+        location3d = lanelet2.core.BasicPoint3d(x, y, 0.0)
+        try:
+            expected_a, expected_b = reference_direction_and_nearest_points(centerline, location3d)
+        except ValueError:
+            num_failures += 1
+            assert np.isnan(a).all() and np.isnan(b).all()
+            with pytest.raises(ValueError):
+                find_direction_and_nearest_points(centerline, location3d)
+            continue
+        single_a, single_b = find_direction_and_nearest_points(centerline, location3d)
+        assert (single_a.id, single_b.id) == (expected_a.id, expected_b.id)
+        np.testing.assert_allclose([a, b], [[expected_a.x, expected_a.y], [expected_b.x, expected_b.y]])
+    assert 0 < num_failures < len(points)